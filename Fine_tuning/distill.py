@@ -0,0 +1,310 @@
+"""
+Distillation: 느린 teacher cross-encoder(bge-reranker-v2-m3-ko)의 점수를 작은 student reranker로 증류.
+1) harvest: rerank 로그(RERANK_LOG_PATH) 또는 평가 세트 실행에서 (query, chunk, teacher score) 수집
+2) train: CPU에서 student CrossEncoder를 teacher 점수(soft label)로 학습
+3) 평가: hold-out 질의에서 teacher 대비 NDCG@k / Kendall tau, 추론 속도 향상 배율 보고
+
+학습된 모델은 RERANK_MODEL=distilled 로 선택 가능 (RAG.Rerank.rerank.MODEL_ALIASES).
+
+CLI:
+  python -m Fine_tuning.distill harvest [--from-log rerank_log.jsonl] [--from-eval eval_sample.json]
+  python -m Fine_tuning.distill train [--epochs 2] [--student 모델명]
+"""
+
+import json
+import math
+import random
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+DISTILL_DIR = Path(__file__).resolve().parent / "distill"
+TEACHER_SCORES_PATH = DISTILL_DIR / "teacher_scores.jsonl"
+STUDENT_DIR = DISTILL_DIR / "student"
+
+TEACHER_MODEL = "dragonkue/bge-reranker-v2-m3-ko"
+# 다국어(한국어 포함) 소형 cross-encoder. CPU에서도 학습·추론 가능한 크기
+STUDENT_BASE_MODEL = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"
+
+
+def _to_prob(score: float) -> float:
+    """teacher 점수를 [0, 1] soft label로 변환 (sigmoid 적용 안 된 logit이면 sigmoid)."""
+    if 0.0 <= score <= 1.0:
+        return score
+    return 1.0 / (1.0 + math.exp(-score))
+
+
+def load_triples(path: Union[str, Path]) -> list[dict[str, Any]]:
+    """(query, text, score) JSONL 로드."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    triples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            triples.append(json.loads(line))
+    return triples
+
+
+def save_triples(triples: list[dict[str, Any]], path: Union[str, Path]) -> Path:
+    """(query, text, score) 목록을 JSONL로 저장."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for t in triples:
+            f.write(json.dumps(t, ensure_ascii=False) + "\n")
+    return path
+
+
+def harvest_from_log(
+    log_path: Union[str, Path],
+    teacher_model: str = TEACHER_MODEL,
+) -> list[dict[str, Any]]:
+    """
+    rerank 로그(RERANK_LOG_PATH로 기록된 JSONL)에서 teacher 모델 점수만 골라 반환.
+    teacher로 이미 계산된 점수를 재사용하므로 추가 추론 비용 없음.
+    """
+    records = load_triples(log_path)
+    return [
+        {"query": r["query"], "text": r["text"], "score": float(r["score"])}
+        for r in records
+        if r.get("model") == teacher_model and r.get("query") and r.get("text")
+    ]
+
+
+def harvest_from_eval(
+    eval_path: Union[str, Path],
+    teacher_model: str = TEACHER_MODEL,
+    limit: int = 30,
+) -> list[dict[str, Any]]:
+    """
+    평가 세트의 질의로 Retriever 후보를 가져와 teacher로 점수 계산.
+    relevant_source_row_ids는 쓰지 않으므로 query만 있는 질의 목록도 사용 가능.
+    """
+    from RAG.Evaluate import load_eval_data
+    from RAG.Retriever import retrieve
+    from RAG.Rerank.rerank import _get_cross_encoder
+
+    teacher = _get_cross_encoder(teacher_model)
+    triples = []
+    for row in load_eval_data(eval_path):
+        query = (row.get("query") or "").strip()
+        if not query:
+            continue
+        items = retrieve(query, limit=limit)
+        texts = [item.get("text") or "" for item in items if item.get("text")]
+        if not texts:
+            continue
+        scores = teacher.predict([(query, t) for t in texts])
+        triples.extend(
+            {"query": query, "text": t, "score": float(s)} for t, s in zip(texts, scores)
+        )
+    return triples
+
+
+def merge_triples(*groups: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """(query, text) 기준 중복 제거. 뒤에 온 점수가 우선."""
+    by_key: dict[tuple[str, str], dict[str, Any]] = {}
+    for group in groups:
+        for t in group:
+            by_key[(t["query"], t["text"])] = t
+    return list(by_key.values())
+
+
+def _group_by_query(triples: list[dict[str, Any]]) -> dict[str, list[dict[str, Any]]]:
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for t in triples:
+        groups.setdefault(t["query"], []).append(t)
+    return groups
+
+
+def split_by_query(
+    triples: list[dict[str, Any]],
+    holdout_ratio: float = 0.2,
+    seed: int = 42,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """질의 단위로 train / hold-out 분리 (같은 질의가 양쪽에 섞이지 않게)."""
+    queries = sorted(_group_by_query(triples))
+    random.Random(seed).shuffle(queries)
+    n_holdout = max(1, int(len(queries) * holdout_ratio)) if len(queries) > 1 else 0
+    holdout = set(queries[:n_holdout])
+    train = [t for t in triples if t["query"] not in holdout]
+    test = [t for t in triples if t["query"] in holdout]
+    return train, test
+
+
+def ndcg_at_k(teacher_scores: list[float], student_scores: list[float], k: int = 10) -> float:
+    """student 순위를 teacher 점수(gain)로 평가한 NDCG@k."""
+    gains = [_to_prob(s) for s in teacher_scores]
+    order = sorted(range(len(gains)), key=lambda i: student_scores[i], reverse=True)[:k]
+    ideal = sorted(gains, reverse=True)[:k]
+    dcg = sum(gains[i] / math.log2(rank + 2) for rank, i in enumerate(order))
+    idcg = sum(g / math.log2(rank + 2) for rank, g in enumerate(ideal))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def kendall_tau(a: list[float], b: list[float]) -> float:
+    """Kendall tau-b (동점 보정). 후보 수가 작으므로 O(n^2)."""
+    concordant = discordant = ties_a = ties_b = 0
+    n = len(a)
+    for i in range(n):
+        for j in range(i + 1, n):
+            da = a[i] - a[j]
+            db = b[i] - b[j]
+            if da == 0 and db == 0:
+                continue
+            if da == 0:
+                ties_a += 1
+            elif db == 0:
+                ties_b += 1
+            elif (da > 0) == (db > 0):
+                concordant += 1
+            else:
+                discordant += 1
+    denom = math.sqrt((concordant + discordant + ties_a) * (concordant + discordant + ties_b))
+    return (concordant - discordant) / denom if denom > 0 else 0.0
+
+
+def _timed_predict(model, pairs: list[tuple[str, str]]) -> tuple[list[float], float]:
+    start = time.perf_counter()
+    scores = model.predict(pairs)
+    return [float(s) for s in scores], time.perf_counter() - start
+
+
+def evaluate_student(
+    student,
+    test: list[dict[str, Any]],
+    teacher=None,
+    k: int = 10,
+) -> dict[str, Any]:
+    """
+    hold-out 질의에서 student와 teacher의 일치도 측정.
+    teacher 모델이 주어지면 같은 pair로 추론 시간을 재서 speedup도 보고.
+    """
+    groups = _group_by_query(test)
+    pairs = [(t["query"], t["text"]) for t in test]
+    if not pairs:
+        return {"n_queries": 0, "n_pairs": 0}
+    student_scores, student_sec = _timed_predict(student, pairs)
+    by_pair = dict(zip(pairs, student_scores))
+
+    ndcg_sum = 0.0
+    tau_sum = 0.0
+    for query, group in groups.items():
+        t_scores = [g["score"] for g in group]
+        s_scores = [by_pair[(query, g["text"])] for g in group]
+        ndcg_sum += ndcg_at_k(t_scores, s_scores, k=k)
+        tau_sum += kendall_tau(t_scores, s_scores)
+
+    report: dict[str, Any] = {
+        "n_queries": len(groups),
+        "n_pairs": len(pairs),
+        f"ndcg_at_{k}": ndcg_sum / len(groups),
+        "kendall_tau": tau_sum / len(groups),
+        "student_sec": student_sec,
+    }
+    if teacher is not None:
+        _, teacher_sec = _timed_predict(teacher, pairs)
+        report["teacher_sec"] = teacher_sec
+        report["speedup"] = teacher_sec / student_sec if student_sec > 0 else None
+    return report
+
+
+def train_student(
+    triples: list[dict[str, Any]],
+    student_model: str = STUDENT_BASE_MODEL,
+    output_dir: Union[str, Path] = STUDENT_DIR,
+    epochs: int = 2,
+    batch_size: int = 16,
+    holdout_ratio: float = 0.2,
+    teacher_model: Optional[str] = TEACHER_MODEL,
+) -> dict[str, Any]:
+    """
+    teacher 점수를 soft label(BCE)로 student CrossEncoder 학습 (CPU).
+    학습 후 hold-out 리포트를 output_dir/distill_report.json에 저장하고 반환.
+    teacher_model=None이면 speedup 측정 생략 (teacher 로드 비용 절약).
+    """
+    from sentence_transformers import CrossEncoder, InputExample
+    from torch.utils.data import DataLoader
+
+    if not triples:
+        raise ValueError("학습할 teacher 점수가 없습니다. 먼저 harvest를 실행하세요.")
+    train, test = split_by_query(triples, holdout_ratio=holdout_ratio)
+    examples = [InputExample(texts=[t["query"], t["text"]], label=_to_prob(t["score"])) for t in train]
+    loader = DataLoader(examples, shuffle=True, batch_size=batch_size)
+
+    student = CrossEncoder(student_model, num_labels=1, max_length=512, device="cpu")
+    student.fit(
+        train_dataloader=loader,
+        epochs=epochs,
+        warmup_steps=max(1, len(loader) // 10),
+        show_progress_bar=True,
+    )
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    student.save(str(output_dir))
+
+    teacher = None
+    if teacher_model:
+        from RAG.Rerank.rerank import _get_cross_encoder
+        teacher = _get_cross_encoder(teacher_model)
+    report = evaluate_student(student, test, teacher=teacher)
+    report.update({"n_train_pairs": len(train), "student_base": student_model, "teacher": teacher_model})
+    with open(output_dir / "distill_report.json", "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="teacher reranker → student reranker 증류")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_h = sub.add_parser("harvest", help="(query, chunk, teacher score) 수집")
+    p_h.add_argument("--from-log", default=None, dest="log_path", help="RERANK_LOG_PATH로 기록된 rerank 로그 JSONL")
+    p_h.add_argument("--from-eval", default=None, dest="eval_path", help="평가 세트 JSON/JSONL (질의만 사용)")
+    p_h.add_argument("--limit", type=int, default=30, help="질의당 Retriever 후보 수 (--from-eval)")
+    p_h.add_argument("--teacher", default=TEACHER_MODEL, help="teacher 모델명")
+    p_h.add_argument("-o", "--output", default=str(TEACHER_SCORES_PATH), help="teacher 점수 JSONL (기존 내용과 병합)")
+
+    p_t = sub.add_parser("train", help="student 학습 + teacher 일치도/속도 리포트")
+    p_t.add_argument("--scores", default=str(TEACHER_SCORES_PATH), help="teacher 점수 JSONL")
+    p_t.add_argument("--student", default=STUDENT_BASE_MODEL, help="student 초기 모델")
+    p_t.add_argument("--output-dir", default=str(STUDENT_DIR), help="student 저장 경로")
+    p_t.add_argument("--epochs", type=int, default=2)
+    p_t.add_argument("--batch-size", type=int, default=16)
+    p_t.add_argument("--teacher", default=TEACHER_MODEL, help="speedup 측정용 teacher 모델명")
+    p_t.add_argument("--no-speedup", action="store_true", help="teacher 로드 없이 일치도만 보고")
+    args = parser.parse_args()
+
+    if args.command == "harvest":
+        existing = load_triples(args.output)
+        new: list[dict[str, Any]] = []
+        if args.log_path:
+            new += harvest_from_log(args.log_path, teacher_model=args.teacher)
+        if args.eval_path:
+            new += harvest_from_eval(args.eval_path, teacher_model=args.teacher, limit=args.limit)
+        triples = merge_triples(existing, new)
+        save_triples(triples, args.output)
+        print(f"teacher 점수 수집: 신규 {len(new)}건, 전체 {len(triples)}건 → {args.output}")
+        return
+
+    triples = load_triples(args.scores)
+    report = train_student(
+        triples,
+        student_model=args.student,
+        output_dir=args.output_dir,
+        epochs=args.epochs,
+        batch_size=args.batch_size,
+        teacher_model=None if args.no_speedup else args.teacher,
+    )
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"student 저장: {args.output_dir} (RERANK_MODEL=distilled 로 사용)")
+
+
+if __name__ == "__main__":
+    main()
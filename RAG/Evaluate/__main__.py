@@ -1,5 +1,6 @@
 """
-CLI: python -m RAG.Evaluate [eval_json_path] [--k 20] [--rerank] [--rerank-top-k 10]
+CLI: python -m RAG.Evaluate [eval_json_path] [--k 20] [--ks 1,5,10,20] [--rerank] [--rerank-top-k 10] [--concurrency 4]
+     [--replay-out replay.jsonl | --replay replay.jsonl]
 """
 import argparse
 import json
@@ -8,8 +9,18 @@ from pathlib import Path
 from .evaluate import evaluate_retrieval, load_eval_data
 
 
+def _parse_ks(text: str) -> list[int]:
+    try:
+        ks = [int(x) for x in text.split(",") if x.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"쉼표로 구분한 정수여야 합니다: {text}")
+    if not ks or min(ks) < 1:
+        raise argparse.ArgumentTypeError(f"k는 1 이상이어야 합니다: {text}")
+    return ks
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description="Retriever/Rerank 품질 평가 (Recall@k, MRR, Hit@k)")
+    parser = argparse.ArgumentParser(description="Retriever/Rerank 품질 평가 (Recall@k, MRR, Hit@k, nDCG@k)")
     parser.add_argument(
         "eval_path",
         nargs="?",
@@ -17,24 +28,58 @@ def main() -> None:
         help="평가 세트 JSON/JSONL 경로 (미지정 시 기본 eval_sample.json)",
     )
     parser.add_argument("--k", type=int, default=20, help="Retriever 상위 k건")
+    parser.add_argument("--ks", type=_parse_ks, default=None, help="함께 계산할 k 목록 (예: 1,5,10,20). 검색은 최대 k로 한 번만. --rerank 시 --k 지표는 상위 k건만, 나머지는 최대 k건을 Rerank한 순위")
     parser.add_argument("--rerank", action="store_true", help="Rerank 적용 후 평가")
     parser.add_argument("--rerank-top-k", type=int, default=10, dest="rerank_top_k", help="Rerank 상위 k건")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 실행 질의 수 (기본 4, 1이면 순차)")
+    parser.add_argument("--no-warmup", action="store_true", help="측정 전 워밍업 질의 생략")
+    replay = parser.add_mutually_exclusive_group()
+    replay.add_argument("--replay-out", default=None, dest="replay_out", help="검색 결과를 replay JSONL로 저장")
+    replay.add_argument("--replay", default=None, dest="replay_in", help="저장된 replay로 평가 (OpenAI·PostgreSQL 호출 없음)")
     args = parser.parse_args()
 
-    default_path = Path(__file__).resolve().parent / "eval_sample.json"
-    path = args.eval_path or str(default_path)
-    eval_data = load_eval_data(path)
-    if not eval_data:
-        print("평가 데이터가 없습니다.")
-        return
-
-    metrics = evaluate_retrieval(
-        eval_data,
-        k=args.k,
-        use_rerank=args.rerank,
-        rerank_top_k=args.rerank_top_k,
-    )
+    eval_data = None
+    if args.replay_in is None:
+        default_path = Path(__file__).resolve().parent / "eval_sample.json"
+        path = args.eval_path or str(default_path)
+        eval_data = load_eval_data(path)
+        if not eval_data:
+            print("평가 데이터가 없습니다.")
+            return
+
+        if args.concurrency > 1:
+            from RAG.Retriever import init_pg_pool
+            from RAG.Retriever.memory import use_memory_backend
+
+            if not use_memory_backend():
+                # 병렬 질의가 연결을 새로 맺느라 느려지지 않도록 동시 실행 수만큼 연결 풀 준비
+                init_pg_pool(maxconn=args.concurrency)
+
+    try:
+        metrics = evaluate_retrieval(
+            eval_data,
+            k=args.k,
+            use_rerank=args.rerank,
+            rerank_top_k=args.rerank_top_k,
+            concurrency=args.concurrency,
+            warmup=not args.no_warmup,
+            ks=args.ks,
+            replay_out=args.replay_out,
+            replay_in=args.replay_in,
+        )
+    except ValueError as e:  # replay 형식 오류·저장된 k 부족
+        parser.error(str(e))
     print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    # 품질·속도 회귀를 한눈에: k별 지표 표 + 단계별 지연 시간
+    print(f"\n{'k':>4}  {'Hit':>6}  {'Recall':>6}  {'MRR':>6}  {'nDCG':>6}")
+    for k, m in metrics["by_k"].items():
+        print(f"{k:>4}  {m['hit']:6.3f}  {m['recall']:6.3f}  {m['mrr']:6.3f}  {m['ndcg']:6.3f}")
+    if metrics["replayed"]:
+        print(f"(replay: {args.replay_in})")
+    if metrics["queries_per_sec"]:
+        print(f"{metrics['queries_per_sec']:.2f} queries/sec (동시 {metrics['concurrency']})")
+    for stage, lat in metrics["latency_ms"].items():
+        print(f"  {stage:<9} p50 {lat['p50_ms']:8.1f}ms  p95 {lat['p95_ms']:8.1f}ms  p99 {lat['p99_ms']:8.1f}ms")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,260 @@
+"""
+A/B 비교: 같은 평가 세트로 두 검색 설정을 돌려 질의별(paired) 지표·지연 시간 차이와 bootstrap 신뢰구간, 나빠진 질의 목록을 출력.
+
+설정 지정 ("키=값,키=값"):
+- replay=경로: 저장된 검색 결과(python -m RAG.Evaluate --replay-out)를 사용 → chunking·임베딩 모델 변경 비교
+  (변경 전/후 환경에서 각각 replay를 저장해 두고 비교, OpenAI·PostgreSQL 호출 없음)
+- fetch_limit, max_distance, ef_search, probes: retrieve() 인자로 바로 검색 (두 설정을 동시에 실행)
+- rerank_top_k: Rerank 후 상위 건수 (없거나 0이면 Rerank 미사용, replay에도 적용 가능)
+
+라이브 검색은 질의 임베딩을 먼저 한 번 계산해 두 설정이 공유 → 지연 시간 차이는 검색·Rerank만 반영.
+
+CLI:
+    python -m RAG.Evaluate.ab --a replay=runs/chunk_v1.jsonl --b replay=runs/chunk_v2.jsonl --k 10
+    python -m RAG.Evaluate.ab eval.json --a fetch_limit=100 --b fetch_limit=300,rerank_top_k=5 --out ab.json
+"""
+
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+from .evaluate import (
+    _CachedEmbed,
+    _latency_summary,
+    _rerank_record,
+    collect_rankings,
+    load_eval_data,
+    load_replay,
+    per_query_metrics,
+)
+
+METRICS = ("hit", "recall", "mrr", "ndcg")
+_CONFIG_CASTS: dict[str, Callable[[str], Any]] = {
+    "replay": str,
+    "fetch_limit": int,
+    "max_distance": float,
+    "ef_search": int,
+    "probes": int,
+    "rerank_top_k": int,
+}
+
+
+def parse_config(spec: str) -> dict[str, Any]:
+    """ "fetch_limit=100,rerank_top_k=5" → {"fetch_limit": 100, "rerank_top_k": 5}. 알 수 없는 키는 ValueError."""
+    config: dict[str, Any] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        key, sep, value = part.partition("=")
+        key = key.strip()
+        if not sep or key not in _CONFIG_CASTS:
+            raise ValueError(f"설정 항목은 {', '.join(_CONFIG_CASTS)} 중 '키=값'이어야 합니다: {part}")
+        config[key] = _CONFIG_CASTS[key](value.strip())
+    return config
+
+
+def _query_key(record: dict[str, Any]) -> tuple[str, tuple[int, ...]]:
+    return record.get("query") or "", tuple(sorted(record.get("relevant_source_row_ids") or []))
+
+
+def run_config(
+    config: dict[str, Any],
+    eval_data: Optional[list[dict[str, Any]]],
+    k: int,
+    embed: Optional[_CachedEmbed],
+    concurrency: int = 4,
+) -> list[dict[str, Any]]:
+    """설정 하나 실행 → 레코드 목록 (collect_rankings 형식 + rerank_ms). max_distance·rerank_top_k는 검색 후 적용."""
+    if config.get("replay"):
+        records, replay_k = load_replay(config["replay"])
+        if replay_k < k:
+            raise ValueError(f"{config['replay']}: 상위 {replay_k}건만 저장되어 있어 k={k}를 평가할 수 없습니다.")
+    else:
+        from RAG.Retriever import retrieve
+
+        params = {key: config.get(key) for key in ("fetch_limit", "ef_search", "probes")}
+
+        def _retrieve_fn(q: str, limit: int) -> list[dict[str, Any]]:
+            return retrieve(q, limit=limit, embed_fn=embed, **params)
+
+        records, _ = collect_rankings(eval_data or [], _retrieve_fn, k, concurrency)
+
+    max_distance = config.get("max_distance")
+    if max_distance is not None:
+        records = [{**r, "ranked": [x for x in r["ranked"] if x["distance"] <= max_distance]} for r in records]
+    top_k = config.get("rerank_top_k")
+    if top_k:
+        first = next((r for r in records if r["ranked"]), None)
+        if first is not None:
+            _rerank_record(first, top_k, k)  # 모델 로드를 측정에서 제외
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            records = list(pool.map(lambda r: _rerank_record(r, top_k, k), records))
+    return records
+
+
+def bootstrap_ci(
+    deltas: np.ndarray,
+    n_boot: int = 2000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> tuple[float, float]:
+    """질의별 차이의 평균에 대한 percentile bootstrap 신뢰구간 (질의를 복원 추출)."""
+    if len(deltas) == 0:
+        return 0.0, 0.0
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(deltas), size=(n_boot, len(deltas)))
+    means = deltas[idx].mean(axis=1)
+    alpha = (1.0 - confidence) / 2
+    lo, hi = np.quantile(means, [alpha, 1.0 - alpha])
+    return float(lo), float(hi)
+
+
+def _latency_ms(record: dict[str, Any]) -> Optional[float]:
+    if record.get("retrieve_ms") is None:
+        return None
+    return record["retrieve_ms"] + (record.get("rerank_ms") or 0.0)
+
+
+def compare(
+    records_a: list[dict[str, Any]],
+    records_b: list[dict[str, Any]],
+    k: int = 10,
+    n_boot: int = 2000,
+    seed: int = 0,
+    primary: str = "ndcg",
+) -> dict[str, Any]:
+    """
+    질의로 짝지은 A/B 비교.
+    Returns: {"n_queries", "metrics": {지표: {"a", "b", "delta", "ci", "significant", "wins", "losses"}},
+              "latency": {"a", "b": 요약, "delta_mean_ms", "ci"}, "regressions": [나빠진 질의, primary 차이 오름차순]}
+    """
+    by_key_b = {_query_key(r): r for r in records_b}
+    pairs = [(r, by_key_b[_query_key(r)]) for r in records_a if _query_key(r) in by_key_b]
+    if not pairs:
+        raise ValueError("A와 B에 공통 질의가 없습니다 (같은 평가 세트로 만든 결과인지 확인).")
+    a_records = [p[0] for p in pairs]
+    b_records = [p[1] for p in pairs]
+    a_metrics = per_query_metrics(a_records, [k])[k]
+    b_metrics = per_query_metrics(b_records, [k])[k]
+
+    metrics: dict[str, dict[str, Any]] = {}
+    for name in METRICS:
+        deltas = b_metrics[name] - a_metrics[name]
+        lo, hi = bootstrap_ci(deltas, n_boot, seed=seed)
+        metrics[name] = {
+            "a": float(a_metrics[name].mean()),
+            "b": float(b_metrics[name].mean()),
+            "delta": float(deltas.mean()),
+            "ci": [lo, hi],
+            "significant": bool(lo > 0 or hi < 0),
+            "wins": int((deltas > 0).sum()),
+            "losses": int((deltas < 0).sum()),
+        }
+
+    latency: dict[str, Any] = {}
+    paired_latency = [(_latency_ms(a), _latency_ms(b)) for a, b in pairs]
+    paired_latency = [(la, lb) for la, lb in paired_latency if la is not None and lb is not None]
+    if paired_latency:
+        la = np.array([p[0] for p in paired_latency])
+        lb = np.array([p[1] for p in paired_latency])
+        lo, hi = bootstrap_ci(lb - la, n_boot, seed=seed)
+        latency = {
+            "a": _latency_summary(la.tolist()),
+            "b": _latency_summary(lb.tolist()),
+            "delta_mean_ms": round(float((lb - la).mean()), 2),
+            "ci": [round(lo, 2), round(hi, 2)],
+        }
+
+    deltas = b_metrics[primary] - a_metrics[primary]
+    regressions = [
+        {
+            "query": a_records[i].get("query"),
+            "relevant_source_row_ids": a_records[i].get("relevant_source_row_ids"),
+            f"{primary}_a": round(float(a_metrics[primary][i]), 4),
+            f"{primary}_b": round(float(b_metrics[primary][i]), 4),
+            "delta": round(float(deltas[i]), 4),
+        }
+        for i in np.argsort(deltas, kind="stable")
+        if deltas[i] < 0
+    ]
+    return {"n_queries": len(pairs), "k": k, "primary": primary, "metrics": metrics, "latency": latency, "regressions": regressions}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="두 검색 설정 A/B 비교 (질의별 차이, bootstrap 신뢰구간, 나빠진 질의)")
+    parser.add_argument("eval_path", nargs="?", default=None, help="평가 세트 JSON/JSONL (라이브 검색 시, 기본 eval_sample.json)")
+    parser.add_argument("--a", required=True, dest="config_a", help="A 설정 (예: replay=a.jsonl 또는 fetch_limit=100)")
+    parser.add_argument("--b", required=True, dest="config_b", help="B 설정 (예: replay=b.jsonl,rerank_top_k=5)")
+    parser.add_argument("--k", type=int, default=10, help="지표의 k")
+    parser.add_argument("--primary", choices=METRICS, default="ndcg", help="나빠진 질의 판단 기준 지표 (기본 ndcg)")
+    parser.add_argument("--concurrency", type=int, default=4, help="설정별 동시 실행 질의 수")
+    parser.add_argument("--bootstrap", type=int, default=2000, help="bootstrap 반복 횟수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--show", type=int, default=10, help="출력할 나빠진 질의 수")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    try:
+        config_a, config_b = parse_config(args.config_a), parse_config(args.config_b)
+    except ValueError as e:
+        parser.error(str(e))
+
+    eval_data, embed = None, None
+    if not (config_a.get("replay") and config_b.get("replay")):
+        path = args.eval_path or str(Path(__file__).resolve().parent / "eval_sample.json")
+        eval_data = load_eval_data(path)
+        if not eval_data:
+            print("평가 데이터가 없습니다.")
+            return
+        from RAG.Retriever import init_pg_pool
+        from RAG.Retriever.memory import use_memory_backend
+        from RAG.Retriever.retriever import _get_embed_fn
+
+        if not use_memory_backend():
+            init_pg_pool(maxconn=max(1, 2 * args.concurrency))
+        embed = _CachedEmbed(_get_embed_fn())
+        embed.prefetch([item.get("query") or "" for item in eval_data if item.get("relevant_source_row_ids")], args.concurrency)
+
+    # 두 설정을 동시에 실행 (replay 쪽은 파일 읽기뿐)
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            fut_a = pool.submit(run_config, config_a, eval_data, args.k, embed, args.concurrency)
+            fut_b = pool.submit(run_config, config_b, eval_data, args.k, embed, args.concurrency)
+            records_a, records_b = fut_a.result(), fut_b.result()
+        result = compare(records_a, records_b, args.k, args.bootstrap, args.seed, args.primary)
+    except ValueError as e:
+        parser.error(str(e))
+
+    print(f"A: {args.config_a}\nB: {args.config_b}\n공통 질의 {result['n_queries']}건, k={args.k}\n")
+    print(f"{'지표':<8}{'A':>8}{'B':>8}{'Δ(B-A)':>9}   95% CI              B 우세/열세")
+    for name, m in result["metrics"].items():
+        mark = " *" if m["significant"] else ""
+        print(
+            f"{name + '@' + str(args.k):<8}{m['a']:8.3f}{m['b']:8.3f}{m['delta']:+9.3f}   "
+            f"[{m['ci'][0]:+.3f}, {m['ci'][1]:+.3f}]{mark:<4}  {m['wins']}/{m['losses']}"
+        )
+    lat = result["latency"]
+    if lat:
+        print(
+            f"\n지연 시간 p50 {lat['a']['p50_ms']:.1f} → {lat['b']['p50_ms']:.1f}ms, "
+            f"p95 {lat['a']['p95_ms']:.1f} → {lat['b']['p95_ms']:.1f}ms, "
+            f"질의당 평균 차이 {lat['delta_mean_ms']:+.2f}ms [{lat['ci'][0]:+.2f}, {lat['ci'][1]:+.2f}]"
+        )
+    regressions = result["regressions"]
+    print(f"\n나빠진 질의 ({args.primary}@{args.k}): {len(regressions)}건" + ("" if not regressions else f", 상위 {min(args.show, len(regressions))}건"))
+    for r in regressions[: args.show]:
+        print(f"  {r['delta']:+.3f}  {r['query']}")
+    print("\n(* 95% 신뢰구간이 0을 포함하지 않음)")
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,94 +1,330 @@
 """
 Evaluate: Retriever(및 Rerank) 품질 평가.
-평가 세트(query + 관련 공고의 source_row_id)로 Recall@k, Hit@k, MRR 계산.
+평가 세트(query + 관련 공고의 source_row_id)로 Hit@k, Recall@k, MRR, nDCG@k 계산.
+질의는 스레드 풀에서 병렬 실행하고, 질의별 retrieve/rerank 지연 시간(p50/p95/p99)과 처리량(queries/sec)을 함께 집계.
+
+검색은 질의당 한 번(최대 k)만 하고, 여러 k의 지표는 관련도 행렬 하나로 한 번에 계산.
+순위 결과는 replay 파일(JSONL)로 저장해 두면 지표·Rerank 설정을 바꿔 다시 평가할 때 OpenAI·PostgreSQL 없이 재사용.
 """
 
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Sequence, Union
 
+import numpy as np
 from dotenv import load_dotenv
 
+from RAG.tracing import percentile
+
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
 
+# replay 파일에 남기는 검색 결과 필드 (Rerank 재실행에 text 필요)
+_REPLAY_ITEM_KEYS = ("id", "text", "metadata", "distance")
 
-def _relevant_in_retrieved(
-    retrieved: list[dict[str, Any]],
+
+def _relevance_row(
+    ranked: list[dict[str, Any]],
     relevant_source_row_ids: list[int],
-) -> tuple[bool, Optional[int], int]:
+) -> list[float]:
     """
-    retrieved 중 relevant_source_row_ids에 해당하는 고유 공고가 있는지,
-    첫 등장 순위(1-based), 매칭된 고유 공고 수 반환.
+    순위별 관련도(1/0). 관련 공고가 처음 등장한 순위만 1 (같은 공고의 다른 chunk는 0)
+    → 누적합이 곧 매칭된 고유 공고 수.
     """
     relevant_set = set(relevant_source_row_ids)
-    first_rank = None
-    matched_ids = set()
-    for rank, item in enumerate(retrieved, start=1):
-        meta = item.get("metadata") or {}
-        sid = meta.get("source_row_id")
-        if sid is not None and sid in relevant_set:
-            matched_ids.add(sid)
-            if first_rank is None:
-                first_rank = rank
-    hit = len(matched_ids) > 0
-    return hit, first_rank, len(matched_ids)
+    seen: set[Any] = set()
+    row = []
+    for item in ranked:
+        sid = (item.get("metadata") or {}).get("source_row_id")
+        if sid is not None and sid in relevant_set and sid not in seen:
+            seen.add(sid)
+            row.append(1.0)
+        else:
+            row.append(0.0)
+    return row
 
 
-def evaluate_retrieval(
+def per_query_metrics(records: list[dict[str, Any]], ks: Sequence[int]) -> dict[int, dict[str, np.ndarray]]:
+    """
+    순위 결과 → k별 질의별 지표 배열 {"hit", "recall", "mrr", "ndcg"} (길이 = 질의 수, A/B 비교·bootstrap용).
+    관련 공고가 없는 질의는 모든 지표 0.
+
+    Args:
+        records: [{"relevant_source_row_ids": [...], "ranked": [검색 결과, 순위순]}, ...]
+        ks: 지표를 낼 k 목록.
+    """
+    ks = sorted(set(int(k) for k in ks))
+    n = len(records)
+    if n == 0 or not ks:
+        return {k: {name: np.zeros(n) for name in ("hit", "recall", "mrr", "ndcg")} for k in ks}
+    width = max(ks)
+
+    # rel[i, j]: 질의 i의 j+1위가 (처음 나온) 관련 공고면 1
+    rel = np.zeros((n, width), dtype=np.float64)
+    n_relevant = np.zeros(n, dtype=np.float64)
+    for i, rec in enumerate(records):
+        relevant_ids = list(rec.get("relevant_source_row_ids") or [])
+        n_relevant[i] = len(relevant_ids)
+        row = _relevance_row(rec.get("ranked") or [], relevant_ids)[:width]
+        rel[i, : len(row)] = row
+
+    matched = np.cumsum(rel, axis=1)  # k까지 매칭된 고유 공고 수
+    discount = 1.0 / np.log2(np.arange(2, width + 2))
+    dcg = np.cumsum(rel * discount, axis=1)
+    ideal = np.cumsum(discount)  # ideal[j]: 관련 공고 j+1개가 1~j+1위에 있을 때의 DCG
+    first = np.where(rel.any(axis=1), rel.argmax(axis=1), width)  # 첫 관련 순위(0-based), 없으면 width
+    has_relevant = n_relevant > 0
+    safe_relevant = np.maximum(n_relevant, 1.0)
+
+    out: dict[int, dict[str, np.ndarray]] = {}
+    for k in ks:
+        idcg = ideal[np.clip(np.minimum(n_relevant, k).astype(int) - 1, 0, None)]
+        out[k] = {
+            "hit": (matched[:, k - 1] > 0).astype(np.float64),
+            "recall": np.minimum(1.0, matched[:, k - 1] / safe_relevant) * has_relevant,
+            "mrr": np.where(first < k, 1.0 / (first + 1), 0.0),
+            "ndcg": np.where(has_relevant, dcg[:, k - 1] / idcg, 0.0),
+        }
+    return out
+
+
+def compute_metrics(records: list[dict[str, Any]], ks: Sequence[int]) -> dict[int, dict[str, float]]:
+    """
+    순위 결과 → k별 {"hit", "recall", "mrr", "ndcg"} (질의 평균).
+    관련 공고가 없는 질의는 모든 지표 0으로 평균에 포함 (기존 evaluate_retrieval과 같은 분모).
+    """
+    if not records:
+        return {int(k): {"hit": 0.0, "recall": 0.0, "mrr": 0.0, "ndcg": 0.0} for k in ks}
+    return {
+        k: {name: float(values.mean()) for name, values in by_name.items()}
+        for k, by_name in per_query_metrics(records, ks).items()
+    }
+
+
+class _CachedEmbed:
+    """질의 → 임베딩 캐시 (스레드 안전). 같은 질의로 여러 설정을 돌릴 때 OpenAI를 다시 부르지 않음."""
+
+    def __init__(self, embed_fn: Callable[[str], list[float]]) -> None:
+        self._embed_fn = embed_fn
+        self._cache: dict[str, list[float]] = {}
+        self._lock = threading.Lock()
+        self.latencies_ms: list[float] = []
+
+    def __call__(self, text: str) -> list[float]:
+        with self._lock:
+            vec = self._cache.get(text)
+        if vec is not None:
+            return vec
+        t0 = time.perf_counter()
+        vec = self._embed_fn(text)
+        with self._lock:
+            self.latencies_ms.append((time.perf_counter() - t0) * 1000)
+            self._cache[text] = vec
+        return vec
+
+    def prefetch(self, texts: Sequence[str], concurrency: int = 1) -> None:
+        """측정 전에 질의 임베딩을 미리 채움 (이후 설정 간 지연 시간 비교에서 임베딩 제외)."""
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            list(pool.map(self, texts))
+
+
+def _latency_summary(values: list[float]) -> dict[str, float]:
+    return {
+        "p50_ms": round(percentile(values, 50), 1),
+        "p95_ms": round(percentile(values, 95), 1),
+        "p99_ms": round(percentile(values, 99), 1),
+        "mean_ms": round(sum(values) / len(values), 1) if values else 0.0,
+    }
+
+
+def _retrieve_query(
+    item: dict[str, Any],
+    retrieve_fn: Callable[..., list[dict[str, Any]]],
+    limit: int,
+) -> dict[str, Any]:
+    """질의 1건 검색 → replay 레코드. 관련 공고가 없는 질의는 검색하지 않음 (지표 0)."""
+    query = item.get("query") or ""
+    relevant_ids = list(item.get("relevant_source_row_ids") or [])
+    record: dict[str, Any] = {"query": query, "relevant_source_row_ids": relevant_ids, "ranked": [], "retrieve_ms": None}
+    if not relevant_ids:
+        return record
+    t0 = time.perf_counter()
+    retrieved = retrieve_fn(query, limit=limit)
+    record["retrieve_ms"] = (time.perf_counter() - t0) * 1000
+    record["ranked"] = [{key: r.get(key) for key in _REPLAY_ITEM_KEYS} for r in retrieved]
+    return record
+
+
+def _rerank_record(record: dict[str, Any], rerank_top_k: Optional[int], limit: int) -> dict[str, Any]:
+    """replay 레코드의 검색 결과를 Rerank한 새 레코드 (rerank_ms 기록)."""
+    from RAG.Rerank import rerank
+
+    if not record["ranked"]:
+        return {**record, "rerank_ms": None}
+    t0 = time.perf_counter()
+    ranked = rerank(record["query"], [dict(r) for r in record["ranked"]], top_k=rerank_top_k or limit)
+    return {**record, "ranked": ranked, "rerank_ms": (time.perf_counter() - t0) * 1000}
+
+
+def collect_rankings(
     eval_data: list[dict[str, Any]],
     retrieve_fn: Optional[Callable[..., list[dict[str, Any]]]] = None,
+    limit: int = 20,
+    concurrency: int = 1,
+    warmup: bool = True,
+) -> tuple[list[dict[str, Any]], float]:
+    """
+    평가 세트 전체를 질의당 한 번 검색 (limit건). Returns: (replay 레코드 목록, 측정 구간 소요 초)
+    레코드: {"query", "relevant_source_row_ids", "ranked": [{"id", "text", "metadata", "distance"}], "retrieve_ms"}
+    """
+    if retrieve_fn is None:
+        from RAG.Retriever import retrieve as _retrieve
+        def _fn(q: str, limit: int):
+            return _retrieve(q, limit=limit)
+        retrieve_fn = _fn
+
+    def _run(item: dict[str, Any]) -> dict[str, Any]:
+        return _retrieve_query(item, retrieve_fn, limit)
+
+    if warmup:
+        # 모델 로드·연결 수립이 지연 시간에 섞이지 않도록 측정 전에 한 번 실행
+        first = next((item for item in eval_data if item.get("relevant_source_row_ids")), None)
+        if first is not None:
+            _run(first)
+
+    started = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            records = list(pool.map(_run, eval_data))
+    else:
+        records = [_run(item) for item in eval_data]
+    return records, time.perf_counter() - started
+
+
+def save_replay(records: list[dict[str, Any]], path: Union[str, Path], k: int) -> None:
+    """replay JSONL 저장. 첫 줄은 헤더 {"replay": 1, "k": 검색 건수, "n_queries"}."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"replay": 1, "k": k, "n_queries": len(records)}, ensure_ascii=False) + "\n")
+        for rec in records:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+
+def load_replay(path: Union[str, Path]) -> tuple[list[dict[str, Any]], int]:
+    """replay JSONL → (레코드 목록, 저장 당시 검색 건수 k)."""
+    with open(path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    if not lines or lines[0].get("replay") != 1:
+        raise ValueError(f"replay 파일 형식이 아닙니다: {path}")
+    return lines[1:], int(lines[0]["k"])
+
+
+def evaluate_retrieval(
+    eval_data: Optional[list[dict[str, Any]]] = None,
+    retrieve_fn: Optional[Callable[..., list[dict[str, Any]]]] = None,
     k: int = 20,
     use_rerank: bool = False,
     rerank_top_k: Optional[int] = 10,
-) -> dict[str, float]:
+    concurrency: int = 1,
+    warmup: bool = True,
+    ks: Optional[Sequence[int]] = None,
+    replay_out: Optional[Union[str, Path]] = None,
+    replay_in: Optional[Union[str, Path]] = None,
+) -> dict[str, Any]:
     """
-    평가 세트로 Retriever(및 Rerank) 품질 측정.
+    평가 세트로 Retriever(및 Rerank) 품질과 속도 측정.
 
     Args:
-        eval_data: [{"query": str, "relevant_source_row_ids": [int, ...]}, ...]
+        eval_data: [{"query": str, "relevant_source_row_ids": [int, ...]}, ...] (replay_in 사용 시 생략 가능)
         retrieve_fn: (query, limit=...) -> list[dict]. None이면 RAG.Retriever.retrieve 사용.
-        k: Retriever에서 가져올 상위 k건.
+        k: Retriever에서 가져올 상위 k건 (hit_at_k 등 대표 지표의 k).
         use_rerank: True면 Rerank 적용 후 순위 사용.
         rerank_top_k: Rerank 시 상위 몇 건만 사용할지 (None이면 전부).
+        concurrency: 동시에 실행할 질의 수 (스레드 풀 크기, 1이면 순차).
+        warmup: True면 첫 질의를 측정 전에 한 번 실행 (모델 로드·연결 수립이 지연 시간에 섞이지 않도록).
+        ks: 함께 계산할 k 목록 (예: [1, 5, 10, 20]). 검색은 max(ks, k)건으로 한 번만.
+            Rerank 시 대표 지표(by_k[k] 포함)는 상위 k건만 Rerank한 순위로 계산 (ks 없이 같은 k로 돌린 결과와 같음),
+            그 밖의 by_k는 max(ks, k)건을 Rerank한 순위로 계산.
+        replay_out: 검색 결과(Rerank 전)를 저장할 replay JSONL 경로.
+        replay_in: 저장된 replay로 평가 (검색 생략 → OpenAI·PostgreSQL 호출 없음).
 
     Returns:
-        {"hit_at_k": 0~1, "mrr": 0~1, "recall_at_k": 0~1, "n_queries": int}
+        {"hit_at_k", "mrr", "recall_at_k", "ndcg_at_k": 0~1, "n_queries": int,
+         "by_k": {k: {"hit", "recall", "mrr", "ndcg"}},
+         "latency_ms": {"retrieve" | "rerank" | "total": {"p50_ms", "p95_ms", "p99_ms", "mean_ms"}},
+         "queries_per_sec": float, "concurrency": int, "replayed": bool}
     """
-    if retrieve_fn is None:
-        from RAG.Retriever import retrieve as _retrieve
-        def _fn(q: str, limit: int):
-            return _retrieve(q, limit=limit)
-        retrieve_fn = _fn
+    ks = sorted(set([*(ks or []), k]))
+    limit = max(ks)
+
+    if replay_in is not None:
+        records, replay_k = load_replay(replay_in)
+        if replay_k < limit:
+            raise ValueError(f"replay는 상위 {replay_k}건만 저장되어 있어 k={limit}를 평가할 수 없습니다.")
+        wall_sec = 0.0
+    else:
+        records, wall_sec = collect_rankings(eval_data or [], retrieve_fn, limit, concurrency, warmup)
+        if replay_out is not None:
+            save_replay(records, replay_out, limit)
 
-    hit_sum = 0.0
-    mrr_sum = 0.0
-    recall_sum = 0.0
-    n = len(eval_data)
+    n = len(records)
     if n == 0:
-        return {"hit_at_k": 0.0, "mrr": 0.0, "recall_at_k": 0.0, "n_queries": 0}
+        return {
+            "hit_at_k": 0.0, "mrr": 0.0, "recall_at_k": 0.0, "ndcg_at_k": 0.0, "n_queries": 0,
+            "by_k": {}, "latency_ms": {}, "queries_per_sec": 0.0, "concurrency": concurrency,
+            "replayed": replay_in is not None,
+        }
 
-    for item in eval_data:
-        query = item.get("query") or ""
-        relevant_ids = list(item.get("relevant_source_row_ids") or [])
-        if not relevant_ids:
-            continue
+    by_k: Optional[dict[int, dict[str, float]]] = None
+    if use_rerank:
+        def _rerank_all(recs: list[dict[str, Any]], n: int) -> list[dict[str, Any]]:
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                    return list(pool.map(lambda r: _rerank_record(r, rerank_top_k, n), recs))
+            return [_rerank_record(r, rerank_top_k, n) for r in recs]
 
-        retrieved = retrieve_fn(query, limit=k)
-        if use_rerank:
-            from RAG.Rerank import rerank
-            retrieved = rerank(query, retrieved, top_k=rerank_top_k or k)
+        if warmup:
+            first = next((r for r in records if r["ranked"]), None)
+            if first is not None:
+                _rerank_record(first, rerank_top_k, limit)  # 모델 로드를 측정에서 제외
+        # 대표 지표는 상위 k건만 Rerank (ks를 더해도 같은 k의 지표·지연 시간이 바뀌지 않도록). 지연 시간·처리량도 이 기준
+        head = [{**r, "ranked": r["ranked"][:k]} for r in records] if limit > k else records
+        rerank_started = time.perf_counter()
+        reranked = _rerank_all(head, k)
+        wall_sec += time.perf_counter() - rerank_started
+        if limit > k:
+            by_k = compute_metrics(_rerank_all(records, limit), ks)
+            by_k[k] = compute_metrics(reranked, [k])[k]
+        records = reranked
 
-        hit, first_rank, matched_count = _relevant_in_retrieved(retrieved, relevant_ids)
-        hit_sum += 1.0 if hit else 0.0
-        mrr_sum += (1.0 / first_rank) if first_rank is not None else 0.0
-        recall_sum += min(1.0, matched_count / len(relevant_ids))
+    if by_k is None:
+        by_k = compute_metrics(records, ks)
+    measured = [r for r in records if r["ranked"] or r.get("retrieve_ms") is not None]
+    latency: dict[str, dict[str, float]] = {}
+    if replay_in is None:
+        latency["retrieve"] = _latency_summary([r["retrieve_ms"] for r in measured if r["retrieve_ms"] is not None])
+    if use_rerank:
+        latency["rerank"] = _latency_summary([r["rerank_ms"] for r in measured if r.get("rerank_ms") is not None])
+    if replay_in is None:
+        latency["total"] = _latency_summary(
+            [(r["retrieve_ms"] or 0.0) + (r.get("rerank_ms") or 0.0) for r in measured if r["retrieve_ms"] is not None]
+        )
 
     return {
-        "hit_at_k": hit_sum / n,
-        "mrr": mrr_sum / n,
-        "recall_at_k": recall_sum / n,
+        "hit_at_k": by_k[k]["hit"],
+        "mrr": by_k[k]["mrr"],
+        "recall_at_k": by_k[k]["recall"],
+        "ndcg_at_k": by_k[k]["ndcg"],
         "n_queries": n,
+        "by_k": by_k,
+        "latency_ms": latency,
+        "queries_per_sec": round(len(measured) / wall_sec, 2) if wall_sec > 0 else 0.0,
+        "concurrency": concurrency,
+        "replayed": replay_in is not None,
     }
 
 
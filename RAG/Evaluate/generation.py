@@ -0,0 +1,578 @@
+"""
+Generate 단계 평가: 평가 세트 질의마다 generate()와 같은 경로(검색 → Rerank → context → 답변)로 답변을 만들고,
+답변이 참고 공고에 근거하는지 결정적 오프라인 검사(+ 선택적 LLM judge)로 채점.
+
+- 답변 캐시: (질의, context 해시, 모델, 프롬프트 버전) → 답변을 JSONL에 누적. 다시 돌리면 검색 결과(context)·모델·system prompt가 바뀐 질의만 LLM 호출
+- judge 캐시: (질의, context 해시, 답변 해시, judge 모델) → 판정. 답변이 그대로면 judge도 다시 부르지 않음
+- 답변·judge 호출은 스레드 풀에서 병렬로, 요청/초 token bucket으로 제한 (캐시 적중은 제한 없음)
+- 오프라인 검사 (LLM 없음, 결정적):
+    citation     '[번호] 회사 · 직무' 머리줄의 회사가 참고 공고에 있는지 (없으면 hallucinated), 번호의 공고와 일치하는지.
+                 머리줄이 없는 답변은 본문에 나온 참고 공고 회사명을 인용으로 봄
+    hallucinated 머리줄 회사 + 본문에 나온 corpus 회사명(facet 인덱스) 중 참고 공고에 없는 회사
+                 (인용도, 없는 회사도 찾지 못한 답변은 검사 불가 → None, 비율에서 제외)
+    coverage     인용한 공고의 주요업무 항목 중 답변에 그대로 나온 비율
+    source_recall context에 넣은 공고 중 답변에 인용된 비율
+    relevant     인용한 공고 중 평가 세트 relevant_source_row_ids에 속한 비율 (정답이 있는 질의만)
+
+CLI:
+    python -m RAG.Evaluate.generation [eval_path] [--model gpt-4o-mini] [--judge-model gpt-4o-mini]
+        [--concurrency 4] [--rps 2] [--cache generation_cache.jsonl] [--out results.jsonl]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+from .evaluate import _latency_summary, load_eval_data
+
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parent / "generation_cache.jsonl"
+NO_RESULT_ANSWER = "질문과 관련된 채용 공고를 찾지 못했습니다."
+# 이보다 짧은 corpus 회사명은 일반 단어와 겹치기 쉬워 본문 대조에 쓰지 않음
+_MIN_COMPANY_NAME_LEN = 2
+# 평가 세트 항목에 지정할 수 있는 검색 필터 (generate()의 같은 이름 인자로 전달)
+FILTER_KEYS = (
+    "company", "job_role", "career_type", "company_years_num",
+    "location", "company_years_min", "company_years_max",
+)
+
+# 답변의 공고 머리줄: '[1] 회사명 · 직무' (extractive_answer 형식. LLM 답변은 보통 머리줄이 없어 회사명으로 대조)
+_RE_CITATION = re.compile(r"^\s*\[(\d+)\]\s*(.+?)\s*·\s*(.*?)\s*$", re.MULTILINE)
+_RE_SPACES = re.compile(r"\s+")
+_RE_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+JUDGE_SYSTEM_PROMPT = (
+    "당신은 채용 공고 검색 서비스의 답변을 채점하는 평가자입니다. "
+    "사용자 메시지의 '--- 채용 공고 ---' 부분만 근거로 삼아 '--- 답변 ---'을 평가하세요.\n"
+    "- grounded: 답변의 회사·직무·업무 문장이 모두 채용 공고에 있으면 1, 공고에 없는 내용이 있으면 그 비중만큼 낮춤 (0~1)\n"
+    "- relevance: 답변에 나열된 공고가 질문과 관련된 정도 (0~1)\n"
+    "- completeness: 질문과 관련된 공고·주요업무를 빠짐없이 담은 정도 (0~1)\n"
+    '반드시 JSON 한 개로만 답하세요: {"grounded": 0~1, "relevance": 0~1, "completeness": 0~1, "reason": "한 문장"}'
+)
+JUDGE_SCORES = ("grounded", "relevance", "completeness")
+
+
+def _sha1(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def _normalize(text: Any) -> str:
+    """비교용 정규화: 공백 제거 + 소문자 (회사명 띄어쓰기·대소문자 차이 무시)."""
+    return _RE_SPACES.sub("", str(text or "")).lower()
+
+
+class RateLimiter:
+    """token bucket: 초당 rate개, 최대 burst개까지 몰아서 허용 (스레드 안전). rate가 0 이하면 제한 없음."""
+
+    def __init__(self, rate: float, burst: Optional[int] = None) -> None:
+        self.rate = rate
+        self.capacity = float(burst if burst is not None else max(1, int(rate)))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """토큰 1개를 얻을 때까지 대기. Returns: 기다린 초."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                wait = (1.0 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+
+class GenerationCache:
+    """
+    답변·judge 결과 JSONL 캐시 (append-only, 스레드 안전). 같은 키가 여러 번 있으면 마지막 줄 사용.
+    줄: {"key", "kind": "answer" | "judge", "model", ..., "value": dict}
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]]) -> None:
+        self.path = Path(path) if path else None
+        self._entries: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 중단된 쓰기로 잘린 마지막 줄
+                    if "key" in entry and "value" in entry:
+                        self._entries[entry["key"]] = entry["value"]
+
+    @staticmethod
+    def key(kind: str, *parts: str) -> str:
+        return _sha1("\0".join((kind, *parts)))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def put(self, key: str, kind: str, value: dict[str, Any], **fields: Any) -> None:
+        line = json.dumps({"key": key, "kind": kind, **fields, "value": value}, ensure_ascii=False)
+        with self._lock:
+            self._entries[key] = value
+            if self.path:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+
+def build_eval_context(
+    query: str,
+    model: str,
+    filters: Optional[dict[str, Any]] = None,
+    *,
+    retrieve_limit: int = 20,
+    max_distance: Optional[float] = None,
+    use_rerank: bool = True,
+    rerank_top_k: int = 5,
+    context_tokens: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    generate_stream과 같은 규칙으로 참고 공고·context 구성 (LLM 호출 없음).
+    Returns: {"sources", "groups", "group_texts", "context", "context_hash"}
+    """
+    from RAG.Generate.context import build_context, select_chunk_groups
+    from RAG.Generate.generate import _fetch_group_texts, _job_key, _select_sources
+
+    filters = filters or {}
+    sources = _select_sources(
+        query,
+        **{key: filters.get(key) for key in FILTER_KEYS},
+        retrieve_limit=retrieve_limit,
+        max_distance=max_distance,
+        use_rerank=use_rerank,
+        rerank_top_k=rerank_top_k,
+    )
+    groups = select_chunk_groups(query)
+    group_texts = _fetch_group_texts(sources, groups) if sources else {}
+    context, _ = build_context(
+        sources, model, groups=groups, group_texts=group_texts, job_key=_job_key, token_budget=context_tokens
+    )
+    if not context.strip():
+        sources, context = [], ""
+    return {
+        "sources": sources,
+        "groups": groups,
+        "group_texts": group_texts,
+        "context": context,
+        "context_hash": _sha1(context),
+    }
+
+
+def _chat(model: str, messages: list[dict[str, str]], max_tokens: int, **extra: Any) -> tuple[str, dict[str, int]]:
+    """비스트리밍 chat.completions 1회 → (본문, usage)."""
+    from RAG.Generate.prompt import usage_to_dict
+    from service.openai_client import get_openai_client
+
+    client = get_openai_client()
+    if client is None:
+        raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다.")
+    resp = client.chat.completions.create(model=model, messages=messages, max_tokens=max_tokens, **extra)
+    return (resp.choices[0].message.content or "").strip(), usage_to_dict(getattr(resp, "usage", None))
+
+
+def answer_for_context(query: str, ctx: dict[str, Any], model: str, answer_mode: Optional[str] = None) -> dict[str, Any]:
+    """context로 답변 1건 생성 (generate_stream과 같은 라우팅·프롬프트). Returns: {"answer", "route", "usage", "latency_ms"}"""
+    from RAG.Generate.extractive import extractive_answer
+    from RAG.Generate.generate import _job_key, _route_answer
+    from RAG.Generate.prompt import build_messages, prompt_cache_key, usage_to_dict
+
+    if not ctx["context"]:
+        return {"answer": "검색된 채용 정보가 없어 답변을 생성할 수 없습니다.", "route": "empty", "usage": usage_to_dict(None), "latency_ms": 0.0}
+    route, _ = _route_answer(query, answer_mode, ctx["groups"])
+    t0 = time.perf_counter()
+    if route == "extractive":
+        answer, usage = extractive_answer(ctx["sources"], ctx["group_texts"], _job_key), usage_to_dict(None)
+    else:
+        answer, usage = _chat(
+            model,
+            build_messages(query, ctx["context"]),
+            1024,
+            extra_body={"prompt_cache_key": prompt_cache_key()},
+        )
+    return {"answer": answer, "route": route, "usage": usage, "latency_ms": (time.perf_counter() - t0) * 1000}
+
+
+def judge_answer(query: str, context: str, answer: str, model: str) -> dict[str, Any]:
+    """LLM judge 1회. Returns: {"grounded", "relevance", "completeness", "reason", "usage"} (판정 파싱 실패 시 점수 None)."""
+    user = f"--- 채용 공고 ---\n{context}\n--- 끝 ---\n\n질문: {query}\n\n--- 답변 ---\n{answer}\n--- 끝 ---"
+    text, usage = _chat(
+        model,
+        [{"role": "system", "content": JUDGE_SYSTEM_PROMPT}, {"role": "user", "content": user}],
+        256,
+        temperature=0,
+    )
+    verdict: dict[str, Any] = {}
+    match = _RE_JSON_OBJECT.search(text)
+    if match:
+        try:
+            verdict = json.loads(match.group())
+        except json.JSONDecodeError:
+            verdict = {}
+    result: dict[str, Any] = {"reason": str(verdict.get("reason") or "") if verdict else text[:200], "usage": usage}
+    for name in JUDGE_SCORES:
+        try:
+            result[name] = min(1.0, max(0.0, float(verdict[name])))
+        except (KeyError, TypeError, ValueError):
+            result[name] = None
+    return result
+
+
+def offline_checks(
+    answer: str,
+    sources: list[dict[str, Any]],
+    group_texts: Optional[dict[tuple[Any, ...], dict[str, str]]] = None,
+    relevant_ids: Optional[list[int]] = None,
+    known_companies: Optional[Iterable[str]] = None,
+) -> dict[str, Any]:
+    """
+    답변을 참고 공고와 대조하는 결정적 검사 (LLM 없음).
+    '[번호] 회사 · 직무' 머리줄이 있으면 머리줄로, 없으면 본문에 나온 참고 공고 회사명으로 인용을 찾고,
+    known_companies(corpus 회사명) 중 참고 공고에 없는 회사가 본문에 나오면 hallucinated로 셈.
+    Returns: {"n_cited", "hallucinated": [회사명], "misnumbered", "coverage", "n_tasks", "source_recall",
+              "relevant_precision", "no_result", "unchecked"}  (해당 없는 비율 값은 None)
+        unchecked: 답변이 있는데 인용도, 없는 회사도 찾지 못함 → hallucinated·coverage는 None (통과로 보지 않음)
+    """
+    from RAG.Generate.context import source_text
+    from RAG.Generate.extractive import MAIN_TASK_GROUP, _task_lines
+    from RAG.Generate.generate import _job_key
+
+    metas = [s.get("metadata") or {} for s in sources]
+    by_company: dict[str, list[int]] = {}
+    for i, meta in enumerate(metas):
+        by_company.setdefault(_normalize(meta.get("company")), []).append(i)
+
+    hallucinated: list[str] = []
+    misnumbered = 0
+    cited: set[int] = set()
+    n_tasks = 0
+    n_covered = 0
+
+    def _cite(idx: int, block: str) -> None:
+        nonlocal n_tasks, n_covered
+        if idx in cited:
+            return
+        cited.add(idx)
+        texts = (group_texts or {}).get(_job_key(sources[idx]))
+        if not (texts and texts.get(MAIN_TASK_GROUP)) and metas[idx].get("chunk_group") != MAIN_TASK_GROUP:
+            return  # 주요업무가 없는 공고는 coverage 대상 아님
+        tasks = _task_lines(source_text(sources[idx], [MAIN_TASK_GROUP], texts))
+        normalized_block = _normalize(block)
+        n_tasks += len(tasks)
+        n_covered += sum(1 for t in tasks if _normalize(t) in normalized_block)
+
+    # 머리줄 위치로 답변을 공고별 블록으로 나눔
+    matches = list(_RE_CITATION.finditer(answer))
+    for pos, m in enumerate(matches):
+        number, company, role = int(m.group(1)), m.group(2), m.group(3)
+        block = answer[m.end(): matches[pos + 1].start() if pos + 1 < len(matches) else len(answer)]
+        candidates = by_company.get(_normalize(company))
+        if not candidates:
+            hallucinated.append(company)
+            continue
+        if number - 1 in candidates:
+            idx = number - 1
+        else:
+            misnumbered += 1
+            same_role = [i for i in candidates if _normalize(metas[i].get("job_role")) == _normalize(role)]
+            idx = (same_role or candidates)[0]
+        _cite(idx, block)
+
+    normalized_answer = _normalize(answer)
+    source_names = sorted((name for name in by_company if name), key=len, reverse=True)
+    if not matches:
+        # 머리줄 없는 답변(LLM 자유 형식): 본문에 회사명이 나온 참고 공고를 인용으로, coverage는 답변 전체 기준
+        for name in source_names:
+            if name in normalized_answer:
+                _cite(by_company[name][0], answer)
+    # 참고 공고 회사명을 지운 본문에서 corpus 회사명을 찾음 ("카카오뱅크" 인용 안의 "카카오"를 없는 회사로 세지 않도록)
+    scrubbed = normalized_answer
+    for name in source_names:
+        scrubbed = scrubbed.replace(name, "\0")
+    flagged = {_normalize(company) for company in hallucinated}
+    for company in known_companies or ():
+        name = _normalize(company)
+        if len(name) < _MIN_COMPANY_NAME_LEN or name in by_company or name in flagged:
+            continue
+        if name in scrubbed:
+            hallucinated.append(company)
+            flagged.add(name)
+
+    no_result = NO_RESULT_ANSWER in answer or not sources
+    unchecked = not no_result and bool(answer.strip()) and not cited and not hallucinated
+    relevant = set(relevant_ids or [])
+    cited_ids = [metas[i].get("source_row_id") for i in sorted(cited)]
+    return {
+        "n_cited": len(cited),
+        "hallucinated": None if unchecked else hallucinated,
+        "misnumbered": misnumbered,
+        "coverage": n_covered / n_tasks if n_tasks and not unchecked else None,
+        "n_tasks": n_tasks,
+        "source_recall": len(cited) / len(sources) if sources else None,
+        "relevant_precision": (sum(1 for sid in cited_ids if sid in relevant) / len(cited_ids)) if relevant and cited_ids else None,
+        "no_result": no_result,
+        "unchecked": unchecked,
+    }
+
+
+def _mean(values: list[Optional[float]]) -> Optional[float]:
+    present = [v for v in values if v is not None]
+    return round(sum(present) / len(present), 4) if present else None
+
+
+def evaluate_generation(
+    eval_data: list[dict[str, Any]],
+    *,
+    model: Optional[str] = None,
+    judge_model: Optional[str] = None,
+    answer_mode: Optional[str] = None,
+    retrieve_limit: int = 20,
+    max_distance: Optional[float] = None,
+    use_rerank: bool = True,
+    rerank_top_k: int = 5,
+    context_tokens: Optional[int] = None,
+    concurrency: int = 4,
+    requests_per_sec: float = 2.0,
+    cache_path: Optional[Union[str, Path]] = DEFAULT_CACHE_PATH,
+    refresh: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+    known_companies: Optional[list[str]] = None,
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    평가 세트 전체 답변 생성·채점. 질의별 검색은 항상 실행하고(context 해시 계산), 답변·judge는 캐시에 없을 때만 호출.
+
+    Args:
+        eval_data: [{"query", "relevant_source_row_ids"(선택), FILTER_KEYS 필터(선택)}]
+        model: 답변 모델 (None이면 RAG_CHAT_MODEL 또는 기본 모델).
+        judge_model: LLM judge 모델 (None이면 judge 생략, 오프라인 검사만).
+        requests_per_sec: 답변·judge API 호출 합계 초당 상한 (0 이하면 제한 없음).
+        cache_path: 캐시 JSONL (None이면 캐시 없음).
+        refresh: True면 캐시를 읽지 않고 모두 다시 호출 (결과는 캐시에 덮어씀).
+        known_companies: 없는 회사 검사에 쓸 corpus 회사명 (None이면 facet 인덱스의 회사 목록, 인덱스가 없으면 머리줄만 검사).
+
+    Returns:
+        (질의별 결과 목록, 요약 dict)
+    """
+    from RAG.Generate.generate import DEFAULT_MODEL
+    from RAG.Generate.prompt import prompt_cache_key
+
+    model_name = model or os.environ.get("RAG_CHAT_MODEL") or DEFAULT_MODEL
+    # system prompt가 바뀌면 이전 답변(과 그 답변의 judge 판정)을 다시 쓰지 않도록 답변 키에 포함
+    prompt_version = prompt_cache_key()
+    if known_companies is None:
+        from service.facets import get_facet_index
+
+        index = get_facet_index()
+        known_companies = [company for company, _ in index.values("company")] if index is not None else []
+    cache = GenerationCache(cache_path)
+    limiter = RateLimiter(requests_per_sec)
+    counters = {"answer_hits": 0, "answer_calls": 0, "judge_hits": 0, "judge_calls": 0, "errors": 0}
+    usage_total = {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    answer_latencies: list[float] = []
+    lock = threading.Lock()
+    done = [0]
+
+    def _cached_call(key: str, kind: str, fn: Callable[[], dict[str, Any]], **fields: Any) -> dict[str, Any]:
+        value = None if refresh else cache.get(key)
+        if value is not None:
+            with lock:
+                counters[f"{kind}_hits"] += 1
+            return value
+        limiter.acquire()
+        value = fn()
+        with lock:
+            counters[f"{kind}_calls"] += 1
+            for name in usage_total:
+                usage_total[name] += int((value.get("usage") or {}).get(name, 0))
+            if kind == "answer" and value.get("route") == "llm":
+                answer_latencies.append(value["latency_ms"])
+        cache.put(key, kind, value, **fields)
+        return value
+
+    def _run(item: dict[str, Any]) -> dict[str, Any]:
+        query = item.get("query") or ""
+        relevant_ids = list(item.get("relevant_source_row_ids") or [])
+        result: dict[str, Any] = {"query": query, "relevant_source_row_ids": relevant_ids}
+        try:
+            ctx = build_eval_context(
+                query,
+                model_name,
+                {key: item.get(key) for key in FILTER_KEYS},
+                retrieve_limit=retrieve_limit,
+                max_distance=max_distance,
+                use_rerank=use_rerank,
+                rerank_top_k=rerank_top_k,
+                context_tokens=context_tokens,
+            )
+            answer = _cached_call(
+                GenerationCache.key("answer", model_name, answer_mode or "", prompt_version, query, ctx["context_hash"]),
+                "answer",
+                lambda: answer_for_context(query, ctx, model_name, answer_mode),
+                model=model_name,
+                query=query,
+                context_hash=ctx["context_hash"],
+            )
+            result.update(
+                context_hash=ctx["context_hash"],
+                sources=[
+                    {k: (s.get("metadata") or {}).get(k) for k in ("source_row_id", "company", "job_role")}
+                    for s in ctx["sources"]
+                ],
+                answer=answer["answer"],
+                route=answer["route"],
+                checks=offline_checks(answer["answer"], ctx["sources"], ctx["group_texts"], relevant_ids, known_companies),
+            )
+            if judge_model and ctx["context"]:
+                verdict = _cached_call(
+                    GenerationCache.key("judge", judge_model, query, ctx["context_hash"], _sha1(answer["answer"])),
+                    "judge",
+                    lambda: judge_answer(query, ctx["context"], answer["answer"], judge_model),
+                    model=judge_model,
+                    query=query,
+                    context_hash=ctx["context_hash"],
+                )
+                result["judge"] = {name: verdict.get(name) for name in (*JUDGE_SCORES, "reason")}
+        except Exception as e:
+            with lock:
+                counters["errors"] += 1
+            result["error"] = f"{type(e).__name__}: {e}"
+        with lock:
+            done[0] += 1
+            if progress:
+                progress(done[0], len(eval_data))
+        return result
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(_run, eval_data))
+    wall_sec = time.perf_counter() - started
+
+    checked = [r["checks"] for r in results if "checks" in r]
+    answered = [c for c in checked if not c["no_result"]]
+    verified = [c for c in answered if not c["unchecked"]]
+    summary: dict[str, Any] = {
+        "n_queries": len(results),
+        "n_errors": counters["errors"],
+        "model": model_name,
+        "judge_model": judge_model,
+        "hallucination_rate": round(sum(1 for c in verified if c["hallucinated"]) / len(verified), 4) if verified else None,
+        "unchecked_answers": len(answered) - len(verified),
+        "hallucinated_citations": sum(len(c["hallucinated"] or ()) for c in checked),
+        "misnumbered_citations": sum(c["misnumbered"] for c in checked),
+        "coverage": _mean([c["coverage"] for c in verified]),
+        "source_recall": _mean([c["source_recall"] for c in answered]),
+        "relevant_precision": _mean([c["relevant_precision"] for c in answered]),
+        "no_result_rate": round(1 - len(answered) / len(checked), 4) if checked else None,
+        "judge": {
+            name: _mean([(r.get("judge") or {}).get(name) for r in results]) for name in JUDGE_SCORES
+        } if judge_model else None,
+        "cache": {**{k: v for k, v in counters.items() if k != "errors"}, "entries": len(cache)},
+        "usage": usage_total,
+        "answer_latency_ms": _latency_summary(answer_latencies),
+        "wall_sec": round(wall_sec, 2),
+    }
+    return results, summary
+
+
+def _fmt(value: Any) -> str:
+    return "-" if value is None else (f"{value:.3f}" if isinstance(value, float) else str(value))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="답변 품질 평가: 답변 캐시 + 병렬 생성·judge + 오프라인 근거 검사")
+    parser.add_argument("eval_path", nargs="?", default=None, help="평가 세트 JSON/JSONL (기본 eval_sample.json)")
+    parser.add_argument("--model", default=None, help="답변 모델 (기본 RAG_CHAT_MODEL 또는 gpt-4o-mini)")
+    parser.add_argument("--judge-model", default=None, dest="judge_model", help="LLM judge 모델 (미지정 시 오프라인 검사만)")
+    parser.add_argument("--answer-mode", choices=("auto", "llm", "extractive"), default=None, dest="answer_mode", help="답변 경로 (기본 RAG_ANSWER_MODE 또는 auto)")
+    parser.add_argument("--retrieve-limit", type=int, default=20, dest="retrieve_limit")
+    parser.add_argument("--max-distance", type=float, default=None, dest="max_distance")
+    parser.add_argument("--no-rerank", action="store_true", help="Rerank 미사용")
+    parser.add_argument("--rerank-top-k", type=int, default=5, dest="rerank_top_k", help="참고 공고 최대 건수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 실행 질의 수")
+    parser.add_argument("--rps", type=float, default=2.0, help="답변·judge API 초당 호출 상한 (0이면 제한 없음)")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), help="답변·judge 캐시 JSONL 경로")
+    parser.add_argument("--no-cache", action="store_true", help="캐시 읽기·쓰기 모두 안 함")
+    parser.add_argument("--refresh", action="store_true", help="캐시를 무시하고 다시 호출 (결과는 캐시에 기록)")
+    parser.add_argument("--out", default=None, help="질의별 결과 JSONL 경로")
+    parser.add_argument("--show", type=int, default=5, help="문제가 있는 질의 출력 건수")
+    args = parser.parse_args()
+
+    path = args.eval_path or str(Path(__file__).resolve().parent / "eval_sample.json")
+    eval_data = load_eval_data(path)
+    if not eval_data:
+        print("평가 데이터가 없습니다.")
+        return
+
+    from RAG.Retriever import init_pg_pool
+    from RAG.Retriever.memory import use_memory_backend
+
+    if args.concurrency > 1 and not use_memory_backend():
+        init_pg_pool(maxconn=args.concurrency)
+
+    results, summary = evaluate_generation(
+        eval_data,
+        model=args.model,
+        judge_model=args.judge_model,
+        answer_mode=args.answer_mode,
+        retrieve_limit=args.retrieve_limit,
+        max_distance=args.max_distance,
+        use_rerank=not args.no_rerank,
+        rerank_top_k=args.rerank_top_k,
+        concurrency=args.concurrency,
+        requests_per_sec=args.rps,
+        cache_path=None if args.no_cache else args.cache,
+        refresh=args.refresh,
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+    c = summary["cache"]
+    print(
+        f"\n답변 {c['answer_calls']}건 호출 · {c['answer_hits']}건 캐시"
+        + (f" / judge {c['judge_calls']}건 호출 · {c['judge_hits']}건 캐시" if args.judge_model else "")
+        + f" · {summary['wall_sec']:.1f}초"
+    )
+    print(
+        f"hallucination {_fmt(summary['hallucination_rate'])}  coverage {_fmt(summary['coverage'])}  "
+        f"source_recall {_fmt(summary['source_recall'])}  relevant_precision {_fmt(summary['relevant_precision'])}"
+        + (f"  (검사 불가 답변 {summary['unchecked_answers']}건)" if summary["unchecked_answers"] else "")
+    )
+    flagged = [
+        r for r in results
+        if r.get("error") or (r.get("checks") or {}).get("hallucinated") or (r.get("checks") or {}).get("misnumbered")
+    ]
+    for r in flagged[: args.show]:
+        checks = r.get("checks") or {}
+        detail = r.get("error") or f"없는 회사 {checks['hallucinated']} · 번호 불일치 {checks['misnumbered']}건"
+        print(f"  ! {r['query']}: {detail}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            for r in results:
+                f.write(json.dumps(r, ensure_ascii=False) + "\n")
+        print(f"결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+검색 파라미터 sweep: fetch_limit · max_distance · HNSW ef_search / IVFFlat probes · rerank_top_k 격자를 평가 세트로 돌려
+설정별 Recall@k와 지연 시간 분포를 기록하고, (지연 시간 ↓, recall ↑) Pareto frontier를 표/CSV로 출력.
+
+- 질의 임베딩은 처음 한 번만 계산해 캐시 → 설정 간 지연 시간 차이는 검색·Rerank만 반영 (임베딩 지연은 따로 표시)
+- 검색은 (fetch_limit, ef_search, probes) 조합마다 한 번. max_distance·rerank_top_k는 그 결과를 재사용해 적용
+  (retrieve의 max_distance는 정렬된 결과의 후처리 필터라 결과가 같음)
+
+CLI:
+    python -m RAG.Evaluate.sweep [eval_path] --k 10 --fetch-limit 50,100,200 --ef-search 40,100,200 \\
+        --max-distance none,0.6 --rerank-top-k 0,5,10 --slo-ms 300 --csv sweep.csv
+"""
+
+import argparse
+import csv
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, Sequence
+
+from .evaluate import _CachedEmbed, _latency_summary, _rerank_record, collect_rankings, compute_metrics, load_eval_data
+
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms", "mean_ms")
+_CSV_FIELDS = (
+    "fetch_limit", "ef_search", "probes", "max_distance", "rerank_top_k",
+    "recall", "hit", "mrr", "ndcg", *LATENCY_METRICS, "pareto",
+)
+
+
+def pareto_frontier(rows: list[dict[str, Any]], latency_key: str = "p95_ms", quality_key: str = "recall") -> list[dict[str, Any]]:
+    """지연 시간이 같거나 짧으면서 품질이 같거나 높은(하나는 엄격히) 다른 설정이 없는 행들 (지연 시간 오름차순)."""
+    ordered = sorted(rows, key=lambda r: (r[latency_key], -r[quality_key]))
+    frontier: list[dict[str, Any]] = []
+    best = float("-inf")
+    for row in ordered:
+        if row[quality_key] > best:
+            frontier.append(row)
+            best = row[quality_key]
+    return frontier
+
+
+def run_sweep(
+    eval_data: list[dict[str, Any]],
+    *,
+    k: int = 10,
+    fetch_limits: Sequence[Optional[int]] = (None,),
+    max_distances: Sequence[Optional[float]] = (None,),
+    ef_searches: Sequence[Optional[int]] = (None,),
+    probes_list: Sequence[Optional[int]] = (None,),
+    rerank_top_ks: Sequence[int] = (0,),
+    concurrency: int = 4,
+    embed_fn: Optional[Callable[[str], list[float]]] = None,
+) -> tuple[list[dict[str, Any]], dict[str, float]]:
+    """
+    격자 전체 평가. Returns: (설정별 행 목록, 질의 임베딩 지연 요약)
+    행: {"fetch_limit", "ef_search", "probes", "max_distance", "rerank_top_k",
+         "recall", "hit", "mrr", "ndcg", "p50_ms", "p95_ms", "p99_ms", "mean_ms"}
+    rerank_top_k 0은 Rerank 미사용 (검색 상위 k건으로 평가).
+    """
+    from RAG.Retriever import retrieve
+    from RAG.Retriever.retriever import _get_embed_fn
+
+    embed = _CachedEmbed(embed_fn or _get_embed_fn())
+    embed.prefetch([item.get("query") or "" for item in eval_data if item.get("relevant_source_row_ids")], concurrency)
+    embed_latency = _latency_summary(embed.latencies_ms)
+
+    def _rerank_all(records: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            return list(pool.map(lambda r: _rerank_record(r, None, k), records))
+
+    rows: list[dict[str, Any]] = []
+    first = True
+    for fetch_limit, ef_search, probes in itertools.product(fetch_limits, ef_searches, probes_list):
+        def _retrieve_fn(q: str, limit: int) -> list[dict[str, Any]]:
+            return retrieve(q, limit=limit, embed_fn=embed, fetch_limit=fetch_limit, ef_search=ef_search, probes=probes)
+
+        records, _ = collect_rankings(eval_data, _retrieve_fn, k, concurrency, warmup=first)
+        first = False
+        for max_distance in max_distances:
+            filtered = [
+                {**r, "ranked": [x for x in r["ranked"] if max_distance is None or x["distance"] <= max_distance]}
+                for r in records
+            ]
+            reranked = _rerank_all(filtered) if any(rerank_top_ks) else None
+            for top_k in rerank_top_ks:
+                if top_k:
+                    evaluated = [{**r, "ranked": r["ranked"][:top_k]} for r in reranked]
+                else:
+                    evaluated = filtered
+                latencies = [
+                    r["retrieve_ms"] + ((r.get("rerank_ms") or 0.0) if top_k else 0.0)
+                    for r in evaluated
+                    if r["retrieve_ms"] is not None
+                ]
+                m = compute_metrics(evaluated, [k])[k]
+                rows.append({
+                    "fetch_limit": fetch_limit,
+                    "ef_search": ef_search,
+                    "probes": probes,
+                    "max_distance": max_distance,
+                    "rerank_top_k": top_k,
+                    **m,
+                    **_latency_summary(latencies),
+                })
+    return rows, embed_latency
+
+
+def _parse_grid(cast: Callable[[str], Any]) -> Callable[[str], list[Any]]:
+    """ "none,50,100" → [None, 50, 100] (none/auto는 기본값)."""
+
+    def _parse(text: str) -> list[Any]:
+        values = []
+        for part in text.split(","):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                values.append(None if part.lower() in ("none", "auto") else cast(part))
+            except ValueError:
+                raise argparse.ArgumentTypeError(f"잘못된 값: {part}")
+        if not values:
+            raise argparse.ArgumentTypeError("값이 비어 있습니다.")
+        return values
+
+    return _parse
+
+
+def _fmt(value: Any) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.3f}" if value < 10 else f"{value:.1f}"
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="검색 파라미터 sweep: 설정별 Recall@k·지연 시간과 Pareto frontier")
+    parser.add_argument("eval_path", nargs="?", default=None, help="평가 세트 JSON/JSONL (기본 eval_sample.json)")
+    parser.add_argument("--k", type=int, default=10, help="Recall@k의 k (retrieve limit)")
+    parser.add_argument("--fetch-limit", type=_parse_grid(int), default=[None], dest="fetch_limits", help="중복 제거 전 후보 건수 (예: auto,50,200)")
+    parser.add_argument("--max-distance", type=_parse_grid(float), default=[None], dest="max_distances", help="distance 상한 (예: none,0.6,0.7)")
+    parser.add_argument("--ef-search", type=_parse_grid(int), default=[None], dest="ef_searches", help="HNSW hnsw.ef_search (예: 40,100)")
+    parser.add_argument("--probes", type=_parse_grid(int), default=[None], dest="probes_list", help="IVFFlat ivfflat.probes (예: 1,10)")
+    parser.add_argument("--rerank-top-k", type=_parse_grid(int), default=[0], dest="rerank_top_ks", help="Rerank 후 건수, 0은 Rerank 미사용 (예: 0,5,10)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 실행 질의 수")
+    parser.add_argument("--latency", choices=LATENCY_METRICS, default="p95_ms", help="Pareto·SLO 기준 지연 지표 (기본 p95_ms)")
+    parser.add_argument("--slo-ms", type=float, default=None, help="지연 SLO(ms): 이 안에서 recall이 가장 높은 설정 표시")
+    parser.add_argument("--csv", default=None, dest="csv_path", help="전체 결과 CSV 경로 (pareto 열 포함)")
+    args = parser.parse_args()
+
+    path = args.eval_path or str(Path(__file__).resolve().parent / "eval_sample.json")
+    eval_data = load_eval_data(path)
+    if not eval_data:
+        print("평가 데이터가 없습니다.")
+        return
+
+    from RAG.Retriever import init_pg_pool
+    from RAG.Retriever.memory import use_memory_backend
+
+    if not use_memory_backend():
+        init_pg_pool(maxconn=max(1, args.concurrency))
+
+    rows, embed_latency = run_sweep(
+        eval_data,
+        k=args.k,
+        fetch_limits=args.fetch_limits,
+        max_distances=args.max_distances,
+        ef_searches=args.ef_searches,
+        probes_list=args.probes_list,
+        rerank_top_ks=[t or 0 for t in args.rerank_top_ks],
+        concurrency=args.concurrency,
+    )
+    frontier = pareto_frontier(rows, args.latency)
+    frontier_ids = {id(r) for r in frontier}
+    for r in rows:
+        r["pareto"] = id(r) in frontier_ids
+
+    print(f"질의 {len(eval_data)}건 · 설정 {len(rows)}개 · 질의 임베딩 p50 {embed_latency['p50_ms']:.1f}ms (캐시, 아래 지연 시간에서 제외)")
+    header = ["fetch", "ef", "probes", "max_dist", "rerank", f"R@{args.k}", "Hit", "MRR", "nDCG", "p50", "p95", "p99", ""]
+    print("  ".join(f"{h:>8}" for h in header))
+    for r in sorted(rows, key=lambda r: r[args.latency]):
+        cells = [
+            r["fetch_limit"], r["ef_search"], r["probes"], r["max_distance"], r["rerank_top_k"] or None,
+            r["recall"], r["hit"], r["mrr"], r["ndcg"], r["p50_ms"], r["p95_ms"], r["p99_ms"],
+        ]
+        print("  ".join(f"{_fmt(c):>8}" for c in cells) + ("  * pareto" if r["pareto"] else ""))
+
+    if args.slo_ms is not None:
+        within = [r for r in frontier if r[args.latency] <= args.slo_ms]
+        if within:
+            best = within[-1]  # frontier는 지연 시간 오름차순·recall 증가 → SLO 안의 마지막이 최고 recall
+            print(
+                f"\nSLO {args.latency} ≤ {args.slo_ms:.0f}ms 최고 recall: R@{args.k} {best['recall']:.3f} "
+                f"({args.latency} {best[args.latency]:.1f}ms) — fetch_limit={_fmt(best['fetch_limit'])}, "
+                f"ef_search={_fmt(best['ef_search'])}, probes={_fmt(best['probes'])}, "
+                f"max_distance={_fmt(best['max_distance'])}, rerank_top_k={best['rerank_top_k'] or '-'}"
+            )
+        else:
+            print(f"\nSLO {args.latency} ≤ {args.slo_ms:.0f}ms를 만족하는 설정이 없습니다.")
+
+    if args.csv_path:
+        with open(args.csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=_CSV_FIELDS)
+            writer.writeheader()
+            for r in rows:
+                writer.writerow({key: r[key] for key in _CSV_FIELDS})
+        print(f"CSV 저장: {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 # Generate: 검색 결과를 context로 LLM 답변 생성
-from .generate import generate
+from .generate import generate, generate_stream
+from .hedge import get_hedge_stats
+from .prompt import get_prompt_cache_stats
 
-__all__ = ["generate"]
+__all__ = ["generate", "generate_stream", "get_hedge_stats", "get_prompt_cache_stats"]
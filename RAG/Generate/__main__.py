@@ -3,8 +3,9 @@ CLI: python -m RAG.Generate "질문" [--no-rerank] [--company 회사명] [--care
 """
 import argparse
 import json
+import sys
 
-from .generate import generate
+from .generate import generate, generate_stream
 
 
 def main() -> None:
@@ -14,28 +15,58 @@ def main() -> None:
     parser.add_argument("--job-role", default=None, dest="job_role", help="직무 필터")
     parser.add_argument("--career-type", default=None, dest="career_type", help="경력 여부 (신입/경력/무관)")
     parser.add_argument("--company-years", default=None, dest="company_years_num", help="회사 규모/업력 필터")
+    parser.add_argument("--location", default=None, help="근무지역 필터 (예: 서울, \"서울 강남구\")")
+    parser.add_argument("--company-years-min", type=int, default=None, dest="company_years_min", help="업력 하한 (년차, 포함)")
+    parser.add_argument("--company-years-max", type=int, default=None, dest="company_years_max", help="업력 상한 (년차, 포함)")
     parser.add_argument("--retrieve-limit", type=int, default=20, help="Retriever 상위 건수")
     parser.add_argument("--no-rerank", action="store_true", help="Rerank 비활성화")
     parser.add_argument("--rerank-top-k", type=int, default=5, dest="rerank_top_k", help="Rerank 후 context 건수")
     parser.add_argument("--model", default=None, help="OpenAI 채팅 모델 (기본 gpt-4o-mini)")
+    parser.add_argument("--context-tokens", type=int, default=None, dest="context_tokens", help="context 토큰 예산 (기본: 모델별)")
+    parser.add_argument("--deadline", type=float, default=None, dest="deadline_sec", help="전체 마감(초). 첫 토큰 전 초과 시 추출형 답변")
+    parser.add_argument("--hedge-delay", type=float, default=None, dest="hedge_delay_sec", help="첫 토큰 대기(초) 초과 시 hedge 요청")
+    parser.add_argument("--hedge-model", default=None, dest="hedge_model", help="hedge 요청 모델 (기본: --model과 동일)")
+    parser.add_argument("--answer-mode", default=None, choices=["auto", "llm", "extractive"], dest="answer_mode", help="답변 방식 (기본 auto: 목록형 질문은 LLM 없이 추출형)")
     parser.add_argument("--json", action="store_true", dest="output_json", help="전체 결과를 JSON으로 출력")
     args = parser.parse_args()
 
-    result = generate(
-        args.query,
+    kwargs = dict(
         company=args.company,
         job_role=args.job_role,
         career_type=args.career_type,
         company_years_num=args.company_years_num,
+        location=args.location,
+        company_years_min=args.company_years_min,
+        company_years_max=args.company_years_max,
         retrieve_limit=args.retrieve_limit,
         use_rerank=not args.no_rerank,
         rerank_top_k=args.rerank_top_k,
         model=args.model,
+        context_tokens=args.context_tokens,
+        deadline_sec=args.deadline_sec,
+        hedge_delay_sec=args.hedge_delay_sec,
+        hedge_model=args.hedge_model,
+        answer_mode=args.answer_mode,
     )
     if args.output_json:
+        result = generate(args.query, **kwargs)
         print(json.dumps(result, ensure_ascii=False, indent=2))
-    else:
-        print(result["answer"])
+        return
+
+    # 답변 토큰을 도착하는 대로 출력, 지연 시간은 stderr로
+    for event in generate_stream(args.query, **kwargs):
+        if event["type"] == "token":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "done":
+            print()
+            ttft = event["ttft_sec"]
+            ttft_s = f"{ttft:.2f}s" if ttft is not None else "-"
+            usage = event["usage"]
+            print(
+                f"[{event['llm']['route']} / 첫 토큰 {ttft_s} / 전체 {event['latency_sec']:.2f}s / "
+                f"prompt {usage['prompt_tokens']}토큰 (캐시 {usage['cached_tokens']})]",
+                file=sys.stderr,
+            )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,182 @@
+"""
+Context 구성: 토큰 예산(모델별) + 공고별 토큰 상한으로 LLM context를 채움.
+질문과 관련된 chunk 그룹(기본 주요업무)만 넣어 프롬프트 토큰을 줄이고, 같은 예산에 더 많은 공고를 담음.
+tiktoken이 있으면 실제 토크나이저로 세고, 없으면 한국어 기준 보수적 추정치 사용.
+"""
+
+import os
+import re
+from functools import lru_cache
+from typing import Any, Optional
+
+# 모델별 context 토큰 예산 (system/질문/답변 토큰은 별도). RAG_CONTEXT_TOKENS로 덮어쓰기 가능
+CONTEXT_TOKEN_BUDGETS = {
+    "gpt-4o-mini": 3000,
+    "gpt-4o": 3000,
+    "gpt-4.1-mini": 3000,
+    "gpt-4.1-nano": 2000,
+    "gpt-3.5-turbo": 2000,
+}
+DEFAULT_CONTEXT_TOKENS = 2500
+# 공고 1건이 context를 독차지하지 않도록 공고별 상한
+DEFAULT_PER_SOURCE_TOKENS = 400
+# 남은 예산이 이보다 작으면 잘린 공고를 넣지 않고 종료
+MIN_SOURCE_TOKENS = 40
+
+# 질문 키워드 → 추가로 넣을 chunk 그룹 (service.chunking.CHUNK_GROUPS 그룹명)
+DEFAULT_GROUPS = ["주요업무"]
+GROUP_KEYWORDS = {
+    "직무/경력": ("경력", "신입", "학력", "업력", "연차", "년차"),
+    "기술스택": ("기술", "스택", "언어", "프레임워크", "사용하는"),
+    "자격요건": ("자격", "요건", "필수"),
+    "조건": ("우대", "복지", "혜택", "근무지", "지역", "위치", "마감", "채용절차", "전형"),
+}
+GROUP_ORDER = ["직무/경력", "기술스택", "주요업무", "자격요건", "조건"]
+
+_RE_HANGUL = re.compile(r"[가-힣]")
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """모델별 tiktoken 인코딩. tiktoken 미설치 시 None."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str) -> int:
+    """text의 토큰 수. tiktoken 없으면 한글 1자≈1토큰, 그 외 4자≈1토큰으로 추정 (실제보다 약간 많게)."""
+    if not text:
+        return 0
+    enc = _get_encoding(model)
+    if enc is not None:
+        return len(enc.encode(text))
+    hangul = len(_RE_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """text를 max_tokens 이하로 자름 (줄 단위 우선, 안 되면 토큰 단위)."""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    kept: list[str] = []
+    used = 0
+    for line in text.split("\n"):
+        n = count_tokens(line + "\n", model)
+        if used + n > max_tokens:
+            break
+        kept.append(line)
+        used += n
+    if kept:
+        return "\n".join(kept)
+    # 첫 줄부터 예산 초과: 토큰(또는 글자) 단위로 자름
+    enc = _get_encoding(model)
+    if enc is not None:
+        return enc.decode(enc.encode(text)[:max_tokens])
+    cut = len(text)
+    while cut > 0 and count_tokens(text[:cut], model) > max_tokens:
+        cut = cut * 3 // 4
+    return text[:cut]
+
+
+def context_token_budget(model: str) -> int:
+    """모델별 context 토큰 예산 (RAG_CONTEXT_TOKENS 환경변수 우선)."""
+    env = os.environ.get("RAG_CONTEXT_TOKENS")
+    if env and env.isdigit():
+        return int(env)
+    return CONTEXT_TOKEN_BUDGETS.get(model, DEFAULT_CONTEXT_TOKENS)
+
+
+def select_chunk_groups(query: str) -> list[str]:
+    """질문에 필요한 chunk 그룹. 기본은 주요업무만 (system prompt가 주요업무 나열을 요구), 키워드가 있으면 해당 그룹 추가."""
+    groups = set(DEFAULT_GROUPS)
+    for group, keywords in GROUP_KEYWORDS.items():
+        if any(k in query for k in keywords):
+            groups.add(group)
+    return [g for g in GROUP_ORDER if g in groups]
+
+
+def source_text(
+    item: dict[str, Any],
+    groups: list[str],
+    group_texts: Optional[dict[str, str]] = None,
+) -> str:
+    """공고 1건에서 context에 넣을 본문: 관련 그룹 텍스트 → 없으면 검색된 chunk 본문."""
+    group_texts = dict(group_texts or {})
+    meta = item.get("metadata") or {}
+    own_group = meta.get("chunk_group")
+    if own_group in groups and own_group not in group_texts:
+        group_texts[own_group] = (item.get("text") or "").strip()
+    parts = [group_texts[g] for g in groups if group_texts.get(g)]
+    if parts:
+        return "\n\n".join(parts)
+    return (item.get("text") or "").strip()
+
+
+def build_context(
+    items: list[dict[str, Any]],
+    model: str,
+    *,
+    groups: Optional[list[str]] = None,
+    group_texts: Optional[dict[tuple[Any, ...], dict[str, str]]] = None,
+    job_key=None,
+    token_budget: Optional[int] = None,
+    per_source_tokens: int = DEFAULT_PER_SOURCE_TOKENS,
+) -> tuple[str, dict[str, Any]]:
+    """
+    공고 목록을 토큰 예산 안에서 context 문자열로 합침.
+    공고별로 per_source_tokens까지 자르고, 전체 예산이 남는 동안 순서대로 추가.
+
+    Args:
+        items: 중복 제거·정렬된 참고 공고.
+        model: 토큰 계산 기준 채팅 모델.
+        groups: 넣을 chunk 그룹 (None이면 DEFAULT_GROUPS).
+        group_texts: job_key(item) → {그룹명: 텍스트} (Retriever.fetch_chunk_groups 결과).
+        job_key: group_texts 조회용 키 함수.
+        token_budget: 전체 토큰 예산 (None이면 context_token_budget(model)).
+        per_source_tokens: 공고별 토큰 상한.
+
+    Returns:
+        (context, {"context_tokens", "token_budget", "n_sources", "n_truncated", "groups"})
+    """
+    groups = groups or list(DEFAULT_GROUPS)
+    budget = token_budget if token_budget is not None else context_token_budget(model)
+    parts: list[str] = []
+    used = 0
+    n_truncated = 0
+    sep_tokens = count_tokens("\n\n", model)
+    for i, item in enumerate(items, 1):
+        meta = item.get("metadata") or {}
+        header = f"[{i}] (회사: {meta.get('company') or ''}, 직무: {meta.get('job_role') or ''})"
+        texts = (group_texts or {}).get(job_key(item)) if (group_texts and job_key) else None
+        body = source_text(item, groups, texts)
+        if not body:
+            continue
+        header_tokens = count_tokens(header + "\n", model)
+        remaining = budget - used - header_tokens - (sep_tokens if parts else 0)
+        if remaining < MIN_SOURCE_TOKENS:
+            break
+        cap = min(per_source_tokens, remaining)
+        clipped = truncate_to_tokens(body, cap, model)
+        if not clipped:
+            continue
+        if clipped != body:
+            n_truncated += 1
+        line = f"{header}\n{clipped}"
+        used += count_tokens(line, model) + (sep_tokens if parts else 0)
+        parts.append(line)
+    context = "\n\n".join(parts)
+    return context, {
+        "context_tokens": used,
+        "token_budget": budget,
+        "n_sources": len(parts),
+        "n_truncated": n_truncated,
+        "groups": groups,
+    }
@@ -0,0 +1,80 @@
+"""
+추출형 답변: LLM 없이 참고 공고의 주요업무를 그대로 나열한 답변 생성 (공고마다 '[번호] 회사 · 직무' + 주요업무 목록).
+- 목록형 질문("신입 백엔드 채용하는 회사 알려줘")은 system prompt가 어차피 주요업무 나열만 요구하므로 LLM 없이 바로 답변
+- LLM 호출이 deadline을 넘겼을 때의 대체 답변
+"""
+
+import re
+from typing import Any, Callable, Optional
+
+from .context import source_text
+
+MAIN_TASK_GROUP = "주요업무"
+_MAIN_TASK_PREFIX = "주요업무:"
+
+
+def _task_lines(text: str) -> list[str]:
+    """'주요업무: ...' 블록을 항목 목록으로 (레이블·불릿 제거, 빈 줄 제외)."""
+    lines = []
+    for raw in text.split("\n"):
+        line = raw.strip()
+        if line.startswith(_MAIN_TASK_PREFIX):
+            line = line[len(_MAIN_TASK_PREFIX):].strip()
+        line = line.lstrip("-•· ").strip()
+        if line:
+            lines.append(line)
+    return lines
+
+
+def extractive_answer(
+    sources: list[dict[str, Any]],
+    group_texts: Optional[dict[tuple[Any, ...], dict[str, str]]] = None,
+    job_key: Optional[Callable[[dict[str, Any]], tuple[Any, ...]]] = None,
+) -> str:
+    """
+    참고 공고별 '[번호] 회사 · 직무' + 주요업무 항목 목록.
+    주요업무 chunk가 없는 공고는 제외 (원문에 없는 업무를 만들지 않음).
+    """
+    blocks = []
+    for i, item in enumerate(sources, 1):
+        meta = item.get("metadata") or {}
+        texts = (group_texts or {}).get(job_key(item)) if (group_texts and job_key) else None
+        if not (texts and texts.get(MAIN_TASK_GROUP)) and meta.get("chunk_group") != MAIN_TASK_GROUP:
+            continue
+        lines = _task_lines(source_text(item, [MAIN_TASK_GROUP], texts))
+        if not lines:
+            continue
+        header = f"[{i}] {meta.get('company') or '-'} · {meta.get('job_role') or '-'}"
+        blocks.append(header + "\n" + "\n".join(f"- {line}" for line in lines))
+    if not blocks:
+        return "질문과 관련된 채용 공고를 찾지 못했습니다."
+    return "\n\n".join(blocks)
+
+
+# 목록형 질문 판별 규칙: 공고/회사를 가리키는 말 + 나열 요청 표현이 있고, 추론·비교·다른 항목 요청이 없으면 목록형
+_RE_POSTING_CUE = re.compile(r"회사|공고|채용|기업|곳|포지션|자리|뽑|구인|모집")
+_RE_LIST_CUE = re.compile(r"알려|보여|찾아|목록|리스트|나열|어디|어떤\s*(회사|곳|공고)|있(어|나|니|을까|는지)|뭐(가|야|있)")
+_RE_NEEDS_LLM = re.compile(
+    r"비교|차이|왜|어떻게|방법|추천|준비|전망|장단점|장점|단점|요약|분석|설명|조언|가능(할까|한가|해)|"
+    r"연봉|급여|자격|요건|우대|복지|혜택|기술\s*스택|스택|마감|절차|전형|면접"
+)
+
+
+def is_listing_query(query: str) -> tuple[bool, str]:
+    """
+    질문이 '공고 나열'형인지 규칙으로 판별 (수 μs).
+    Returns: (목록형 여부, 판별 근거 문자열 — 라우팅 로그용)
+    """
+    q = query.strip()
+    if not q:
+        return False, "empty"
+    needs = _RE_NEEDS_LLM.search(q)
+    if needs:
+        return False, f"needs_llm:{needs.group()}"
+    posting = _RE_POSTING_CUE.search(q)
+    if not posting:
+        return False, "no_posting_cue"
+    listing = _RE_LIST_CUE.search(q)
+    if not listing:
+        return False, "no_list_cue"
+    return True, f"listing:{posting.group()}+{listing.group()}"
@@ -2,17 +2,31 @@
 Generate: Retriever(및 Rerank) 결과를 context로 LLM에 넣어 답변 생성.
 """
 
-import re
+import logging
 import os
+import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from dotenv import load_dotenv
 
+from RAG.tracing import Trace
+from service.sort_keys import content_hash, parse_company_years, parse_deadline_date
+from .context import build_context, select_chunk_groups
+from .extractive import extractive_answer, is_listing_query
+from .hedge import DeadlineExceeded, hedged_stream
+from .prompt import build_messages, prompt_cache_key, record_usage, usage_to_dict
+
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
 
 DEFAULT_MODEL = "gpt-4o-mini"
+# 답변 방식: auto(목록형 질문은 추출형, 그 외 LLM) / llm / extractive
+ANSWER_MODES = ("auto", "llm", "extractive")
+# 추출형으로 답할 수 있는 질문의 chunk 그룹 (직무/경력은 신입·경력 등 공고 선별 단서일 뿐 답변 항목이 아님)
+_EXTRACTIVE_GROUPS = {"주요업무", "직무/경력"}
+
+logger = logging.getLogger(__name__)
 
 
 def _job_key(item: dict[str, Any]) -> tuple[Any, ...]:
@@ -26,66 +40,40 @@ def _job_key(item: dict[str, Any]) -> tuple[Any, ...]:
     return (c, j)
 
 
-def _importance_sort_key(item: dict[str, Any]) -> tuple[float, int, int]:
-    """참고 공고 정렬: 관련도(rerank_score) → 마감일(늦을수록 우선) → 회사 업력(길수록 우선)."""
+def _importance_sort_key(item: dict[str, Any]) -> tuple[float, str, int]:
+    """
+    참고 공고 정렬: 관련도(rerank_score) → 마감일(늦을수록 우선) → 회사 업력(길수록 우선).
+    ingest 때 계산된 deadline_date(ISO 문자열이라 문자열 비교 = 날짜 비교)·company_years 사용,
+    예전 적재분처럼 없으면 같은 규칙으로 계산. 값이 없으면 ""/0 (앞에 오지 않게).
+    """
     score = float(item.get("rerank_score") or 0)
     meta = item.get("metadata") or {}
-    # 마감일: YYYY-MM-DD 등에서 숫자만 추출해 20260219 형태, 없으면 0 (앞에 오지 않게)
-    deadline_s = str(meta.get("deadline") or "")
-    digits = re.sub(r"\D", "", deadline_s)[:8]
-    deadline_ord = int(digits) if len(digits) >= 8 else 0
-    # 회사 업력: "18년차" 등에서 숫자 추출
-    cy_s = str(meta.get("company_years_num") or "")
-    cy_match = re.search(r"\d+", cy_s)
-    company_years = int(cy_match.group()) if cy_match else 0
-    return (score, deadline_ord, company_years)
-
-
-def _build_context(items: list[dict[str, Any]], max_chars: int = 6000) -> str:
-    """검색된 청크들을 하나의 context 문자열로 합침 (호출측에서 공고 중복 제거된 리스트 전달)."""
-    parts = []
-    total = 0
-    for i, item in enumerate(items, 1):
-        text = (item.get("text") or "").strip()
-        meta = item.get("metadata") or {}
-        company = meta.get("company") or ""
-        job_role = meta.get("job_role") or ""
-        line = f"[{i}] (회사: {company}, 직무: {job_role})\n{text}"
-        if total + len(line) + 2 > max_chars:
-            break
-        parts.append(line)
-        total += len(line) + 2
-    return "\n\n".join(parts) if parts else ""
+    deadline = meta["deadline_date"] if "deadline_date" in meta else parse_deadline_date(meta.get("deadline"))
+    years = meta["company_years"] if "company_years" in meta else parse_company_years(meta.get("company_years_num"))
+    return (score, deadline or "", years or 0)
 
 
-def generate(
-    query: str,
-    *,
-    company: Optional[str] = None,
-    job_role: Optional[str] = None,
-    career_type: Optional[str] = None,
-    company_years_num: Optional[str] = None,
-    retrieve_limit: int = 20,
-    max_distance: Optional[float] = None,
-    use_rerank: bool = True,
-    rerank_top_k: int = 5,
-    model: Optional[str] = None,
-) -> dict[str, Any]:
-    """
-    질의 → Retriever(옵션 Rerank) → context 구성 → LLM 답변 생성.
+def _content_key(item: dict[str, Any]) -> str:
+    """동일 본문 판별 키: ingest 때 계산된 content_hash (없으면 계산)."""
+    return (item.get("metadata") or {}).get("content_hash") or content_hash(item.get("text"))
 
-    Args:
-        query: 사용자 질문.
-        company, job_role, career_type, company_years_num: Retriever 메타 필터.
-        retrieve_limit: Retriever 상위 건수.
-        max_distance: Retriever에서 이 값보다 큰 distance 제외 (None이면 미적용).
-        use_rerank: True면 Rerank 적용 후 상위 rerank_top_k만 context에 사용.
-        rerank_top_k: Rerank 후 context에 넣을 건수 (기본 5).
-        model: OpenAI 채팅 모델 (미지정 시 gpt-4o-mini).
 
-    Returns:
-        {"answer": str, "sources": list[dict], "context_length": int}
-    """
+def _select_sources(
+    query: str,
+    *,
+    company: Optional[str],
+    job_role: Optional[str],
+    career_type: Optional[str],
+    company_years_num: Optional[str],
+    location: Optional[str],
+    company_years_min: Optional[int],
+    company_years_max: Optional[int],
+    retrieve_limit: int,
+    max_distance: Optional[float],
+    use_rerank: bool,
+    rerank_top_k: int,
+) -> list[dict[str, Any]]:
+    """Retriever(옵션 Rerank) → 공고 중복·회사명 없음·동일 본문 제거 → 중요도 순 상위 rerank_top_k건."""
     from RAG.Retriever import retrieve
     from RAG.Rerank import rerank
 
@@ -95,6 +83,9 @@ def generate(
         job_role=job_role,
         career_type=career_type,
         company_years_num=company_years_num,
+        location=location,
+        company_years_min=company_years_min,
+        company_years_max=company_years_max,
         limit=retrieve_limit,
         max_distance=max_distance,
     )
@@ -120,67 +111,320 @@ def generate(
     deduped_items = [it for it in deduped_items if _has_company(it)]
 
     # 내용이 동일한 항목 제거 (같은 주요업무가 다른 직무로 중복 노출되는 것 방지)
-    seen_texts: set[str] = set()
+    seen_hashes: set[str] = set()
     unique_items: list[dict[str, Any]] = []
     for it in deduped_items:
-        text_key = (it.get("text") or "").strip()
-        if not text_key or text_key in seen_texts:
+        if not (it.get("text") or "").strip():
+            continue
+        text_key = _content_key(it)
+        if text_key in seen_hashes:
             continue
-        seen_texts.add(text_key)
+        seen_hashes.add(text_key)
         unique_items.append(it)
     # 중요한/많이 볼 법한 순: 관련도 → 마감일(늦을수록) → 회사 업력(길수록)
     unique_items.sort(key=_importance_sort_key, reverse=True)
-    deduped_items = unique_items[: max(rerank_top_k, 1)]
+    return unique_items[: max(rerank_top_k, 1)]
+
+
+def _fetch_group_texts(
+    sources: list[dict[str, Any]],
+    groups: list[str],
+) -> dict[tuple[Any, ...], dict[str, str]]:
+    """참고 공고의 관련 chunk 그룹 본문 조회. 검색된 chunk가 이미 유일한 필요 그룹이면 조회 생략."""
+    if len(groups) == 1 and all((s.get("metadata") or {}).get("chunk_group") in groups for s in sources):
+        return {}
+    from RAG.Retriever import fetch_chunk_groups
+
+    try:
+        return fetch_chunk_groups(sources, groups)
+    except Exception as e:
+        print(f"chunk 그룹 조회 실패 → 검색된 chunk 본문만 사용: {e}")
+        return {}
+
+
+def _route_answer(query: str, answer_mode: Optional[str], groups: list[str]) -> tuple[str, str]:
+    """답변 경로 결정 ("extractive" | "llm", 근거). 결정은 로그(RAG.Generate.generate)와 trace에 남김."""
+    mode = answer_mode or os.environ.get("RAG_ANSWER_MODE") or "auto"
+    if mode not in ANSWER_MODES:
+        raise ValueError(f"answer_mode는 {ANSWER_MODES} 중 하나여야 합니다: {mode}")
+    if mode != "auto":
+        route, reason = mode, "forced"
+    elif set(groups) - _EXTRACTIVE_GROUPS:
+        # 기술스택·자격요건 등 주요업무 외 항목을 묻는 질문은 추출형(주요업무 나열)으로 답할 수 없음
+        route, reason = "llm", "groups:" + ",".join(sorted(set(groups) - _EXTRACTIVE_GROUPS))
+    else:
+        listing, reason = is_listing_query(query)
+        route = "extractive" if listing else "llm"
+    logger.info("answer route=%s reason=%s query=%r", route, reason, query)
+    return route, reason
+
 
-    context = _build_context(deduped_items)
+def generate_stream(
+    query: str,
+    *,
+    company: Optional[str] = None,
+    job_role: Optional[str] = None,
+    career_type: Optional[str] = None,
+    company_years_num: Optional[str] = None,
+    location: Optional[str] = None,
+    company_years_min: Optional[int] = None,
+    company_years_max: Optional[int] = None,
+    retrieve_limit: int = 20,
+    max_distance: Optional[float] = None,
+    use_rerank: bool = True,
+    rerank_top_k: int = 5,
+    model: Optional[str] = None,
+    context_tokens: Optional[int] = None,
+    deadline_sec: Optional[float] = None,
+    hedge_delay_sec: Optional[float] = None,
+    hedge_model: Optional[str] = None,
+    answer_mode: Optional[str] = None,
+) -> Iterator[dict[str, Any]]:
+    """
+    generate()의 스트리밍 버전. 참고 공고를 먼저 내보내고, LLM 답변 토큰을 도착하는 대로 내보냄.
+
+    Args:
+        generate()와 동일.
+
+    Yields:
+        {"type": "sources", "sources": list[dict], "context_length": int, "context_tokens": int}  (항상 첫 이벤트)
+        {"type": "token", "text": str}  (답변 조각, 0회 이상)
+        {"type": "done", "answer": str, "ttft_sec": float | None, "latency_sec": float, "usage": dict}
+        ttft_sec: 요청 시작 → 첫 답변 토큰까지, latency_sec: 요청 시작 → 답변 완료까지.
+        usage: {"prompt_tokens", "completion_tokens", "cached_tokens"} (cached_tokens: prompt cache 적중 토큰).
+        timings: 단계명(retrieve.embed, retrieve.query, rerank, generate.context, generate.llm, total) → {"ms", 건수·토큰 등}.
+        llm: {"model": 답변한 모델, "hedged": hedge 요청 여부, "fallback": None | "extractive" | "truncated",
+              "route": "llm" | "extractive", "route_reason": 라우팅 근거}
+    """
+    started = time.perf_counter()
+    model_name = model or os.environ.get("RAG_CHAT_MODEL") or DEFAULT_MODEL
+    trace = Trace("generate", query=query, model=model_name)
+    # retrieve/rerank 내부 span이 이 trace에 기록되도록 활성화 (yield 사이에는 비활성)
+    with trace.activate():
+        sources = _select_sources(
+            query,
+            company=company,
+            job_role=job_role,
+            career_type=career_type,
+            company_years_num=company_years_num,
+            location=location,
+            company_years_min=company_years_min,
+            company_years_max=company_years_max,
+            retrieve_limit=retrieve_limit,
+            max_distance=max_distance,
+            use_rerank=use_rerank,
+            rerank_top_k=rerank_top_k,
+        )
+        with trace.span("generate.context") as sp:
+            groups = select_chunk_groups(query)
+            group_texts = _fetch_group_texts(sources, groups) if sources else {}
+            context, ctx_stats = build_context(
+                sources,
+                model_name,
+                groups=groups,
+                group_texts=group_texts,
+                job_key=_job_key,
+                token_budget=context_tokens,
+            )
+            sp.set(context_tokens=ctx_stats["context_tokens"], n_sources=ctx_stats["n_sources"])
     if not context.strip():
-        return {
-            "answer": "검색된 채용 정보가 없어 답변을 생성할 수 없습니다.",
-            "sources": [],
-            "context_length": 0,
-        }
+        sources = []
+    yield {
+        "type": "sources",
+        "sources": sources,
+        "context_length": len(context),
+        "context_tokens": ctx_stats["context_tokens"],
+    }
+
+    route, route_reason = _route_answer(query, answer_mode, groups)
 
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        return {
-            "answer": "OPENAI_API_KEY가 설정되지 않았습니다.",
-            "sources": deduped_items,
-            "context_length": len(context),
+    def _done_without_llm(message: str) -> Iterator[dict[str, Any]]:
+        yield {"type": "token", "text": message}
+        yield {
+            "type": "done",
+            "answer": message,
+            "ttft_sec": None,
+            "latency_sec": time.perf_counter() - started,
+            "usage": usage_to_dict(None),
+            "llm": {"model": None, "hedged": False, "fallback": None, "route": route, "route_reason": route_reason},
+            "timings": trace.finish(route=route, route_reason=route_reason),
+            "trace_id": trace.trace_id,
         }
 
-    from openai import OpenAI
-    from Fine_tuning.Fine_tuning import get_finetune_system_prompt
+    if not context.strip():
+        yield from _done_without_llm("검색된 채용 정보가 없어 답변을 생성할 수 없습니다.")
+        return
 
-    client = OpenAI(api_key=api_key)
-    model_name = model or os.environ.get("RAG_CHAT_MODEL") or DEFAULT_MODEL
+    if route == "extractive":
+        # 목록형 질문: 참고 공고의 주요업무를 그대로 나열 (LLM 토큰 0)
+        with trace.span("generate.extractive"):
+            answer = extractive_answer(sources, group_texts, _job_key)
+        yield from _done_without_llm(answer)
+        return
 
-    system = (
-        get_finetune_system_prompt()
-        + "\n\n답변은 반드시 아래 채용 공고 문장에 나온 내용만 인용하고, 공고에 없는 표현으로 일반화하거나 요약하지 마세요."
-        + "\n\n질문과 관련된 정보는 context에 있으면 빠짐없이 모두 답변에 포함하라. 반면 질문과 직접 관련 없거나 관련성이 낮은 내용은 절대 포함하지 마라."
-        + "\n\n답변에는 각 공고의 주요업무만 요약·나열하고, 자격요건·우대사항 등은 답변에 포함하지 마세요. 질문과 관련된 공고는 적어도 3개 이상 포함하여 나열하세요."
-    )
+    from service.openai_client import get_openai_client
 
-    user = f"""다음 채용 공고 내용을 참고해서 질문에 답해주세요. 질문과 관련된 내용은 모두 포함하고, 관련 없는 내용은 절대 넣지 마세요. 답변에는 각 공고별로 주요업무만 간단히 정리하고, 질문과 관련된 공고는 빠짐없이 나열하세요.
+    client = get_openai_client()
+    if client is None:
+        yield from _done_without_llm("OPENAI_API_KEY가 설정되지 않았습니다.")
+        return
 
---- 채용 공고 ---
-{context}
---- 끝 ---
+    request = {
+        "messages": build_messages(query, context),
+        "max_tokens": 1024,
+        "stream": True,
+        # 마지막 chunk에 usage(cached_tokens 포함)를 받기 위함
+        "stream_options": {"include_usage": True},
+        "extra_body": {"prompt_cache_key": prompt_cache_key()},
+    }
+    if hedge_delay_sec is None and os.environ.get("RAG_HEDGE_DELAY_SEC"):
+        hedge_delay_sec = float(os.environ["RAG_HEDGE_DELAY_SEC"])
+    hedge_model = hedge_model or os.environ.get("RAG_HEDGE_MODEL") or None
+    deadline_at = started + deadline_sec if deadline_sec is not None else None
 
-질문: {query}"""
+    llm_span = trace.start_span("generate.llm")
+    llm_info: dict[str, Any] = {}
+    parts: list[str] = []
+    ttft: Optional[float] = None
+    fallback: Optional[str] = None
+    try:
+        for delta in hedged_stream(
+            client,
+            request,
+            model_name,
+            hedge_delay=hedge_delay_sec,
+            hedge_model=hedge_model,
+            deadline_at=deadline_at,
+            info=llm_info,
+        ):
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            parts.append(delta)
+            yield {"type": "token", "text": delta}
+    except DeadlineExceeded:
+        # 첫 토큰 전에 deadline 초과 → LLM 없이 참고 공고의 주요업무로 답변
+        fallback = "extractive"
+        llm_info["model"] = None
+        answer = extractive_answer(sources, group_texts, _job_key)
+        parts = [answer]
+        yield {"type": "token", "text": answer}
+    if llm_info.get("truncated"):
+        fallback = "truncated"
 
-    resp = client.chat.completions.create(
-        model=model_name,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-        max_tokens=1024,
+    usage = llm_info.get("usage") or usage_to_dict(None)
+    record_usage(usage)
+    llm_span.end(
+        ttft_ms=ttft * 1000.0 if ttft is not None else None,
+        model=llm_info.get("model"),
+        hedged=llm_info.get("hedged", False),
+        fallback=fallback,
+        **usage,
     )
-    answer = (resp.choices[0].message.content or "").strip()
+    yield {
+        "type": "done",
+        "answer": "".join(parts).strip(),
+        "ttft_sec": ttft,
+        "latency_sec": time.perf_counter() - started,
+        "usage": usage,
+        "llm": {
+            "model": llm_info.get("model"),
+            "hedged": llm_info.get("hedged", False),
+            "fallback": fallback,
+            "route": route,
+            "route_reason": route_reason,
+        },
+        "timings": trace.finish(route=route, route_reason=route_reason),
+        "trace_id": trace.trace_id,
+    }
+
 
+def generate(
+    query: str,
+    *,
+    company: Optional[str] = None,
+    job_role: Optional[str] = None,
+    career_type: Optional[str] = None,
+    company_years_num: Optional[str] = None,
+    location: Optional[str] = None,
+    company_years_min: Optional[int] = None,
+    company_years_max: Optional[int] = None,
+    retrieve_limit: int = 20,
+    max_distance: Optional[float] = None,
+    use_rerank: bool = True,
+    rerank_top_k: int = 5,
+    model: Optional[str] = None,
+    context_tokens: Optional[int] = None,
+    deadline_sec: Optional[float] = None,
+    hedge_delay_sec: Optional[float] = None,
+    hedge_model: Optional[str] = None,
+    answer_mode: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    질의 → Retriever(옵션 Rerank) → context 구성 → LLM 답변 생성.
+
+    Args:
+        query: 사용자 질문.
+        company, job_role, career_type, company_years_num: Retriever 메타 필터.
+        location, company_years_min, company_years_max: 근무지역·업력 범위 필터 (service.facets 값/구간).
+        retrieve_limit: Retriever 상위 건수.
+        max_distance: Retriever에서 이 값보다 큰 distance 제외 (None이면 미적용).
+        use_rerank: True면 Rerank 적용 후 상위 rerank_top_k만 context에 사용.
+        rerank_top_k: Rerank 후 context에 넣을 건수 (기본 5).
+        model: OpenAI 채팅 모델 (미지정 시 gpt-4o-mini).
+        context_tokens: context 토큰 예산 (None이면 모델별 기본값, RAG_CONTEXT_TOKENS).
+        deadline_sec: 요청 전체 마감(초). 첫 토큰 전에 넘기면 참고 공고 주요업무로 추출형 답변,
+            답변 도중 넘기면 거기까지의 답변 반환.
+        hedge_delay_sec: 첫 토큰을 이 시간(초) 안에 못 받으면 hedge 요청 (None이면 RAG_HEDGE_DELAY_SEC, 없으면 미사용).
+        hedge_model: hedge 요청 모델 (None이면 RAG_HEDGE_MODEL, 없으면 model과 동일).
+        answer_mode: "auto"(목록형 질문은 LLM 없이 주요업무 추출형 답변) / "llm" / "extractive".
+            None이면 RAG_ANSWER_MODE, 없으면 auto.
+
+    Returns:
+        {"answer": str, "sources": list[dict], "context_length": int, "context_tokens": int,
+         "ttft_sec": float | None, "latency_sec": float,
+         "usage": {"prompt_tokens", "completion_tokens", "cached_tokens"},
+         "timings": {단계명: {"ms", ...}}, "llm": {"model", "hedged", "fallback", "route", "route_reason"}}  (RAG_TRACE_PATH 설정 시 trace JSONL 기록)
+    """
+    result: dict[str, Any] = {}
+    for event in generate_stream(
+        query,
+        company=company,
+        job_role=job_role,
+        career_type=career_type,
+        company_years_num=company_years_num,
+        location=location,
+        company_years_min=company_years_min,
+        company_years_max=company_years_max,
+        retrieve_limit=retrieve_limit,
+        max_distance=max_distance,
+        use_rerank=use_rerank,
+        rerank_top_k=rerank_top_k,
+        model=model,
+        context_tokens=context_tokens,
+        deadline_sec=deadline_sec,
+        hedge_delay_sec=hedge_delay_sec,
+        hedge_model=hedge_model,
+        answer_mode=answer_mode,
+    ):
+        if event["type"] == "sources":
+            result["sources"] = event["sources"]
+            result["context_length"] = event["context_length"]
+            result["context_tokens"] = event["context_tokens"]
+        elif event["type"] == "done":
+            result["answer"] = event["answer"]
+            result["ttft_sec"] = event["ttft_sec"]
+            result["latency_sec"] = event["latency_sec"]
+            result["usage"] = event["usage"]
+            result["timings"] = event["timings"]
+            result["llm"] = event["llm"]
     return {
-        "answer": answer,
-        "sources": deduped_items,
-        "context_length": len(context),
+        "answer": result["answer"],
+        "sources": result["sources"],
+        "context_length": result["context_length"],
+        "context_tokens": result["context_tokens"],
+        "ttft_sec": result["ttft_sec"],
+        "latency_sec": result["latency_sec"],
+        "usage": result["usage"],
+        "timings": result["timings"],
+        "llm": result["llm"],
     }
@@ -0,0 +1,196 @@
+"""
+Hedged LLM 호출: 첫 시도가 hedge_delay 안에 첫 토큰을 못 내면 두 번째 요청(선택적으로 더 빠른 모델)을 보내고,
+먼저 첫 토큰을 낸 쪽을 채택해 나머지는 취소. 전체 deadline을 넘기면 중단.
+
+요청마다 스트리밍 시도 1~2개를 스레드로 돌리고, 이벤트를 큐로 모아 채택된 시도의 토큰만 내보냄.
+누적 지표는 get_hedge_stats()로 확인 (hedge_delay 튜닝용).
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from .prompt import usage_to_dict
+
+_stats_lock = threading.Lock()
+_hedge_stats = {
+    "requests": 0,
+    "hedged": 0,           # hedge 요청을 보낸 횟수
+    "hedge_wins": 0,       # hedge 요청이 먼저 첫 토큰을 낸 횟수
+    "deadline_before_first_token": 0,
+    "deadline_truncated": 0,
+    "errors": 0,
+}
+
+
+def _incr(key: str) -> None:
+    with _stats_lock:
+        _hedge_stats[key] += 1
+
+
+def get_hedge_stats() -> dict[str, Any]:
+    """누적 hedge/deadline 지표와 비율."""
+    with _stats_lock:
+        stats: dict[str, Any] = dict(_hedge_stats)
+    n = stats["requests"] or 1
+    stats["hedge_rate"] = stats["hedged"] / n
+    stats["hedge_win_rate"] = stats["hedge_wins"] / stats["hedged"] if stats["hedged"] else 0.0
+    stats["deadline_rate"] = (stats["deadline_before_first_token"] + stats["deadline_truncated"]) / n
+    return stats
+
+
+class DeadlineExceeded(Exception):
+    """첫 토큰 전에 deadline 초과 (호출측에서 추출형 답변으로 대체)."""
+
+
+class _Attempt(threading.Thread):
+    """스트리밍 요청 1개. 토큰/usage/종료/오류를 (종류, attempt, 값) 형태로 out 큐에 넣음."""
+
+    def __init__(self, idx: int, client, model: str, request: dict[str, Any], out: "queue.Queue") -> None:
+        super().__init__(name=f"llm-attempt-{idx}", daemon=True)
+        self.idx = idx
+        self.model = model
+        self._client = client
+        self._request = request
+        self._out = out
+        self._cancelled = threading.Event()
+        self._stream = None
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        stream = self._stream
+        if stream is not None:
+            try:
+                stream.close()  # 진행 중인 HTTP 응답을 닫아 서버 측 생성도 중단
+            except Exception:
+                pass
+
+    def run(self) -> None:
+        try:
+            self._stream = self._client.chat.completions.create(model=self.model, **self._request)
+            if self._cancelled.is_set():
+                self._stream.close()
+                return
+            for chunk in self._stream:
+                if self._cancelled.is_set():
+                    return
+                if getattr(chunk, "usage", None) is not None:
+                    self._out.put(("usage", self, usage_to_dict(chunk.usage)))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    self._out.put(("token", self, chunk.choices[0].delta.content))
+            self._out.put(("end", self, None))
+        except Exception as e:
+            if not self._cancelled.is_set():
+                self._out.put(("error", self, e))
+
+
+def hedged_stream(
+    client,
+    request: dict[str, Any],
+    model: str,
+    *,
+    hedge_delay: Optional[float] = None,
+    hedge_model: Optional[str] = None,
+    deadline_at: Optional[float] = None,
+    info: Optional[dict[str, Any]] = None,
+) -> Iterator[str]:
+    """
+    답변 토큰을 내보내는 generator.
+
+    Args:
+        client: OpenAI 클라이언트.
+        request: chat.completions.create 인자 (model 제외, stream=True 포함).
+        model: 첫 시도 모델.
+        hedge_delay: 첫 토큰 대기 초. 넘기면 hedge 요청 (None이면 hedge 안 함).
+        hedge_model: hedge 요청 모델 (None이면 model과 동일).
+        deadline_at: time.perf_counter() 기준 절대 마감 시각 (None이면 무제한).
+        info: 결과 기록용 dict. model(채택 모델), hedged, truncated, usage가 채워짐.
+
+    Raises:
+        DeadlineExceeded: 첫 토큰 전에 deadline 초과.
+        Exception: 모든 시도가 실패하면 마지막 오류.
+    """
+    info = info if info is not None else {}
+    info.update({"model": model, "hedged": False, "truncated": False, "usage": usage_to_dict(None)})
+    _incr("requests")
+    out: "queue.Queue" = queue.Queue()
+    started = time.perf_counter()
+    attempts = [_Attempt(0, client, model, request, out)]
+    attempts[0].start()
+    winner: Optional[_Attempt] = None
+    failed: set[int] = set()
+    last_error: Optional[Exception] = None
+
+    def _start_hedge() -> None:
+        hedge = _Attempt(len(attempts), client, hedge_model or model, request, out)
+        attempts.append(hedge)
+        info["hedged"] = True
+        _incr("hedged")
+        hedge.start()
+
+    try:
+        while True:
+            now = time.perf_counter()
+            if deadline_at is not None and now >= deadline_at:
+                if winner is None:
+                    _incr("deadline_before_first_token")
+                    raise DeadlineExceeded()
+                info["truncated"] = True
+                _incr("deadline_truncated")
+                return
+            waits = []
+            can_hedge = hedge_delay is not None and len(attempts) == 1
+            if winner is None and can_hedge:
+                waits.append(started + hedge_delay - now)
+            if deadline_at is not None:
+                waits.append(deadline_at - now)
+            timeout = max(0.0, min(waits)) if waits else None
+            try:
+                kind, attempt, value = out.get(timeout=timeout)
+            except queue.Empty:
+                # deadline이면 다음 반복 첫머리에서 처리
+                if winner is None and can_hedge and time.perf_counter() >= started + hedge_delay:
+                    _start_hedge()
+                continue
+
+            if winner is not None and attempt is not winner:
+                continue  # 채택되지 않은 시도의 늦은 이벤트
+            if kind == "token":
+                if winner is None:
+                    winner = attempt
+                    info["model"] = attempt.model
+                    if attempt.idx > 0:
+                        _incr("hedge_wins")
+                    for other in attempts:
+                        if other is not attempt:
+                            other.cancel()
+                yield value
+            elif kind == "usage":
+                info["usage"] = value
+            elif kind == "end":
+                if winner is None:
+                    # 토큰 없이 끝난 응답(빈 답변)도 채택
+                    winner = attempt
+                    info["model"] = attempt.model
+                    for other in attempts:
+                        if other is not attempt:
+                            other.cancel()
+                return
+            elif kind == "error":
+                last_error = value
+                if winner is attempt:
+                    _incr("errors")
+                    raise value
+                failed.add(attempt.idx)
+                if len(failed) == len(attempts):
+                    # 살아 있는 시도가 없음: 아직 hedge 전이면 바로 hedge, 아니면 실패
+                    if hedge_delay is not None and len(attempts) == 1:
+                        _start_hedge()
+                        continue
+                    _incr("errors")
+                    raise last_error
+    finally:
+        # 정상 종료·deadline·호출측 중단(GeneratorExit) 모두 남은 스트림 정리 (끝난 스트림 close는 무해)
+        for attempt in attempts:
+            attempt.cancel()
@@ -0,0 +1,85 @@
+"""
+프롬프트 구성: OpenAI prompt caching이 적용되도록 요청마다 바이트 단위로 동일한 정적 prefix를 앞에 둠.
+- system: JD 원칙(get_finetune_system_prompt) + 답변 규칙 + 고정 지시문 (정적, 프로세스당 1회 생성)
+- user: 채용 공고 context + 질문 (요청마다 달라지는 부분만)
+OpenAI는 1024토큰 이상 prompt의 공통 prefix를 128토큰 단위로 캐시하므로, 가변 내용은 반드시 정적 prefix 뒤에 둠.
+(정적 prefix만으로는 1024토큰에 못 미쳐도 context가 붙은 prompt가 넘으면 prefix 부분은 캐시됨. 길이를 맞추려고 지시문을 덧붙이지 않음)
+"""
+
+import hashlib
+import threading
+from functools import lru_cache
+from typing import Any
+
+ANSWER_RULES = (
+    "답변은 반드시 아래 채용 공고 문장에 나온 내용만 인용하고, 공고에 없는 표현으로 일반화하거나 요약하지 마세요.",
+    "질문과 관련된 정보는 context에 있으면 빠짐없이 모두 답변에 포함하라. 반면 질문과 직접 관련 없거나 관련성이 낮은 내용은 절대 포함하지 마라.",
+    "답변에는 각 공고의 주요업무만 요약·나열하고, 자격요건·우대사항 등은 답변에 포함하지 마세요. 질문과 관련된 공고는 적어도 3개 이상 포함하여 나열하세요.",
+)
+
+# 기존에 user 메시지 앞에 붙던 지시문. 요청마다 같으므로 정적 prefix로 이동
+FIXED_INSTRUCTIONS = (
+    "사용자 메시지의 '--- 채용 공고 ---'와 '--- 끝 ---' 사이 내용을 참고해서 마지막 '질문'에 답해주세요. "
+    "질문과 관련된 내용은 모두 포함하고, 관련 없는 내용은 절대 넣지 마세요. "
+    "답변에는 각 공고별로 주요업무만 간단히 정리하고, 질문과 관련된 공고는 빠짐없이 나열하세요."
+)
+
+
+@lru_cache(maxsize=1)
+def static_system_prompt() -> str:
+    """요청과 무관한 정적 system prompt. 캐시 적중을 위해 한 번 만든 문자열을 계속 재사용."""
+    from Fine_tuning.Fine_tuning import get_finetune_system_prompt
+
+    return "\n\n".join([get_finetune_system_prompt(), *ANSWER_RULES, FIXED_INSTRUCTIONS])
+
+
+@lru_cache(maxsize=1)
+def prompt_cache_key() -> str:
+    """정적 prefix가 같으면 같은 키 → 같은 캐시 서버로 라우팅되도록 OpenAI prompt_cache_key로 전달."""
+    digest = hashlib.sha1(static_system_prompt().encode("utf-8")).hexdigest()[:12]
+    return f"jd-rag-{digest}"
+
+
+def build_messages(query: str, context: str) -> list[dict[str, str]]:
+    """정적 system + 가변 user(context + 질문) 메시지."""
+    user = f"""--- 채용 공고 ---
+{context}
+--- 끝 ---
+
+질문: {query}"""
+    return [
+        {"role": "system", "content": static_system_prompt()},
+        {"role": "user", "content": user},
+    ]
+
+
+def usage_to_dict(usage: Any) -> dict[str, int]:
+    """응답 usage → {"prompt_tokens", "completion_tokens", "cached_tokens"} (없는 값은 0)."""
+    if usage is None:
+        return {"prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+    details = getattr(usage, "prompt_tokens_details", None)
+    return {
+        "prompt_tokens": int(getattr(usage, "prompt_tokens", 0) or 0),
+        "completion_tokens": int(getattr(usage, "completion_tokens", 0) or 0),
+        "cached_tokens": int(getattr(details, "cached_tokens", 0) or 0) if details is not None else 0,
+    }
+
+
+_stats_lock = threading.Lock()
+_cache_stats = {"requests": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+
+
+def record_usage(usage: dict[str, int]) -> None:
+    """프로세스 누적 토큰·캐시 적중 집계."""
+    with _stats_lock:
+        _cache_stats["requests"] += 1
+        for k in ("prompt_tokens", "cached_tokens", "completion_tokens"):
+            _cache_stats[k] += usage.get(k, 0)
+
+
+def get_prompt_cache_stats() -> dict[str, Any]:
+    """누적 요청 수·prompt/cached/completion 토큰과 캐시 적중 비율."""
+    with _stats_lock:
+        stats: dict[str, Any] = dict(_cache_stats)
+    stats["cached_ratio"] = stats["cached_tokens"] / stats["prompt_tokens"] if stats["prompt_tokens"] else 0.0
+    return stats
@@ -1,4 +1,4 @@
 # Rerank: 검색 결과 순서 재정렬
-from .rerank import rerank
+from .rerank import preload_model, rerank
 
-__all__ = ["rerank"]
+__all__ = ["preload_model", "rerank"]
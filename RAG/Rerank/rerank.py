@@ -3,30 +3,78 @@ Rerank: 검색 결과를 (query, document) 관련도로 재정렬.
 Cross-encoder 기반: Retriever가 준 상위 k개를 질의-문서 쌍으로 점수 매겨 순서 조정.
 """
 
+import json
+import logging
 import os
+import threading
+from multiprocessing import AuthenticationError
 from pathlib import Path
 from typing import Any, Optional
 
 from dotenv import load_dotenv
 
+from RAG.tracing import span
+
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
 
+logger = logging.getLogger(__name__)
+
 # 기본 모델. 한국어 강화 시 .env에 RERANK_MODEL=dragonkue/bge-reranker-v2-m3-ko
 DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
 
+# Fine_tuning.distill로 학습한 student reranker 저장 위치
+DISTILLED_MODEL_DIR = _PROJECT_ROOT / "Fine_tuning" / "distill" / "student"
+
+# 로드된 CrossEncoder (모델명 → 모델). 요청마다 다시 로드하지 않도록 프로세스 안에서 공유
+_models: dict[str, Any] = {}
+_models_lock = threading.Lock()
+
+# worker 장애 중 여부. 장애가 시작될 때와 복구될 때만 로그를 남김 (요청마다 남기지 않음)
+_worker_down = False
+
+# RERANK_MODEL에 쓸 수 있는 별칭 → 실제 모델명/경로
+MODEL_ALIASES = {
+    "bge-ko": "dragonkue/bge-reranker-v2-m3-ko",
+    "distilled": str(DISTILLED_MODEL_DIR),
+}
 
-def _get_cross_encoder(model_name: Optional[str] = None):
-    """CrossEncoder 로드."""
-    from sentence_transformers import CrossEncoder
 
+def resolve_model_name(model_name: Optional[str] = None) -> str:
+    """모델명 결정: 인자 → RERANK_MODEL → 기본 모델. 별칭(distilled 등)은 실제 경로로 변환."""
     name = model_name or os.environ.get("RERANK_MODEL") or DEFAULT_MODEL
+    return MODEL_ALIASES.get(name, name)
+
+
+def _load_cross_encoder(name: str):
+    """CrossEncoder 로드 (캐시 없이)."""
+    from sentence_transformers import CrossEncoder
+
     if "bge-reranker" in name.lower():
         import torch.nn as nn
         return CrossEncoder(name, default_activation_function=nn.Sigmoid())
     return CrossEncoder(name)
 
 
+def _get_cross_encoder(model_name: Optional[str] = None):
+    """CrossEncoder 반환. 모델별로 프로세스당 한 번만 로드하고 이후 호출은 재사용 (스레드 안전)."""
+    name = resolve_model_name(model_name)
+    model = _models.get(name)
+    if model is None:
+        with _models_lock:
+            model = _models.get(name)
+            if model is None:
+                model = _load_cross_encoder(name)
+                _models[name] = model
+    return model
+
+
+def preload_model(model_name: Optional[str] = None) -> str:
+    """서버 시작 시 등 첫 요청 전에 모델을 미리 로드. 로드한 모델명 반환."""
+    _get_cross_encoder(model_name)
+    return resolve_model_name(model_name)
+
+
 def rerank(
     query: str,
     items: list[dict[str, Any]],
@@ -49,8 +97,13 @@ def rerank(
         return []
 
     pairs = [(query.strip(), item.get("text") or "") for item in items]
-    model = _get_cross_encoder(model_name)
-    scores = model.predict(pairs)
+    with span("rerank", pairs=len(pairs)) as sp:
+        scores = _predict_via_worker(pairs, model_name)
+        sp.set(via="worker" if scores is not None else "local")
+        if scores is None:
+            model = _get_cross_encoder(model_name)
+            scores = model.predict(pairs)
+    _log_scores(query, items, scores, resolve_model_name(model_name))
 
     out = []
     for item, score in zip(items, scores):
@@ -60,3 +113,54 @@ def rerank(
     if top_k is not None:
         out = out[:top_k]
     return out
+
+
+def _predict_via_worker(
+    pairs: list[tuple[str, str]],
+    model_name: Optional[str] = None,
+) -> Optional[list[float]]:
+    """
+    RERANK_WORKER_ADDR 설정 시 rerank worker(RAG.Rerank.worker)로 점수 계산.
+    worker 미설정·연결 실패·인증 실패·모델 불일치면 None → 호출측에서 로컬 모델 사용.
+    """
+    global _worker_down
+    from .worker import get_client
+
+    client = get_client()
+    if client is None:
+        return None
+    query = pairs[0][0]
+    try:
+        scores = client.score(query, [text for _, text in pairs], model_name=resolve_model_name(model_name))
+    except (OSError, EOFError, RuntimeError, AuthenticationError) as e:
+        if not _worker_down:
+            _worker_down = True
+            logger.warning("Rerank worker 사용 실패 → 복구될 때까지 로컬 모델로 대체: %s", e)
+        return None
+    if _worker_down:
+        _worker_down = False
+        logger.info("Rerank worker 복구")
+    return scores
+
+
+def _log_scores(
+    query: str,
+    items: list[dict[str, Any]],
+    scores,
+    model_name: str,
+) -> None:
+    """RERANK_LOG_PATH 설정 시 (query, text, score, model)을 JSONL로 추가 기록 (distillation teacher 점수 수집용)."""
+    log_path = os.environ.get("RERANK_LOG_PATH")
+    if not log_path:
+        return
+    path = Path(log_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        for item, score in zip(items, scores):
+            record = {
+                "query": query.strip(),
+                "text": item.get("text") or "",
+                "score": float(score),
+                "model": model_name,
+            }
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
@@ -0,0 +1,283 @@
+"""
+Rerank worker: cross-encoder 모델을 한 번만 로드해 여러 요청(Streamlit 세션 등)이 공유하는 장기 실행 프로세스.
+짧은 시간 창(기본 8ms) 동안 들어온 요청들의 (query, text) 쌍을 모아 한 번의 model.predict로 처리(micro-batching)하고,
+점수를 각 요청자에게 나눠 돌려줌.
+
+실행: python -m RAG.Rerank.worker [--addr 127.0.0.1:6100] [--window-ms 8] [--max-batch 64]
+상태: python -m RAG.Rerank.worker --stats
+사용: .env에 RERANK_WORKER_ADDR=127.0.0.1:6100 설정 시 rerank()가 자동으로 worker 사용.
+      응답이 RERANK_WORKER_TIMEOUT초(기본 10) 안에 오지 않으면 로컬 모델로 대체.
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from multiprocessing.connection import Client, Listener, answer_challenge, deliver_challenge
+from typing import Any, Optional
+
+from RAG.tracing import percentile
+
+from .rerank import _get_cross_encoder, resolve_model_name
+
+DEFAULT_ADDR = "127.0.0.1:6100"
+DEFAULT_WINDOW_MS = 8.0
+DEFAULT_MAX_BATCH = 64
+# 클라이언트가 응답을 기다리는 최대 초 (멈춘 worker 때문에 rerank 호출이 끝나지 않는 것을 막음)
+DEFAULT_TIMEOUT_SEC = 10.0
+# 동시 접속 시 accept 대기열 (Listener 기본값 1이면 동시 연결이 지연됨)
+_LISTEN_BACKLOG = 128
+# 최근 N건 기준으로 지연 시간 백분위 계산
+_LATENCY_WINDOW = 2000
+
+
+def _parse_addr(addr: str) -> tuple[str, int]:
+    host, _, port = addr.rpartition(":")
+    return (host or "127.0.0.1", int(port))
+
+
+def _authkey() -> bytes:
+    return os.environ.get("RERANK_WORKER_AUTHKEY", "rerank-worker").encode("utf-8")
+
+
+class _Pending:
+    """worker 큐에 들어간 요청 1건. 배치 처리 후 scores 채우고 done 이벤트 set."""
+
+    __slots__ = ("query", "texts", "enqueued_at", "done", "scores", "error")
+
+    def __init__(self, query: str, texts: list[str]) -> None:
+        self.query = query
+        self.texts = texts
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.scores: list[float] = []
+        self.error: Optional[str] = None
+
+
+class RerankWorker:
+    """모델 1개 + 배치 수집 스레드. submit()은 여러 스레드에서 동시에 호출 가능."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        window_ms: float = DEFAULT_WINDOW_MS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+    ) -> None:
+        self.model_name = resolve_model_name(model_name)
+        self.model = _get_cross_encoder(self.model_name)
+        self.window_sec = window_ms / 1000.0
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[_Pending]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._queue_waits: deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._batch_sizes: deque[int] = deque(maxlen=_LATENCY_WINDOW)
+        self._n_requests = 0
+        self._n_batches = 0
+        self._n_pairs = 0
+        self._max_queue_depth = 0
+        self._thread = threading.Thread(target=self._batch_loop, name="rerank-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, query: str, texts: list[str]) -> list[float]:
+        """(query, texts) 점수 요청. 배치 처리될 때까지 대기 후 점수 반환."""
+        if not texts:
+            return []
+        pending = _Pending(query, texts)
+        self._queue.put(pending)
+        with self._lock:
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+        pending.done.wait()
+        if pending.error:
+            raise RuntimeError(pending.error)
+        with self._lock:
+            self._n_requests += 1
+            self._latencies.append(time.perf_counter() - pending.enqueued_at)
+        return pending.scores
+
+    def _collect_batch(self) -> list[_Pending]:
+        """첫 요청을 기다린 뒤, window 동안 또는 max_batch 쌍이 찰 때까지 추가 요청 수집."""
+        first = self._queue.get()
+        batch = [first]
+        n_pairs = len(first.texts)
+        deadline = time.perf_counter() + self.window_sec
+        while n_pairs < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                nxt = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(nxt)
+            n_pairs += len(nxt.texts)
+        return batch
+
+    def _batch_loop(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            started = time.perf_counter()
+            pairs = [(p.query, t) for p in batch for t in p.texts]
+            try:
+                scores = [float(s) for s in self.model.predict(pairs, batch_size=max(len(pairs), 1))]
+            except Exception as e:  # 모델 오류는 해당 배치 요청자 전원에게 전달
+                for p in batch:
+                    p.error = f"rerank worker 오류: {e}"
+                    p.done.set()
+                continue
+            offset = 0
+            for p in batch:
+                p.scores = scores[offset : offset + len(p.texts)]
+                offset += len(p.texts)
+                p.done.set()
+            with self._lock:
+                self._queue_waits.extend(started - p.enqueued_at for p in batch)
+                self._n_batches += 1
+                self._n_pairs += len(pairs)
+                self._batch_sizes.append(len(batch))
+
+    def stats(self) -> dict[str, Any]:
+        """지연 시간(ms)·큐 깊이·배치 크기 지표."""
+        with self._lock:
+            latencies = list(self._latencies)
+            waits = list(self._queue_waits)
+            sizes = list(self._batch_sizes)
+            return {
+                "model": self.model_name,
+                "window_ms": self.window_sec * 1000.0,
+                "max_batch": self.max_batch,
+                "n_requests": self._n_requests,
+                "n_batches": self._n_batches,
+                "n_pairs": self._n_pairs,
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "avg_requests_per_batch": (sum(sizes) / len(sizes)) if sizes else 0.0,
+                "latency_p50_ms": percentile(latencies, 50) * 1000.0,
+                "latency_p95_ms": percentile(latencies, 95) * 1000.0,
+                "latency_p99_ms": percentile(latencies, 99) * 1000.0,
+                "queue_wait_p50_ms": percentile(waits, 50) * 1000.0,
+                "queue_wait_p95_ms": percentile(waits, 95) * 1000.0,
+            }
+
+
+def _handle_connection(conn, worker: RerankWorker) -> None:
+    """클라이언트 연결 1개 처리. 요청: {"op": "score"|"stats", ...}"""
+    try:
+        # 인증 handshake는 accept 루프가 아니라 연결 스레드에서 (느린 클라이언트가 다른 연결을 막지 않게)
+        try:
+            deliver_challenge(conn, _authkey())
+            answer_challenge(conn, _authkey())
+        except Exception:
+            return
+        while True:
+            try:
+                msg = conn.recv()
+            except (EOFError, OSError):
+                return
+            op = msg.get("op")
+            if op == "stats":
+                conn.send({"ok": True, "stats": worker.stats()})
+            elif op == "score":
+                model = msg.get("model")
+                if model and model != worker.model_name:
+                    conn.send({"ok": False, "error": f"worker 모델({worker.model_name})과 요청 모델({model})이 다릅니다."})
+                    continue
+                try:
+                    scores = worker.submit(msg.get("query") or "", list(msg.get("texts") or []))
+                    conn.send({"ok": True, "scores": scores})
+                except Exception as e:
+                    conn.send({"ok": False, "error": str(e)})
+            else:
+                conn.send({"ok": False, "error": f"알 수 없는 op: {op}"})
+    finally:
+        conn.close()
+
+
+def serve(
+    addr: str = DEFAULT_ADDR,
+    model_name: Optional[str] = None,
+    window_ms: float = DEFAULT_WINDOW_MS,
+    max_batch: int = DEFAULT_MAX_BATCH,
+) -> None:
+    """worker 실행 (블로킹). 연결마다 스레드 1개, 모델·배치 스레드는 공유."""
+    worker = RerankWorker(model_name=model_name, window_ms=window_ms, max_batch=max_batch)
+    with Listener(_parse_addr(addr), backlog=_LISTEN_BACKLOG) as listener:
+        print(f"Rerank worker 시작: {addr} (model={worker.model_name}, window={window_ms}ms, max_batch={max_batch})")
+        while True:
+            conn = listener.accept()
+            threading.Thread(target=_handle_connection, args=(conn, worker), daemon=True).start()
+
+
+class RerankClient:
+    """worker 클라이언트. 스레드마다 연결 1개를 재사용 (Connection은 스레드 안전하지 않음)."""
+
+    def __init__(self, addr: str = DEFAULT_ADDR, timeout: Optional[float] = None) -> None:
+        self.addr = addr
+        self.timeout = timeout if timeout is not None else float(os.environ.get("RERANK_WORKER_TIMEOUT", DEFAULT_TIMEOUT_SEC))
+        self._local = threading.local()
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = Client(_parse_addr(self.addr), authkey=_authkey())
+            self._local.conn = conn
+        return conn
+
+    def _call(self, msg: dict[str, Any]) -> dict[str, Any]:
+        try:
+            conn = self._conn()
+            conn.send(msg)
+            if not conn.poll(self.timeout):
+                # 늦게 온 응답을 다음 요청이 읽지 않도록 연결을 닫고 버림
+                conn.close()
+                raise TimeoutError(f"rerank worker가 {self.timeout:g}초 안에 응답하지 않음")
+            resp = conn.recv()
+        except (EOFError, OSError):
+            # worker 재시작·응답 없음 등으로 못 쓰게 된 연결은 버리고 호출측에서 재시도/대체
+            self._local.conn = None
+            raise
+        if not resp.get("ok"):
+            raise RuntimeError(resp.get("error") or "rerank worker 오류")
+        return resp
+
+    def score(self, query: str, texts: list[str], model_name: Optional[str] = None) -> list[float]:
+        return self._call({"op": "score", "query": query, "texts": texts, "model": model_name})["scores"]
+
+    def stats(self) -> dict[str, Any]:
+        return self._call({"op": "stats"})["stats"]
+
+
+_clients: dict[str, RerankClient] = {}
+
+
+def get_client(addr: Optional[str] = None) -> Optional[RerankClient]:
+    """RERANK_WORKER_ADDR(또는 addr)가 있으면 프로세스 공용 클라이언트 반환, 없으면 None."""
+    addr = addr or os.environ.get("RERANK_WORKER_ADDR")
+    if not addr:
+        return None
+    if addr not in _clients:
+        _clients[addr] = RerankClient(addr)
+    return _clients[addr]
+
+
+def main() -> None:
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Rerank worker (모델 공유 + 요청 간 micro-batching)")
+    parser.add_argument("--addr", default=os.environ.get("RERANK_WORKER_ADDR") or DEFAULT_ADDR, help="host:port")
+    parser.add_argument("--model", default=None, dest="model_name", help="Cross-encoder 모델명 (기본 RERANK_MODEL)")
+    parser.add_argument("--window-ms", type=float, default=DEFAULT_WINDOW_MS, help="배치 수집 시간 창(ms)")
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="배치당 최대 (query, text) 쌍 수")
+    parser.add_argument("--stats", action="store_true", help="실행 중인 worker의 지표 출력")
+    args = parser.parse_args()
+
+    if args.stats:
+        print(json.dumps(RerankClient(args.addr).stats(), ensure_ascii=False, indent=2))
+        return
+    serve(args.addr, model_name=args.model_name, window_ms=args.window_ms, max_batch=args.max_batch)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
 # Retriever: 벡터 검색 + 메타데이터 필터 결합
-from .retriever import retrieve
+from .retriever import close_pg_pool, fetch_chunk_groups, init_pg_pool, retrieve
 
-__all__ = ["retrieve"]
+__all__ = ["close_pg_pool", "fetch_chunk_groups", "init_pg_pool", "retrieve"]
@@ -14,6 +14,9 @@ def main() -> None:
     parser.add_argument("--job-role", default=None, help="직무/직무 카테고리 필터")
     parser.add_argument("--career-type", default=None, help="경력 여부 (예: 신입, 경력, 무관)")
     parser.add_argument("--company-years", default=None, dest="company_years_num", help="회사 규모/업력 필터 (예: 5년차)")
+    parser.add_argument("--location", default=None, help="근무지역 필터 (예: 서울, \"서울 강남구\")")
+    parser.add_argument("--company-years-min", type=int, default=None, dest="company_years_min", help="업력 하한 (년차, 포함)")
+    parser.add_argument("--company-years-max", type=int, default=None, dest="company_years_max", help="업력 상한 (년차, 포함)")
     parser.add_argument("--limit", type=int, default=5, help="반환 건수 (기본 5)")
     args = parser.parse_args()
 
@@ -23,6 +26,9 @@ def main() -> None:
         job_role=args.job_role,
         career_type=args.career_type,
         company_years_num=args.company_years_num,
+        location=args.location,
+        company_years_min=args.company_years_min,
+        company_years_max=args.company_years_max,
         limit=args.limit,
     )
     print(json.dumps(results, ensure_ascii=False, indent=2))
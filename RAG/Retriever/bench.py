@@ -0,0 +1,396 @@
+"""
+검색 스택 규모 벤치마크: 기존 chunk(chunked_*.jsonl)의 본문·메타데이터를 변형해 10만~100만 chunk 규모 corpus를 합성하고,
+같은 retrieve() 경로로 PostgreSQL(pgvector)과 in-process(memory) 백엔드를 측정.
+
+측정 항목 (규모·백엔드별):
+- 적재 처리량: pg는 COPY 대량 적재(service.embedding.copy_embeddings), memory는 행렬 구성·정규화 (rows/sec)
+- 인덱스 생성 시간: pg는 HNSW/IVFFlat 인덱스, memory는 필터 컬럼 배열
+- 질의 지연 시간: 필터 없음 / 경력 / 회사 / 업력 구간+지역 필터별 p50·p95·p99
+- 메모리: pg는 테이블·인덱스 크기, memory는 임베딩 행렬 크기와 프로세스 RSS 증가량
+
+벡터는 원본 chunk마다 하나씩 만든 기준 벡터(난수 또는 embedded JSONL의 실제 임베딩)에 잡음을 더해 합성하고,
+질의 벡터는 기준 벡터 근처에서 뽑음 → 같은 원본에서 나온 변형 chunk들이 실제 근접 이웃이 됨.
+pg 벤치는 별도 schema(기본 rag_bench)에 같은 이름의 job_embeddings를 만들고 PGOPTIONS search_path로 retrieve()가
+그 테이블을 보게 함 (운영 테이블은 건드리지 않음, 끝나면 schema 삭제).
+
+CLI:
+    python -m RAG.Retriever.bench --backend memory --scales 10000,100000
+    python -m RAG.Retriever.bench --backend pg,memory --scales 100000 --index hnsw --ef-search 40 --out bench.json
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+
+from service.embedding.embedding import OPENAI_EMBED_DIM
+from service.sort_keys import with_sort_fields
+from service.streaming import artifact_paths, iter_records
+
+from RAG.tracing import percentile
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+CHUNKED_DIR = _PROJECT_ROOT / "service" / "chunking" / "chunked"
+DEFAULT_SCHEMA = "rag_bench"
+# 기준 벡터에 더하는 잡음 크기 (벡터 norm 대비). 질의는 기준 벡터 + 2배 잡음
+_NOISE = 0.05
+_SYNTH_BATCH = 10000
+
+# 필터 조합별 retrieve() 인자 (회사는 실행 시 가장 흔한 회사로 채움)
+FILTER_SETS: dict[str, dict[str, Any]] = {
+    "none": {},
+    "career_type": {"career_type": "경력"},
+    "company": {"company": None},
+    "years+location": {"company_years_min": 8, "company_years_max": 14, "location": "서울"},
+}
+
+
+def _rss_mb() -> float:
+    """현재 프로세스 RSS(MB). /proc이 없으면 최대 RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError, IndexError):
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SyntheticCorpus:
+    """
+    원본 chunk B개 → n개 합성. i번째 chunk는 원본 i % B의 변형 (replica = i // B).
+    본문은 줄 순서를 섞고 변형 번호를 붙이며, source_row_id·content_hash는 변형마다 새 값.
+    """
+
+    def __init__(
+        self,
+        base: list[dict[str, Any]],
+        base_vectors: Optional[np.ndarray] = None,
+        seed: int = 0,
+    ) -> None:
+        if not base:
+            raise ValueError("합성할 원본 chunk가 없습니다.")
+        self.base = base
+        self.seed = seed
+        rng = np.random.default_rng(seed)
+        if base_vectors is None:
+            base_vectors = rng.standard_normal((len(base), OPENAI_EMBED_DIM), dtype=np.float32)
+        base_vectors = np.asarray(base_vectors, dtype=np.float32)
+        base_vectors /= np.maximum(np.linalg.norm(base_vectors, axis=1, keepdims=True), 1e-12)
+        self.base_vectors = base_vectors
+        self.dim = base_vectors.shape[1]
+        # 변형 chunk의 source_row_id = 원본 id + replica * stride (원본 id와 겹치지 않게)
+        sids = [b["metadata"].get("source_row_id") for b in base]
+        self._sid_stride = 1 + max((int(x) for x in sids if str(x).isdigit()), default=0)
+
+    @classmethod
+    def from_files(cls, vectors: Union[str, Path, None] = None, seed: int = 0) -> "SyntheticCorpus":
+        """
+        vectors가 None이면 chunked_*.jsonl·.parquet + 난수 기준 벡터,
+        embedded JSONL·Parquet 파일/디렉터리면 그 chunk와 실제 임베딩을 기준으로 사용.
+        """
+        paths = artifact_paths(CHUNKED_DIR, "chunked") if vectors is None else None
+        if paths is None:
+            from .memory import _jsonl_paths
+
+            paths = _jsonl_paths(vectors)
+        base: list[dict[str, Any]] = []
+        vecs: list[list[float]] = []
+        for p in paths:
+            for item in iter_records(p):
+                if vectors is not None and not item.get("embedding"):
+                    continue
+                base.append({"text": item.get("text", ""), "metadata": item.get("metadata") or {}})
+                if vectors is not None:
+                    vecs.append(item["embedding"])
+        return cls(base, np.asarray(vecs, dtype=np.float32) if vectors is not None else None, seed)
+
+    def _row(self, i: int, rng: np.random.Generator) -> tuple[str, dict[str, Any]]:
+        b = i % len(self.base)
+        replica = i // len(self.base)
+        src = self.base[b]
+        text = src["text"]
+        if replica:
+            lines = text.split("\n")
+            if len(lines) > 2:
+                head, body = lines[:1], lines[1:]
+                rng.shuffle(body)
+                lines = head + body
+            text = "\n".join(lines) + f"\n(변형 {replica})"
+        meta = dict(src["metadata"])
+        meta.pop("content_hash", None)
+        sid = meta.get("source_row_id")
+        if str(sid).isdigit():
+            meta["source_row_id"] = int(sid) + replica * self._sid_stride
+        return text, with_sort_fields(meta, text)
+
+    def batches(self, n: int, batch: int = _SYNTH_BATCH) -> Iterator[tuple[list[str], list[dict[str, Any]], np.ndarray]]:
+        """(texts, metadata, vectors) batch 단위 생성. 같은 seed·n이면 항상 같은 결과."""
+        for start in range(0, n, batch):
+            rng = np.random.default_rng((self.seed, 0, start))
+            idx = np.arange(start, min(n, start + batch))
+            rows = [self._row(int(i), rng) for i in idx]
+            noise = rng.standard_normal((len(idx), self.dim), dtype=np.float32) * (_NOISE / np.sqrt(self.dim))
+            yield [r[0] for r in rows], [r[1] for r in rows], self.base_vectors[idx % len(self.base)] + noise
+
+    def query_vectors(self, n_queries: int) -> list[np.ndarray]:
+        """기준 벡터 근처 질의 벡터 (기준 벡터를 고르게 순환)."""
+        rng = np.random.default_rng((self.seed, 1))  # 합성 batch (seed, 0, start)와 다른 stream
+        picks = rng.integers(0, len(self.base), n_queries)
+        noise = rng.standard_normal((n_queries, self.dim), dtype=np.float32) * (2 * _NOISE / np.sqrt(self.dim))
+        return list(self.base_vectors[picks] + noise)
+
+    def most_common(self, key: str) -> Optional[str]:
+        counts: dict[str, int] = {}
+        for b in self.base:
+            v = b["metadata"].get(key)
+            if v:
+                counts[v] = counts.get(v, 0) + 1
+        return max(counts, key=counts.get) if counts else None
+
+
+def _measure_queries(
+    corpus: SyntheticCorpus,
+    n_queries: int,
+    limit: int,
+    retrieve_kwargs: Optional[dict[str, Any]] = None,
+) -> dict[str, dict[str, float]]:
+    """필터 조합별 retrieve() 지연 시간 {"p50_ms", "p95_ms", "p99_ms", "mean_ms", "rows"}."""
+    from .retriever import retrieve
+
+    vectors = corpus.query_vectors(n_queries)
+    lookup = {f"q{i}": v for i, v in enumerate(vectors)}
+    company = corpus.most_common("company")
+    out: dict[str, dict[str, float]] = {}
+    for name, filters in FILTER_SETS.items():
+        filters = {k: (company if k == "company" and v is None else v) for k, v in filters.items()}
+        kwargs = {**(retrieve_kwargs or {}), **filters}
+        retrieve("q0", limit=limit, embed_fn=lookup.__getitem__, **kwargs)  # 워밍업
+        latencies, rows = [], 0
+        for q in lookup:
+            t0 = time.perf_counter()
+            rows += len(retrieve(q, limit=limit, embed_fn=lookup.__getitem__, **kwargs))
+            latencies.append((time.perf_counter() - t0) * 1000)
+        out[name] = {
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "mean_ms": round(sum(latencies) / len(latencies), 2),
+            "rows": round(rows / len(latencies), 1),
+        }
+    return out
+
+
+def bench_memory(corpus: SyntheticCorpus, n: int, n_queries: int = 200, limit: int = 10) -> dict[str, Any]:
+    """in-process 백엔드: 합성 → 행렬 구성(적재) → 필터 컬럼(인덱스) → 질의."""
+    from .memory import MemoryIndex, set_memory_index
+
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    texts: list[str] = []
+    metadata: list[dict[str, Any]] = []
+    matrix = np.empty((n, corpus.dim), dtype=np.float32)
+    for t, m, v in corpus.batches(n):
+        matrix[len(texts): len(texts) + len(t)] = v
+        texts.extend(t)
+        metadata.extend(m)
+    synth_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = MemoryIndex.from_arrays(texts, metadata, matrix)
+    ingest_sec = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for key in ("career_type", "company", "location_sido", "location_gu"):
+        index._column(key)
+    index._years_column()
+    build_sec = time.perf_counter() - t0
+
+    previous_backend = os.environ.get("RETRIEVER_BACKEND")
+    os.environ["RETRIEVER_BACKEND"] = "memory"
+    set_memory_index(index)
+    try:
+        queries = _measure_queries(corpus, n_queries, limit)
+    finally:
+        set_memory_index(None)
+        if previous_backend is None:
+            os.environ.pop("RETRIEVER_BACKEND", None)
+        else:
+            os.environ["RETRIEVER_BACKEND"] = previous_backend
+    result = {
+        "backend": "memory",
+        "n": n,
+        "synth_sec": round(synth_sec, 2),
+        "ingest_sec": round(ingest_sec, 2),
+        "ingest_rows_per_sec": round(n / ingest_sec) if ingest_sec > 0 else None,
+        "index_build_sec": round(build_sec, 2),
+        "queries": queries,
+        "memory_mb": {
+            "embedding_matrix": round(index.matrix.nbytes / 2**20, 1),
+            "process_rss_delta": round(_rss_mb() - rss_before, 1),
+        },
+    }
+    del index, matrix, texts, metadata
+    return result
+
+
+def bench_pg(
+    corpus: SyntheticCorpus,
+    n: int,
+    n_queries: int = 200,
+    limit: int = 10,
+    schema: str = DEFAULT_SCHEMA,
+    index: str = "hnsw",
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    keep: bool = False,
+) -> dict[str, Any]:
+    """
+    PostgreSQL 백엔드: schema 안에 job_embeddings 새로 생성 → COPY 적재 → ANN 인덱스 → retrieve() 질의.
+    PGOPTIONS search_path는 main()에서 연결 전에 설정되어 있어야 함.
+    """
+    from service.embedding.embedding import (
+        PG_TABLE,
+        _get_pg_connection,
+        copy_embeddings,
+        create_ann_index,
+        ensure_pgvector_table,
+    )
+
+    from .retriever import close_pg_pool, init_pg_pool
+
+    conn = _get_pg_connection()
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"CREATE SCHEMA IF NOT EXISTS {schema};")
+            cur.execute(f"DROP TABLE IF EXISTS {schema}.{PG_TABLE};")
+        conn.commit()
+        ensure_pgvector_table(conn)  # search_path 첫 schema(벤치용)에 생성
+
+        def _items() -> Iterator[dict[str, Any]]:
+            for texts, metadata, vectors in corpus.batches(n):
+                for text, meta, vec in zip(texts, metadata, vectors):
+                    yield {"text": text, "metadata": meta, "embedding": vec}
+
+        t0 = time.perf_counter()
+        copy_embeddings(conn, _items(), table=f"{schema}.{PG_TABLE}")
+        conn.commit()
+        ingest_sec = time.perf_counter() - t0
+
+        build_sec = None
+        if index != "none":
+            t0 = time.perf_counter()
+            create_ann_index(
+                conn, index, table=f"{schema}.{PG_TABLE}", m=m, ef_construction=ef_construction,
+                lists=lists or max(1, int(np.sqrt(n))),
+            )
+            build_sec = time.perf_counter() - t0
+        with conn.cursor() as cur:
+            cur.execute(f"ANALYZE {schema}.{PG_TABLE};")
+            cur.execute(
+                "SELECT pg_table_size(%s::regclass), pg_indexes_size(%s::regclass);",
+                (f"{schema}.{PG_TABLE}", f"{schema}.{PG_TABLE}"),
+            )
+            table_bytes, index_bytes = cur.fetchone()
+        conn.commit()
+
+        init_pg_pool(maxconn=1)  # 질의마다 연결을 새로 맺는 시간은 빼고 측정
+        previous_backend = os.environ.get("RETRIEVER_BACKEND")
+        os.environ["RETRIEVER_BACKEND"] = "pg"
+        try:
+            queries = _measure_queries(corpus, n_queries, limit, {"ef_search": ef_search, "probes": probes})
+        finally:
+            close_pg_pool()
+            if previous_backend is None:
+                os.environ.pop("RETRIEVER_BACKEND", None)
+            else:
+                os.environ["RETRIEVER_BACKEND"] = previous_backend
+        return {
+            "backend": "pg",
+            "n": n,
+            "index": index,
+            "ingest_sec": round(ingest_sec, 2),
+            "ingest_rows_per_sec": round(n / ingest_sec) if ingest_sec > 0 else None,
+            "index_build_sec": round(build_sec, 2) if build_sec is not None else None,
+            "queries": queries,
+            "memory_mb": {"table": round(table_bytes / 2**20, 1), "indexes": round(index_bytes / 2**20, 1)},
+        }
+    finally:
+        if not keep:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP SCHEMA IF EXISTS {schema} CASCADE;")
+            conn.commit()
+        conn.close()
+
+
+def _print_result(r: dict[str, Any]) -> None:
+    build = f"{r['index_build_sec']}s" if r.get("index_build_sec") is not None else "-"
+    mem = ", ".join(f"{k} {v}MB" for k, v in r["memory_mb"].items())
+    label = r["backend"] + (f"/{r['index']}" if r.get("index") else "")
+    print(f"\n[{label}] n={r['n']:,}  적재 {r['ingest_sec']}s ({r['ingest_rows_per_sec']:,} rows/s)  인덱스 {build}  메모리: {mem}")
+    for name, q in r["queries"].items():
+        print(f"  {name:<15} p50 {q['p50_ms']:8.2f}ms  p95 {q['p95_ms']:8.2f}ms  p99 {q['p99_ms']:8.2f}ms  결과 {q['rows']}건")
+
+
+def _int_list(text: str) -> list[int]:
+    return [int(x.replace("_", "")) for x in text.split(",") if x.strip()]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="검색 스택 규모 벤치마크 (합성 corpus, pg / memory 백엔드)")
+    parser.add_argument("--backend", default="memory", help="쉼표로 여러 개: memory,pg (기본 memory)")
+    parser.add_argument("--scales", type=_int_list, default=[10000, 100000], help="corpus chunk 수 (예: 100000,1000000)")
+    parser.add_argument("--queries", type=int, default=200, help="필터 조합별 질의 수")
+    parser.add_argument("--limit", type=int, default=10, help="retrieve limit")
+    parser.add_argument("--vectors", default=None, help="기준 벡터로 쓸 embedded JSONL 파일/디렉터리 (기본: 난수)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--schema", default=DEFAULT_SCHEMA, help="pg 벤치용 schema (기본 rag_bench)")
+    parser.add_argument("--index", choices=["hnsw", "ivfflat", "none"], default="hnsw", help="pg ANN 인덱스 (기본 hnsw)")
+    parser.add_argument("--m", type=int, default=16, help="HNSW m")
+    parser.add_argument("--ef-construction", type=int, default=64, dest="ef_construction", help="HNSW ef_construction")
+    parser.add_argument("--lists", type=int, default=None, help="IVFFlat lists (기본 sqrt(n))")
+    parser.add_argument("--ef-search", type=int, default=None, dest="ef_search", help="질의 시 hnsw.ef_search")
+    parser.add_argument("--probes", type=int, default=None, help="질의 시 ivfflat.probes")
+    parser.add_argument("--keep", action="store_true", help="pg 벤치 schema를 지우지 않음")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    backends = [b.strip() for b in args.backend.split(",") if b.strip()]
+    unknown = set(backends) - {"memory", "pg"}
+    if unknown:
+        parser.error(f"알 수 없는 backend: {', '.join(sorted(unknown))}")
+    if "pg" in backends:
+        # 모든 연결(벤치 적재, retrieve 풀)이 벤치 schema의 job_embeddings를 먼저 보도록 (libpq 환경 변수)
+        os.environ["PGOPTIONS"] = f"{os.environ.get('PGOPTIONS', '')} -c search_path={args.schema},public".strip()
+
+    corpus = SyntheticCorpus.from_files(args.vectors, seed=args.seed)
+    print(f"원본 chunk {len(corpus.base):,}개 · 벡터 {'난수' if args.vectors is None else args.vectors} · 차원 {corpus.dim}")
+
+    results = []
+    for n in args.scales:
+        for backend in backends:
+            if backend == "memory":
+                r = bench_memory(corpus, n, args.queries, args.limit)
+            else:
+                r = bench_pg(
+                    corpus, n, args.queries, args.limit,
+                    schema=args.schema, index=args.index, m=args.m, ef_construction=args.ef_construction,
+                    lists=args.lists, ef_search=args.ef_search, probes=args.probes, keep=args.keep,
+                )
+            _print_result(r)
+            results.append(r)
+
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+In-process 검색 백엔드: embedded JSONL/Parquet을 메모리 행렬로 올려 pgvector 없이 같은 결과 형식으로 검색.
+부하 테스트·벤치마크·CI처럼 PostgreSQL 없이 retrieve → rerank → generate 전체 경로를 돌릴 때 사용.
+
+설정: RETRIEVER_BACKEND=memory
+      RETRIEVER_MEMORY_PATH=embedded JSONL·Parquet 파일 또는 디렉터리 (기본 service/embedding/embedded, 쉼표로 여러 개)
+Parquet은 embedding 컬럼(고정 길이 float32)을 행렬로 바로 읽어 JSONL보다 로드가 훨씬 빠름.
+거리는 pgvector `<=>`와 같은 cosine distance (1 - cosine similarity).
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+import numpy as np
+
+from service.columnar import is_parquet, read_embedded_arrays
+from service.sort_keys import parse_company_years
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_MEMORY_PATH = _PROJECT_ROOT / "service" / "embedding" / "embedded"
+
+_lock = threading.Lock()
+_index: Optional["MemoryIndex"] = None
+_index_key: Optional[str] = None
+_PINNED_KEY = "<in-process>"
+
+
+def _as_text(value: Any) -> Optional[str]:
+    """PostgreSQL `metadata->>'key'`와 같은 문자열 표현 (숫자 18.0 → "18.0")."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False)
+
+
+def _jsonl_paths(path: Union[str, Path]) -> list[Path]:
+    """쉼표로 구분한 파일/디렉터리 → embedded 파일 목록 (디렉터리는 *.jsonl, *.parquet)."""
+    paths: list[Path] = []
+    for part in str(path).split(","):
+        p = Path(part.strip())
+        if p.is_dir():
+            paths.extend(sorted(q for q in p.iterdir() if q.suffix in (".jsonl", ".parquet")))
+        elif p.exists():
+            paths.append(p)
+    return paths
+
+
+class MemoryIndex:
+    """chunk 본문·메타데이터·정규화된 float32 임베딩 행렬. 검색은 행렬-벡터 곱 1회."""
+
+    def __init__(self, items: Iterable[dict[str, Any]]) -> None:
+        self.texts: list[str] = []
+        self.metadata: list[dict[str, Any]] = []
+        vectors: list[list[float]] = []
+        for item in items:
+            vec = item.get("embedding")
+            if not vec:
+                continue
+            self.texts.append(item.get("text", ""))
+            self.metadata.append(item.get("metadata") or {})
+            vectors.append(vec)
+        matrix = np.asarray(vectors, dtype=np.float32) if vectors else np.zeros((0, 0), dtype=np.float32)
+        self._set_matrix(matrix)
+
+    def _set_matrix(self, matrix: np.ndarray) -> None:
+        if len(matrix):
+            norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            matrix /= norms
+        self.matrix = matrix
+        # 필터 컬럼별 문자열 배열 (요청마다 dict 순회하지 않도록 처음 쓸 때 만들어 재사용)
+        self._columns: dict[str, np.ndarray] = {}
+        self._company_years: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        texts: list[str],
+        metadata: list[dict[str, Any]],
+        matrix: np.ndarray,
+    ) -> "MemoryIndex":
+        """이미 만든 (n, dim) 행렬로 인덱스 생성 (대량 합성 데이터 등, 행별 list 변환 없이). matrix는 제자리 정규화."""
+        if not (len(texts) == len(metadata) == len(matrix)):
+            raise ValueError("texts, metadata, matrix 길이가 같아야 합니다.")
+        index = cls.__new__(cls)
+        index.texts = list(texts)
+        index.metadata = list(metadata)
+        index._set_matrix(np.asarray(matrix, dtype=np.float32))
+        return index
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_jsonl(cls, path: Union[str, Path]) -> "MemoryIndex":
+        """embedded JSONL·Parquet 파일/디렉터리 → 인덱스 (Parquet은 행별 list 변환 없이 행렬로)."""
+        texts: list[str] = []
+        metadata: list[dict[str, Any]] = []
+        matrices: list[np.ndarray] = []
+        for p in _jsonl_paths(path):
+            if is_parquet(p):
+                # embedding 컬럼이 고정 길이라 빈 임베딩 행이 없음 → 행렬 그대로
+                part_texts, part_meta, matrix = read_embedded_arrays(p)
+                texts.extend(part_texts)
+                metadata.extend(part_meta)
+                matrices.append(matrix)
+                continue
+            vectors: list[list[float]] = []
+            with open(p, encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    item = json.loads(line)
+                    vec = item.get("embedding")
+                    if not vec:
+                        continue
+                    texts.append(item.get("text", ""))
+                    metadata.append(item.get("metadata") or {})
+                    vectors.append(vec)
+            if vectors:
+                matrices.append(np.asarray(vectors, dtype=np.float32))
+        matrices = [m for m in matrices if len(m)]
+        matrix = np.concatenate(matrices) if matrices else np.zeros((0, 0), dtype=np.float32)
+        return cls.from_arrays(texts, metadata, matrix)
+
+    def _column(self, key: str) -> np.ndarray:
+        col = self._columns.get(key)
+        if col is None:
+            col = np.array([_as_text(m.get(key)) for m in self.metadata], dtype=object)
+            self._columns[key] = col
+        return col
+
+    def _years_column(self) -> np.ndarray:
+        """업력(정수 년차, 없으면 NaN) 배열 — PostgreSQL company_years 컬럼과 같은 값."""
+        if self._company_years is None:
+            years = [
+                m["company_years"] if m.get("company_years") is not None else parse_company_years(m.get("company_years_num"))
+                for m in self.metadata
+            ]
+            self._company_years = np.array([np.nan if y is None else y for y in years], dtype=np.float64)
+        return self._company_years
+
+    def search(
+        self,
+        query_vec: list[float],
+        filters: Optional[dict[str, str]] = None,
+        limit: int = 100,
+        years_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+    ) -> list[tuple[int, str, dict[str, Any], float]]:
+        """cosine distance 오름차순 상위 limit건 [(id, text, metadata, distance)] (retriever SQL 결과와 같은 형태)."""
+        if not len(self):
+            return []
+        q = np.asarray(query_vec, dtype=np.float32)
+        norm = float(np.linalg.norm(q)) or 1.0
+        distances = 1.0 - self.matrix @ (q / norm)
+        candidates = np.arange(len(self))
+        for key, value in (filters or {}).items():
+            candidates = candidates[self._column(key)[candidates] == value]
+        if years_range is not None:
+            # NaN(업력 없음)은 비교가 항상 False → SQL의 NULL처럼 제외
+            lo, hi = years_range
+            years = self._years_column()[candidates]
+            keep = np.ones(len(candidates), dtype=bool)
+            if lo is not None:
+                keep &= years >= lo
+            if hi is not None:
+                keep &= years <= hi
+            candidates = candidates[keep]
+        if not len(candidates):
+            return []
+        d = distances[candidates]
+        if len(candidates) > limit:
+            top = np.argpartition(d, limit - 1)[:limit]
+            candidates, d = candidates[top], d[top]
+        order = np.argsort(d, kind="stable")
+        return [(int(i), self.texts[i], self.metadata[i], float(dist)) for i, dist in zip(candidates[order], d[order])]
+
+    def chunk_groups(
+        self,
+        keys: set[tuple[str, Any, Any]],
+        groups: list[str],
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """(source_row_id 문자열, company, job_role) 공고들의 지정 그룹 chunk [(text, metadata)] (fetch_chunk_groups SQL과 동일 조건)."""
+        wanted = set(groups)
+        return [
+            (text, meta)
+            for text, meta in zip(self.texts, self.metadata)
+            if meta.get("chunk_group") in wanted
+            and (_as_text(meta.get("source_row_id")), meta.get("company"), meta.get("job_role")) in keys
+        ]
+
+
+def use_memory_backend() -> bool:
+    return (os.environ.get("RETRIEVER_BACKEND") or "pg").lower() == "memory"
+
+
+def get_memory_index(path: Optional[Union[str, Path]] = None) -> MemoryIndex:
+    """프로세스 공용 인덱스 (경로가 바뀌면 다시 로드)."""
+    global _index, _index_key
+    key = str(path or os.environ.get("RETRIEVER_MEMORY_PATH") or DEFAULT_MEMORY_PATH)
+    with _lock:
+        if path is None and _index is not None and _index_key == _PINNED_KEY:
+            return _index
+        if _index is None or _index_key != key:
+            _index = MemoryIndex.from_jsonl(key)
+            _index_key = key
+            if not len(_index):
+                print(f"memory 검색 백엔드: {key}에 임베딩된 chunk가 없습니다.")
+        return _index
+
+
+def set_memory_index(index: Optional[MemoryIndex]) -> None:
+    """이미 만든 인덱스를 공용으로 고정 (벤치마크에서 합성 corpus를 파일 없이 쓸 때). None이면 해제."""
+    global _index, _index_key
+    with _lock:
+        _index = index
+        _index_key = _PINNED_KEY if index is not None else None
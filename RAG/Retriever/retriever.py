@@ -1,15 +1,22 @@
 """
 Retriever: 벡터 검색 + 메타데이터 필터 결합.
 팀장님 요구: 회사명·직무 카테고리·경력 여부·회사 규모로 필터하며 벡터 검색 결과와 결합.
+검색 백엔드는 PostgreSQL(pgvector) 기본, RETRIEVER_BACKEND=memory면 in-process 인덱스(memory.py).
 """
 
 import json
 import os
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from dotenv import load_dotenv
 
+from RAG.tracing import span
+from .memory import get_memory_index, use_memory_backend
+
 # 프로젝트 루트 .env 로드 (RAG/Retriever 기준 상위 두 단계)
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
@@ -46,6 +53,93 @@ def _get_pg_connection():
     )
 
 
+_pool_lock = threading.Lock()
+_pool = None
+_pool_slots: Optional[threading.BoundedSemaphore] = None
+# register_vector를 마친 풀 연결 (연결 객체 기준, 닫혀서 사라진 연결은 자동으로 빠짐)
+_vector_registered: "weakref.WeakSet[Any]" = weakref.WeakSet()
+
+
+def init_pg_pool(minconn: Optional[int] = None, maxconn: Optional[int] = None) -> None:
+    """
+    PostgreSQL 연결 풀 생성 (HTTP 서버 시작 시 등). 이후 retrieve/fetch_chunk_groups는 풀에서 연결을 빌려 씀.
+    maxconn 미지정 시 PG_POOL_MAX (기본 10). 풀이 없으면 요청마다 연결을 새로 맺음 (기존 동작).
+    minconn 미지정 시 PG_POOL_MIN (기본 maxconn). psycopg2 풀은 반납 시 놀고 있는 연결이 minconn개를 넘으면 닫아 버리므로,
+    minconn이 작으면 동시 요청 뒤마다 연결을 다시 맺게 됨.
+    """
+    global _pool, _pool_slots
+    from psycopg2.pool import ThreadedConnectionPool
+
+    maxconn = maxconn or int(os.environ.get("PG_POOL_MAX", "10"))
+    minconn = min(minconn or int(os.environ.get("PG_POOL_MIN", maxconn)), maxconn)
+    with _pool_lock:
+        if _pool is not None:
+            return
+        url = os.environ.get("DATABASE_URL")
+        if url:
+            _pool = ThreadedConnectionPool(minconn, maxconn, url)
+        else:
+            _pool = ThreadedConnectionPool(
+                minconn,
+                maxconn,
+                host=os.environ.get("PGHOST", "localhost"),
+                port=os.environ.get("PGPORT", "5432"),
+                dbname=os.environ.get("PGDATABASE", "postgres"),
+                user=os.environ.get("PGUSER", "postgres"),
+                password=os.environ.get("PGPASSWORD", ""),
+            )
+        # ThreadedConnectionPool은 빈 연결이 없으면 바로 예외 → 세마포어로 반납될 때까지 대기
+        _pool_slots = threading.BoundedSemaphore(maxconn)
+
+
+def close_pg_pool() -> None:
+    global _pool, _pool_slots
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+        _pool, _pool_slots = None, None
+        _vector_registered.clear()
+
+
+@contextmanager
+def _pg_connection(vector: bool = False) -> Iterator[Any]:
+    """풀이 있으면 빌려 쓰고 반납, 없으면 새로 연결하고 닫음. vector=True면 pgvector 타입 등록."""
+    pool, slots = _pool, _pool_slots
+    if pool is None or slots is None:
+        conn = _get_pg_connection()
+        try:
+            if vector:
+                from pgvector.psycopg2 import register_vector
+                register_vector(conn)
+            yield conn
+        finally:
+            conn.close()
+        return
+    with slots:
+        conn = pool.getconn()
+        broken = False
+        try:
+            if vector and conn not in _vector_registered:
+                from pgvector.psycopg2 import register_vector
+                register_vector(conn)
+                _vector_registered.add(conn)
+            yield conn
+            conn.rollback()  # 읽기 전용이지만 열린 트랜잭션을 남기지 않음
+        except Exception:
+            # 실패한 쿼리로 중단된 트랜잭션 정리, 연결 자체가 끊겼으면 풀에서 폐기
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            raise
+        finally:
+            if broken:
+                _vector_registered.discard(conn)
+            pool.putconn(conn, close=broken)
+
+
 def retrieve(
     query: str,
     *,
@@ -53,9 +147,15 @@ def retrieve(
     job_role: Optional[str] = None,
     career_type: Optional[str] = None,
     company_years_num: Optional[str] = None,
+    location: Optional[str] = None,
+    company_years_min: Optional[int] = None,
+    company_years_max: Optional[int] = None,
     limit: int = 10,
     max_distance: Optional[float] = None,
     embed_fn=None,
+    fetch_limit: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
 ) -> list[dict[str, Any]]:
     """
     질의문으로 벡터 유사도 검색 + 메타데이터 필터 결합.
@@ -67,40 +167,98 @@ def retrieve(
         job_role: 직무/직무 카테고리 필터.
         career_type: 경력 여부 (예: 신입, 경력, 무관).
         company_years_num: 회사 규모(업력) 필터 (예: "5년차").
+        location: 근무지역 필터 — "서울"(시도) 또는 "서울 강남구"(시도 시군구), service.facets의 location 값.
+        company_years_min, company_years_max: 업력 범위 필터 (포함, 정수 년차). facet 업력 구간의 min/max.
         limit: 반환할 최대 건수.
         max_distance: 이 값보다 큰 distance는 제외 (precision 향상, None이면 미적용).
         embed_fn: 임베딩 함수 (미지정 시 OpenAI 사용).
+        fetch_limit: 공고 중복 제거 전 후보 건수 (None이면 max(limit * 15, 100)).
+        ef_search, probes: pgvector HNSW `hnsw.ef_search` / IVFFlat `ivfflat.probes` (이번 질의에만 적용,
+            ANN 인덱스가 있을 때만 의미 있음. memory 백엔드는 전수 검색이라 무시).
 
     Returns:
         [{"id", "text", "metadata", "distance"}, ...]
     """
     embed_fn = embed_fn or _get_embed_fn()
-    query_vec = embed_fn(query.strip() or "")
+    with span("retrieve.embed"):
+        query_vec = embed_fn(query.strip() or "")
     if len(query_vec) != OPENAI_EMBED_DIM:
         raise ValueError(f"임베딩 차원이 {OPENAI_EMBED_DIM}이어야 합니다.")
 
-    # 메타데이터 필터 조건: 지정된 것만 WHERE에 추가
-    filters = []
-    params: list[Any] = [query_vec]
-
-    if company is not None:
-        filters.append("metadata->>'company' = %s")
-        params.append(company)
-    if job_role is not None:
-        filters.append("metadata->>'job_role' = %s")
-        params.append(job_role)
-    if career_type is not None:
-        filters.append("metadata->>'career_type' = %s")
-        params.append(career_type)
-    if company_years_num is not None:
-        filters.append("metadata->>'company_years_num' = %s")
-        params.append(company_years_num)
-
-    where_sql = " AND ".join(filters) if filters else "TRUE"
+    # 메타데이터 필터 조건: 지정된 것만 적용 (metadata 키 → 값, 정확 일치)
+    equals = {
+        key: value
+        for key, value in (
+            ("company", company),
+            ("job_role", job_role),
+            ("career_type", career_type),
+            ("company_years_num", company_years_num),
+            *_location_filters(location),
+        )
+        if value is not None
+    }
+    years_range = (company_years_min, company_years_max)
+    if years_range == (None, None):
+        years_range = None
 
     # 같은 공고 여러 청크가 나올 수 있으므로, 공고당 1건만 쓰려면 후보를 더 가져옴
-    fetch_limit = max(limit * 15, 100)
+    fetch_limit = fetch_limit or max(limit * 15, 100)
+
+    n_filters = len(equals) + (years_range is not None)
+    with span("retrieve.query", fetch_limit=fetch_limit, n_filters=n_filters) as sp:
+        if use_memory_backend():
+            sp.set(backend="memory")
+            rows = get_memory_index().search(query_vec, equals, fetch_limit, years_range=years_range)
+        else:
+            rows = _query_pg(query_vec, equals, fetch_limit, years_range=years_range, ef_search=ef_search, probes=probes)
+        sp.set(rows=len(rows))
+
+    results = [
+        {
+            "id": r[0],
+            "text": r[1],
+            "metadata": r[2] if isinstance(r[2], dict) else (json.loads(r[2]) if r[2] else {}),
+            "distance": float(r[3]),
+        }
+        for r in rows
+    ]
+
+    # 같은 공고(동일 source_row_id + company + job_role)는 distance가 가장 좋은 1건만 유지
+    deduped = _dedupe_by_job(results)
+    if max_distance is not None:
+        deduped = [x for x in deduped if x["distance"] <= max_distance]
+    return sorted(deduped, key=lambda x: x["distance"])[:limit]
+
+
+def _location_filters(location: Optional[str]) -> list[tuple[str, Optional[str]]]:
+    """ "서울 강남구" → [("location_sido", "서울"), ("location_gu", "강남구")], "서울" → 시도만."""
+    if not location or not location.strip():
+        return []
+    sido, _, gu = location.strip().partition(" ")
+    return [("location_sido", sido), ("location_gu", gu.strip() or None)]
+
 
+def _query_pg(
+    query_vec: list[float],
+    equals: dict[str, str],
+    fetch_limit: int,
+    years_range: Optional[tuple[Optional[int], Optional[int]]] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+) -> list[tuple]:
+    """pgvector 유사도 검색 (필터는 WHERE, 정렬은 cosine distance). [(id, text, metadata, distance)]"""
+    filters = [f"metadata->>'{key}' = %s" for key in equals]
+    filter_values: list[Any] = list(equals.values())
+    # 업력 범위는 ingest 때 채운 company_years 컬럼(정수, 인덱스 있음)으로 비교
+    if years_range is not None:
+        lo, hi = years_range
+        if lo is not None:
+            filters.append("company_years >= %s")
+            filter_values.append(int(lo))
+        if hi is not None:
+            filters.append("company_years <= %s")
+            filter_values.append(int(hi))
+    where_sql = " AND ".join(filters) if filters else "TRUE"
     sql = f"""
         SELECT id, text, metadata,
                embedding <=> %s::vector AS distance
@@ -110,37 +268,66 @@ def retrieve(
         LIMIT %s
     """
     # %s 순서: query_vec(SELECT), 필터값들..., query_vec(ORDER BY), fetch_limit
-    params_insert = [query_vec] + params[1:] + [query_vec, fetch_limit]
+    params_insert = [query_vec, *filter_values, query_vec, fetch_limit]
 
     try:
-        from pgvector.psycopg2 import register_vector
+        import pgvector.psycopg2  # noqa: F401
     except ImportError:
         raise RuntimeError("pgvector 패키지가 필요합니다. pip install pgvector")
 
-    conn = _get_pg_connection()
-    try:
-        register_vector(conn)
+    with _pg_connection(vector=True) as conn:
         with conn.cursor() as cur:
+            # SET LOCAL: 이 트랜잭션에만 적용 (풀 연결을 돌려준 뒤 다른 요청에 남지 않음)
+            if ef_search is not None:
+                cur.execute("SET LOCAL hnsw.ef_search = %s", (int(ef_search),))
+            if probes is not None:
+                cur.execute("SET LOCAL ivfflat.probes = %s", (int(probes),))
             cur.execute(sql, params_insert)
-            rows = cur.fetchall()
-    finally:
-        conn.close()
+            return cur.fetchall()
 
-    results = [
-        {
-            "id": r[0],
-            "text": r[1],
-            "metadata": r[2] if isinstance(r[2], dict) else (json.loads(r[2]) if r[2] else {}),
-            "distance": float(r[3]),
-        }
-        for r in rows
-    ]
 
-    # 같은 공고(동일 source_row_id + company + job_role)는 distance가 가장 좋은 1건만 유지
-    deduped = _dedupe_by_job(results)
-    if max_distance is not None:
-        deduped = [x for x in deduped if x["distance"] <= max_distance]
-    return sorted(deduped, key=lambda x: x["distance"])[:limit]
+def fetch_chunk_groups(
+    items: list[dict[str, Any]],
+    groups: list[str],
+) -> dict[tuple[Any, ...], dict[str, str]]:
+    """
+    검색된 공고들의 다른 chunk 그룹(예: 주요업무) 본문을 한 번의 쿼리로 가져옴.
+    Retriever는 공고당 가장 가까운 chunk 1건만 남기므로, context에 필요한 그룹은 따로 조회.
+
+    Returns:
+        _job_key(item) → {chunk_group: text}. source_row_id 없는 공고는 제외.
+    """
+    keys = []
+    for item in items:
+        meta = item.get("metadata") or {}
+        if meta.get("source_row_id") is None:
+            continue
+        keys.append((str(meta.get("source_row_id")), meta.get("company"), meta.get("job_role")))
+    if not keys or not groups:
+        return {}
+
+    sql = f"""
+        SELECT text, metadata
+        FROM {PG_TABLE}
+        WHERE metadata->>'chunk_group' = ANY(%s)
+          AND (metadata->>'source_row_id', metadata->>'company', metadata->>'job_role') IN %s
+    """
+    with span("retrieve.groups", n_postings=len(keys)) as sp:
+        if use_memory_backend():
+            rows = get_memory_index().chunk_groups(set(keys), list(groups))
+        else:
+            with _pg_connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute(sql, (list(groups), tuple(keys)))
+                    rows = cur.fetchall()
+        sp.set(rows=len(rows))
+
+    out: dict[tuple[Any, ...], dict[str, str]] = {}
+    for text, meta in rows:
+        meta = meta if isinstance(meta, dict) else (json.loads(meta) if meta else {})
+        by_group = out.setdefault(_job_key({"metadata": meta}), {})
+        by_group.setdefault(meta.get("chunk_group"), text)
+    return out
 
 
 def _job_key(item: dict[str, Any]) -> tuple[Any, ...]:
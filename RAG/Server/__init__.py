@@ -0,0 +1,5 @@
+# Server: retrieve/rerank/generate HTTP API (worker 풀 + singleflight) 및 클라이언트
+from .client import RAGClient, get_server_client
+from .server import RAGService, make_server, serve
+
+__all__ = ["RAGClient", "RAGService", "get_server_client", "make_server", "serve"]
@@ -0,0 +1,31 @@
+"""
+CLI: python -m RAG.Server [--addr 127.0.0.1:8000] [--workers 8] [--max-queue 32] [--timeout 30] [--no-coalesce]
+"""
+import argparse
+import os
+
+from .server import DEFAULT_ADDR, DEFAULT_MAX_QUEUE, DEFAULT_TIMEOUT_SEC, DEFAULT_WORKERS, serve
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="RAG HTTP 서버 (/retrieve, /rerank, /generate)")
+    parser.add_argument("--addr", default=os.environ.get("RAG_SERVER_ADDR") or DEFAULT_ADDR, help="host:port")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="요청 처리 worker 스레드 수")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, dest="max_queue", help="worker가 모두 바쁠 때 대기 가능한 요청 수 (넘으면 503)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SEC, help="요청 timeout(초, 넘으면 504)")
+    parser.add_argument("--no-coalesce", action="store_true", help="동일 요청 합치기(singleflight) 끄기")
+    parser.add_argument("--no-preload", action="store_true", help="시작 시 reranker 모델 미리 로드하지 않음")
+    args = parser.parse_args()
+
+    serve(
+        args.addr,
+        workers=args.workers,
+        max_queue=args.max_queue,
+        timeout=args.timeout,
+        coalesce=not args.no_coalesce,
+        preload_reranker=not args.no_preload,
+    )
+
+
+if __name__ == "__main__":
+    main()
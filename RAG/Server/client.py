@@ -0,0 +1,90 @@
+"""
+RAG HTTP 서버 클라이언트 (Streamlit 등 UI용). 표준 라이브러리(urllib)만 사용.
+RAG_SERVER_URL 설정 시 get_server_client()가 클라이언트를 돌려줌.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+from typing import Any, Iterator, Optional
+
+# 서버 timeout(기본 30초)보다 약간 길게: 서버가 504/추출형 답변을 먼저 돌려주도록
+DEFAULT_CLIENT_TIMEOUT_SEC = 35.0
+
+
+class RAGClient:
+    """POST /retrieve, /rerank, /generate 호출. 오류 응답은 RuntimeError."""
+
+    def __init__(self, base_url: str, timeout: float = DEFAULT_CLIENT_TIMEOUT_SEC) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def _post(self, endpoint: str, body: dict[str, Any]):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        req = urllib.request.Request(
+            f"{self.base_url}/{endpoint}",
+            data=data,
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            return urllib.request.urlopen(req, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read() or b"{}").get("error") or e.reason
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f"RAG 서버 오류 {e.code}: {message}") from None
+
+    def _post_json(self, endpoint: str, body: dict[str, Any]) -> dict[str, Any]:
+        with self._post(endpoint, body) as resp:
+            return json.loads(resp.read() or b"{}")
+
+    def retrieve(self, query: str, **params: Any) -> list[dict[str, Any]]:
+        return self._post_json("retrieve", {"query": query, **params})["items"]
+
+    def rerank(self, query: str, items: Optional[list[dict[str, Any]]] = None, **params: Any) -> list[dict[str, Any]]:
+        body: dict[str, Any] = {"query": query, **params}
+        if items is not None:
+            body["items"] = items
+        return self._post_json("rerank", body)["items"]
+
+    def generate(self, query: str, **params: Any) -> dict[str, Any]:
+        """RAG.Generate.generate()와 같은 인자·결과."""
+        return self._post_json("generate", {"query": query, **params})
+
+    def generate_stream(self, query: str, **params: Any) -> Iterator[dict[str, Any]]:
+        """RAG.Generate.generate_stream()과 같은 이벤트 (sources → token... → done)."""
+        with self._post("generate", {"query": query, "stream": True, **params}) as resp:
+            for line in resp:
+                line = line.strip()
+                if not line:
+                    continue
+                event = json.loads(line)
+                if event.get("type") == "error":
+                    raise RuntimeError(f"RAG 서버 오류: {event.get('error')}")
+                yield event
+
+    def facets(self, field: Optional[str] = None, q: str = "", limit: int = 10) -> dict[str, Any]:
+        """GET /facets: field 없으면 전체 facet, 있으면 자동완성 후보 {"field", "items": [{"value", "count"}]}."""
+        params = {"field": field, "q": q, "limit": limit} if field else {}
+        url = f"{self.base_url}/facets"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+            return json.loads(resp.read() or b"{}")
+
+    def health(self) -> bool:
+        try:
+            with urllib.request.urlopen(f"{self.base_url}/health", timeout=2.0) as resp:
+                return resp.status == 200
+        except OSError:
+            return False
+
+
+def get_server_client() -> Optional[RAGClient]:
+    """RAG_SERVER_URL(예: http://127.0.0.1:8000)이 있으면 클라이언트, 없으면 None (in-process 실행)."""
+    url = os.environ.get("RAG_SERVER_URL")
+    return RAGClient(url) if url else None
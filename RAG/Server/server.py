@@ -0,0 +1,439 @@
+"""
+RAG HTTP 서버: /retrieve, /rerank, /generate를 worker 스레드 풀에서 처리하는 장기 실행 프로세스.
+시작 시 reranker 모델·PostgreSQL 연결 풀·OpenAI 클라이언트를 한 번 준비하고 모든 요청이 공유.
+
+- worker 풀 + 대기열 상한: 처리 중+대기 요청이 workers+max_queue를 넘으면 503 (과부하 시 빠르게 거절)
+- 요청 timeout: 넘기면 504. /generate는 timeout 안에 끝나도록 deadline_sec를 기본 적용 (LLM 지연 시 추출형 답변)
+- singleflight: 같은 endpoint·같은 인자의 요청이 처리 중이면 결과를 공유 (스트리밍 제외)
+
+실행: python -m RAG.Server [--addr 127.0.0.1:8000] [--workers 8] [--max-queue 32] [--timeout 30]
+요청: POST /generate {"query": "...", "use_rerank": true, ...}  ("stream": true면 generate_stream 이벤트를 NDJSON으로)
+상태: GET /health, GET /stats
+필터 자동완성: GET /facets?field=company&q=에스피 (service.facets 인덱스, 메모리 조회)
+"""
+
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterator, Optional
+from urllib.parse import parse_qs, urlsplit
+
+from .singleflight import SingleFlight
+
+DEFAULT_ADDR = "127.0.0.1:8000"
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_TIMEOUT_SEC = 30.0
+# /generate 기본 deadline = timeout - 이 값 (추출형 대체 답변을 만들어 돌려줄 여유)
+_DEADLINE_MARGIN_SEC = 1.0
+
+FILTER_PARAMS = {
+    "company", "job_role", "career_type", "company_years_num", "location", "company_years_min", "company_years_max",
+}
+RETRIEVE_PARAMS = FILTER_PARAMS | {"limit", "max_distance"}
+RERANK_PARAMS = {"items", "top_k", "model_name", "retrieve_limit"}
+GENERATE_PARAMS = FILTER_PARAMS | {
+    "retrieve_limit", "max_distance", "use_rerank", "rerank_top_k", "model", "context_tokens", "deadline_sec", "hedge_delay_sec",
+    "hedge_model", "answer_mode",
+}
+
+
+class BadRequest(ValueError):
+    """요청 형식 오류 (400)."""
+
+
+class Overloaded(Exception):
+    """worker 풀과 대기열이 가득 참 (503)."""
+
+
+class RequestTimeout(Exception):
+    """요청 timeout 초과 (504)."""
+
+
+class RAGService:
+    """worker 풀·대기열 상한·timeout·singleflight를 적용해 retrieve/rerank/generate 실행."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        timeout: float = DEFAULT_TIMEOUT_SEC,
+        coalesce: bool = True,
+    ) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.coalesce = coalesce
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rag-worker")
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._flight = SingleFlight()
+        self._stats_lock = threading.Lock()
+        self._stats = {"requests": 0, "rejected": 0, "timeouts": 0, "errors": 0, "streams": 0}
+        self._handlers: dict[str, tuple[set[str], Callable[[str, dict[str, Any]], dict[str, Any]]]] = {
+            "retrieve": (RETRIEVE_PARAMS, self._retrieve),
+            "rerank": (RERANK_PARAMS, self._rerank),
+            "generate": (GENERATE_PARAMS, self._generate),
+        }
+
+    # ---- 시작 시 자원 준비 ----
+
+    def warmup(self, *, preload_reranker: bool = True) -> dict[str, str]:
+        """모델·DB 풀·클라이언트를 첫 요청 전에 준비. 단계별 결과("ok"/"skip"/오류 메시지) 반환."""
+        status: dict[str, str] = {}
+
+        def step(name: str, fn: Callable[[], Optional[str]]) -> None:
+            t0 = time.perf_counter()
+            try:
+                note = fn()
+                status[name] = note or "ok"
+            except Exception as e:
+                status[name] = f"실패: {e}"
+            print(f"  {name}: {status[name]} ({time.perf_counter() - t0:.2f}s)")
+
+        from RAG.Retriever.memory import get_memory_index, use_memory_backend
+
+        print("RAG 서버 준비 중...")
+        if use_memory_backend():
+            step("memory_index", lambda: f"{len(get_memory_index())} chunks")
+        else:
+            from RAG.Retriever import init_pg_pool
+
+            step("pg_pool", lambda: init_pg_pool(maxconn=max(self.workers, 1)))
+
+        def _openai() -> Optional[str]:
+            from service.openai_client import get_openai_client
+
+            return None if get_openai_client() is not None else "skip (OPENAI_API_KEY 없음)"
+
+        step("openai_client", _openai)
+
+        def _reranker() -> Optional[str]:
+            if os.environ.get("RERANK_WORKER_ADDR"):
+                return "skip (rerank worker 사용)"
+            if not preload_reranker:
+                return "skip"
+            from RAG.Rerank import preload_model
+
+            return preload_model()
+
+        step("reranker", _reranker)
+
+        def _prompt() -> Optional[str]:
+            from RAG.Generate.prompt import static_system_prompt
+
+            static_system_prompt()
+            return None
+
+        step("prompt", _prompt)
+        return status
+
+    # ---- 요청 처리 ----
+
+    def _incr(self, key: str) -> None:
+        with self._stats_lock:
+            self._stats[key] += 1
+
+    def _acquire_slot(self) -> None:
+        if not self._slots.acquire(blocking=False):
+            self._incr("rejected")
+            raise Overloaded(f"처리 중인 요청이 많습니다 (workers={self.workers}, max_queue={self.max_queue}).")
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        self._acquire_slot()
+        try:
+            fut = self._pool.submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        fut.add_done_callback(lambda _: self._slots.release())
+        return fut
+
+    def _validate(self, endpoint: str, body: dict[str, Any]) -> dict[str, Any]:
+        if endpoint not in self._handlers:
+            raise BadRequest(f"알 수 없는 endpoint: /{endpoint}")
+        allowed, _ = self._handlers[endpoint]
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise BadRequest("query(문자열)가 필요합니다.")
+        params = {k: v for k, v in body.items() if k not in ("query", "stream")}
+        unknown = set(params) - allowed
+        if unknown:
+            raise BadRequest(f"지원하지 않는 인자: {', '.join(sorted(unknown))}")
+        return params
+
+    def call(self, endpoint: str, body: dict[str, Any]) -> tuple[dict[str, Any], bool]:
+        """
+        endpoint 실행 결과와 singleflight 합류 여부.
+        Raises: BadRequest, Overloaded, RequestTimeout, 처리 중 예외.
+        """
+        params = self._validate(endpoint, body)
+        query = body["query"].strip()
+        self._incr("requests")
+        _, handler = self._handlers[endpoint]
+        if self.coalesce:
+            key = (endpoint, query, json.dumps(params, sort_keys=True, ensure_ascii=False, default=str))
+            fut, shared = self._flight.submit(key, lambda: self._submit(handler, query, params))
+        else:
+            fut, shared = self._submit(handler, query, params), False
+        try:
+            return fut.result(timeout=self.timeout), shared
+        except FutureTimeout:
+            self._incr("timeouts")
+            raise RequestTimeout(f"{self.timeout:.0f}초 안에 처리하지 못했습니다.") from None
+        except Exception:
+            self._incr("errors")
+            raise
+
+    def stream_generate(self, body: dict[str, Any]) -> Iterator[dict[str, Any]]:
+        """generate_stream 이벤트를 worker 스레드에서 받아 전달. 호출측이 중단하면 생성도 중단."""
+        from RAG.Generate import generate_stream
+
+        params = self._with_deadline(self._validate("generate", body))
+        query = body["query"].strip()
+        self._incr("requests")
+        self._incr("streams")
+        events: "queue.Queue[tuple[str, Any]]" = queue.Queue()
+        cancelled = threading.Event()
+
+        def run() -> None:
+            gen = generate_stream(query, **params)
+            try:
+                for event in gen:
+                    if cancelled.is_set():
+                        break
+                    events.put(("event", event))
+                events.put(("end", None))
+            except Exception as e:
+                events.put(("error", e))
+            finally:
+                gen.close()  # 남은 LLM 스트림 정리 (hedge 시도 취소)
+
+        self._submit(run)
+        deadline = time.perf_counter() + self.timeout
+        try:
+            while True:
+                try:
+                    kind, value = events.get(timeout=max(0.0, deadline - time.perf_counter()))
+                except queue.Empty:
+                    self._incr("timeouts")
+                    raise RequestTimeout(f"{self.timeout:.0f}초 안에 처리하지 못했습니다.") from None
+                if kind == "end":
+                    return
+                if kind == "error":
+                    self._incr("errors")
+                    raise value
+                yield value
+        finally:
+            cancelled.set()
+
+    def _with_deadline(self, params: dict[str, Any]) -> dict[str, Any]:
+        if params.get("deadline_sec") is None:
+            params = {**params, "deadline_sec": max(1.0, self.timeout - _DEADLINE_MARGIN_SEC)}
+        return params
+
+    def _retrieve(self, query: str, params: dict[str, Any]) -> dict[str, Any]:
+        from RAG.Retriever import retrieve
+
+        return {"items": retrieve(query, **params)}
+
+    def _rerank(self, query: str, params: dict[str, Any]) -> dict[str, Any]:
+        """items가 없으면 retrieve(limit=retrieve_limit, 기본 20) 결과를 rerank."""
+        from RAG.Rerank import rerank
+
+        items = params.get("items")
+        if items is None:
+            from RAG.Retriever import retrieve
+
+            items = retrieve(query, limit=int(params.get("retrieve_limit") or 20))
+        return {"items": rerank(query, items, top_k=params.get("top_k"), model_name=params.get("model_name"))}
+
+    def _generate(self, query: str, params: dict[str, Any]) -> dict[str, Any]:
+        from RAG.Generate import generate
+
+        return generate(query, **self._with_deadline(params))
+
+    def stats(self) -> dict[str, Any]:
+        with self._stats_lock:
+            stats: dict[str, Any] = dict(self._stats)
+        stats["singleflight"] = self._flight.stats()
+        stats["workers"] = self.workers
+        stats["max_queue"] = self.max_queue
+        stats["timeout_sec"] = self.timeout
+        return stats
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    service: RAGService  # make_server에서 서브클래스에 지정
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send_json(self, status: int, body: dict[str, Any], headers: Optional[dict[str, str]] = None) -> None:
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, e: Exception) -> None:
+        if isinstance(e, BadRequest):
+            self._send_json(400, {"error": str(e)})
+        elif isinstance(e, Overloaded):
+            self._send_json(503, {"error": str(e)}, {"Retry-After": "1"})
+        elif isinstance(e, RequestTimeout):
+            self._send_json(504, {"error": str(e)})
+        else:
+            self._send_json(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        path = url.path.rstrip("/")
+        if path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif path == "/stats":
+            self._send_json(200, self.service.stats())
+        elif path == "/facets":
+            self._facets(parse_qs(url.query))
+        else:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self) -> None:
+        endpoint = self.path.split("?")[0].strip("/")
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(body, dict):
+                raise BadRequest("요청 본문은 JSON 객체여야 합니다.")
+        except ValueError as e:
+            self._send_error(e if isinstance(e, BadRequest) else BadRequest(f"잘못된 JSON: {e}"))
+            return
+        if endpoint == "generate" and body.get("stream"):
+            self._stream(body)
+            return
+        try:
+            result, shared = self.service.call(endpoint, body)
+        except Exception as e:
+            self._send_error(e)
+            return
+        self._send_json(200, result, {"X-Coalesced": "1" if shared else "0"})
+
+    def _facets(self, query: dict[str, list[str]]) -> None:
+        """
+        GET /facets → 전체 facet (값별 공고 수, 업력 구간)
+        GET /facets?field=company&q=에스피&limit=10 → 자동완성 후보 [{"value", "count"}]
+        worker pool을 거치지 않음 (메모리 조회만).
+        """
+        from service.facets import FACET_FIELDS, get_facet_index
+
+        index = get_facet_index()
+        if index is None:
+            self._send_json(404, {"error": "facet 파일이 없습니다 (python -m service.facets build)."})
+            return
+        field = (query.get("field") or [None])[0]
+        if field is None:
+            self._send_json(200, index.to_dict())
+            return
+        if field not in FACET_FIELDS:
+            self._send_error(BadRequest(f"field는 {', '.join(FACET_FIELDS)} 중 하나여야 합니다."))
+            return
+        try:
+            limit = int((query.get("limit") or ["10"])[0])
+        except ValueError:
+            self._send_error(BadRequest("limit은 정수여야 합니다."))
+            return
+        text = (query.get("q") or [""])[0]
+        items = [{"value": v, "count": n} for v, n in index.suggest(field, text, limit)]
+        self._send_json(200, {"field": field, "items": items})
+
+    def _stream(self, body: dict[str, Any]) -> None:
+        """generate_stream 이벤트를 한 줄에 하나씩(NDJSON) chunked 전송. 시작 전 오류는 일반 오류 응답."""
+        events = self.service.stream_generate(body)
+        try:
+            first = next(events)
+        except StopIteration:
+            first = None
+        except Exception as e:
+            self._send_error(e)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            if first is not None:
+                self._write_line(first)
+            for event in events:
+                self._write_line(event)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+            events.close()
+            return
+        except Exception as e:
+            # 헤더를 이미 보냈으므로 오류도 이벤트로 전달
+            self._write_line({"type": "error", "error": f"{type(e).__name__}: {e}"})
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_line(self, payload: dict[str, Any]) -> None:
+        data = (json.dumps(payload, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address) -> None:
+        import sys
+
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def make_server(addr: str = DEFAULT_ADDR, service: Optional[RAGService] = None) -> ThreadingHTTPServer:
+    """HTTP 서버 생성 (serve_forever 전). 포트 0이면 빈 포트 자동 할당."""
+    host, _, port = addr.rpartition(":")
+    handler = type("RAGHandler", (_Handler,), {"service": service or RAGService()})
+    return _Server((host or "127.0.0.1", int(port)), handler)
+
+
+def serve(
+    addr: str = DEFAULT_ADDR,
+    *,
+    workers: int = DEFAULT_WORKERS,
+    max_queue: int = DEFAULT_MAX_QUEUE,
+    timeout: float = DEFAULT_TIMEOUT_SEC,
+    coalesce: bool = True,
+    preload_reranker: bool = True,
+) -> None:
+    """자원 준비 후 요청 처리 (Ctrl+C로 종료)."""
+    service = RAGService(workers=workers, max_queue=max_queue, timeout=timeout, coalesce=coalesce)
+    service.warmup(preload_reranker=preload_reranker)
+    server = make_server(addr, service)
+    host, port = server.server_address[:2]
+    print(f"RAG 서버 실행 중: http://{host}:{port} (workers={workers}, max_queue={max_queue}, timeout={timeout}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+        from RAG.Retriever import close_pg_pool
+
+        close_pg_pool()
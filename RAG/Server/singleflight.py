@@ -0,0 +1,43 @@
+"""
+Singleflight: 같은 키의 요청이 처리 중이면 새로 실행하지 않고 진행 중인 결과를 함께 받음.
+여러 세션이 같은 질문을 동시에 보낼 때 retrieve/rerank/LLM 호출을 한 번으로 합침 (완료 후에는 캐시하지 않음).
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Hashable
+
+
+class SingleFlight:
+    """키별 진행 중 Future 공유. 첫 호출자가 실행하고, 같은 키의 나머지 호출자는 같은 결과(또는 예외)를 받음."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> tuple[Future, bool]:
+        """
+        key가 진행 중이면 그 Future, 아니면 start()로 새 Future를 시작해 등록.
+        Returns: (Future, 기존 요청에 합류했는지)
+        """
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.coalesced += 1
+                return fut, True
+            fut = start()
+            self._inflight[key] = fut
+            self.executed += 1
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return fut, False
+
+    def _forget(self, key: Hashable, fut: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"executed": self.executed, "coalesced": self.coalesced, "inflight": len(self._inflight)}
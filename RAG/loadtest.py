@@ -0,0 +1,344 @@
+"""
+부하 테스트: 질의 세트를 동시 사용자 수(closed-loop) 또는 도착률(open-loop, Poisson)로 재생하며
+retrieve → rerank → generate 경로의 처리량, 단계별 p50/p95/p99, 오류율, 포화 지점 측정.
+
+대상: in-process generate() (기본) 또는 HTTP 엔드포인트(--url, JSON {"query": ...} POST)
+단계별 시간은 generate 결과의 timings(RAG.tracing) 사용.
+오프라인 실행: --mock-llm (service.mock_openai를 같은 프로세스에 띄움) + --backend memory (RAG.Retriever.memory)
+
+실행 예:
+    python -m RAG.loadtest --mock-llm --backend memory --concurrency 1,2,4,8,16 --requests 100
+    python -m RAG.loadtest --rate 2,4,8 --duration 30 --url http://127.0.0.1:8000/generate
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from RAG.tracing import percentile
+
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_QUERIES_PATH = _PROJECT_ROOT / "RAG" / "Evaluate" / "eval_sample.json"
+# 포화 판정: 동시성/도착률을 올려도 처리량이 이 비율 이상 늘지 않거나, 오류율이 이 값을 넘으면 포화
+SATURATION_MIN_GAIN = 0.10
+SATURATION_MAX_ERROR_RATE = 0.05
+
+
+def load_queries(path: Union[str, Path]) -> list[str]:
+    """
+    질의 목록 로드.
+    - JSON 배열 / JSONL: 각 항목의 "query" (평가 세트), 또는 trace 기록의 attrs.query (RAG_TRACE_PATH 로그)
+    - 그 외: 한 줄에 질의 1개
+    """
+    text = Path(path).read_text(encoding="utf-8").strip()
+    if not text:
+        return []
+    if text.startswith("["):
+        records = json.loads(text)
+    elif text.startswith("{"):
+        records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    else:
+        return [line.strip() for line in text.splitlines() if line.strip()]
+    queries = []
+    for rec in records:
+        q = rec.get("query") or (rec.get("attrs") or {}).get("query")
+        if q:
+            queries.append(str(q))
+    return queries
+
+
+def generate_target(**generate_kwargs: Any) -> Callable[[str], dict[str, Any]]:
+    """in-process generate() 호출 대상."""
+    from RAG.Generate import generate
+
+    def call(query: str) -> dict[str, Any]:
+        return generate(query, **generate_kwargs)
+
+    return call
+
+
+def http_target(url: str, timeout: float = 60.0, **payload: Any) -> Callable[[str], dict[str, Any]]:
+    """HTTP 엔드포인트 호출 대상. {"query": ..., **payload}를 POST, 200이 아니면 오류."""
+    import urllib.error
+    import urllib.request
+
+    def call(query: str) -> dict[str, Any]:
+        body = json.dumps({"query": query, **payload}, ensure_ascii=False).encode("utf-8")
+        req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                return json.loads(resp.read() or b"{}")
+        except urllib.error.HTTPError as e:
+            raise RuntimeError(f"HTTP {e.code}") from None
+
+    return call
+
+
+class _Recorder:
+    """요청별 결과 수집 (여러 스레드에서 호출)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: list[float] = []
+        self.stages: dict[str, list[float]] = {}
+        self.errors: Counter = Counter()
+        self.ok = 0
+
+    def record(self, latency_ms: float, result: Optional[dict[str, Any]], error: Optional[BaseException]) -> None:
+        with self._lock:
+            if error is not None:
+                self.errors[str(error) if str(error).startswith("HTTP ") else type(error).__name__] += 1
+                return
+            self.ok += 1
+            self.latencies.append(latency_ms)
+            for name, entry in ((result or {}).get("timings") or {}).items():
+                if isinstance(entry, dict) and entry.get("ms") is not None:
+                    self.stages.setdefault(name, []).append(float(entry["ms"]))
+
+
+def _latency_summary(values: list[float]) -> dict[str, float]:
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+        "mean": sum(values) / len(values) if values else 0.0,
+    }
+
+
+def _call(target: Callable[[str], dict[str, Any]], query: str, started: float, rec: _Recorder) -> None:
+    try:
+        result = target(query)
+        error = None
+    except Exception as e:
+        result, error = None, e
+    rec.record((time.perf_counter() - started) * 1000.0, result, error)
+
+
+def run_level(
+    target: Callable[[str], dict[str, Any]],
+    queries: list[str],
+    *,
+    concurrency: Optional[int] = None,
+    rate: Optional[float] = None,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    max_inflight: int = 256,
+    seed: int = 0,
+) -> dict[str, Any]:
+    """
+    부하 1단계 실행.
+
+    Args:
+        target: 질의 1건 처리 함수 (generate_target / http_target).
+        queries: 순환 재생할 질의 목록.
+        concurrency: closed-loop 동시 사용자 수 (각자 응답을 받으면 바로 다음 요청).
+        rate: open-loop 초당 도착률 (Poisson). 지연은 예정 도착 시각부터 재므로 대기열 시간 포함.
+        requests: 보낼 요청 수 (duration과 둘 중 먼저 도달하는 쪽에서 종료).
+        duration: 실행 시간(초).
+        max_inflight: open-loop 동시 처리 상한 (넘는 요청은 대기열에서 기다림).
+    """
+    if not queries:
+        raise ValueError("질의가 없습니다.")
+    if (concurrency is None) == (rate is None):
+        raise ValueError("concurrency와 rate 중 하나만 지정하세요.")
+    if requests is None and duration is None:
+        requests = len(queries)
+    rec = _Recorder()
+    started = time.perf_counter()
+    stop_at = started + duration if duration is not None else None
+    counter = iter(range(requests if requests is not None else 1 << 62))
+    counter_lock = threading.Lock()
+
+    def next_query() -> Optional[str]:
+        if stop_at is not None and time.perf_counter() >= stop_at:
+            return None
+        with counter_lock:
+            i = next(counter, None)
+        return None if i is None else queries[i % len(queries)]
+
+    if concurrency is not None:
+        def user() -> None:
+            while True:
+                q = next_query()
+                if q is None:
+                    return
+                _call(target, q, time.perf_counter(), rec)
+
+        threads = [threading.Thread(target=user, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    else:
+        rng = random.Random(seed)
+        with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+            next_at = time.perf_counter()
+            while True:
+                q = next_query()
+                if q is None:
+                    break
+                now = time.perf_counter()
+                if next_at > now:
+                    time.sleep(next_at - now)
+                pool.submit(_call, target, q, next_at, rec)
+                next_at += rng.expovariate(rate)
+    elapsed = time.perf_counter() - started
+
+    n_errors = sum(rec.errors.values())
+    total = rec.ok + n_errors
+    return {
+        "concurrency": concurrency,
+        "rate": rate,
+        "requests": total,
+        "ok": rec.ok,
+        "errors": n_errors,
+        "error_rate": n_errors / total if total else 0.0,
+        "errors_by_type": dict(rec.errors),
+        "duration_sec": elapsed,
+        "throughput_rps": rec.ok / elapsed if elapsed > 0 else 0.0,
+        "latency_ms": _latency_summary(rec.latencies),
+        "stages": {name: _latency_summary(vals) for name, vals in sorted(rec.stages.items())},
+    }
+
+
+def find_saturation(levels: list[dict[str, Any]]) -> Optional[dict[str, Any]]:
+    """
+    포화 지점: 부하를 올려도 처리량 증가가 SATURATION_MIN_GAIN 미만이거나 오류율이 SATURATION_MAX_ERROR_RATE를 넘는
+    첫 단계. {"level": 그 단계 부하, "max_throughput_rps": 그 전까지 최대 처리량, "reason"}. 끝까지 늘면 None.
+    """
+    best = 0.0
+    for i, lv in enumerate(levels):
+        load = lv["concurrency"] if lv["concurrency"] is not None else lv["rate"]
+        if lv["error_rate"] > SATURATION_MAX_ERROR_RATE:
+            return {"level": load, "max_throughput_rps": best, "reason": f"error_rate {lv['error_rate']:.1%}"}
+        if i and lv["throughput_rps"] < best * (1 + SATURATION_MIN_GAIN):
+            return {"level": load, "max_throughput_rps": max(best, lv["throughput_rps"]), "reason": "throughput_flat"}
+        best = max(best, lv["throughput_rps"])
+    return None
+
+
+def run_sweep(
+    target: Callable[[str], dict[str, Any]],
+    queries: list[str],
+    *,
+    concurrency_levels: Optional[list[int]] = None,
+    rate_levels: Optional[list[float]] = None,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    warmup: int = 0,
+) -> dict[str, Any]:
+    """
+    부하 단계들을 차례로 실행. {"levels": [...], "saturation": {"concurrency" | "rate": find_saturation 결과}}
+    포화 지점은 closed-loop(concurrency)와 open-loop(rate) 단계를 따로 봄 (두 방식의 처리량은 서로 비교할 수 없음).
+    """
+    for q in queries[:warmup]:
+        try:
+            target(q)
+        except Exception:
+            pass
+    closed, opened = [], []
+    for c in concurrency_levels or []:
+        closed.append(run_level(target, queries, concurrency=c, requests=requests, duration=duration))
+        _print_level(closed[-1])
+    for r in rate_levels or []:
+        opened.append(run_level(target, queries, rate=r, requests=requests, duration=duration))
+        _print_level(opened[-1])
+    saturation = {}
+    if closed:
+        saturation["concurrency"] = find_saturation(closed)
+    if opened:
+        saturation["rate"] = find_saturation(opened)
+    return {"levels": closed + opened, "saturation": saturation}
+
+
+def _print_level(lv: dict[str, Any]) -> None:
+    load = f"c={lv['concurrency']}" if lv["concurrency"] is not None else f"rate={lv['rate']}/s"
+    lat = lv["latency_ms"]
+    stages = ", ".join(
+        f"{name} {s['p95']:.0f}" for name, s in lv["stages"].items() if name != "total"
+    )
+    print(
+        f"[{load}] {lv['throughput_rps']:.2f} req/s · p50 {lat['p50']:.0f} / p95 {lat['p95']:.0f} / p99 {lat['p99']:.0f} ms · "
+        f"오류 {lv['errors']}/{lv['requests']} ({lv['error_rate']:.1%})"
+        + (f"\n    단계별 p95(ms): {stages}" if stages else "")
+    )
+
+
+def _parse_levels(spec: Optional[str], cast: Callable[[str], Any]) -> list[Any]:
+    return [cast(x) for x in spec.split(",") if x.strip()] if spec else []
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="RAG 부하 테스트 (처리량·단계별 p50/p95/p99·오류율·포화 지점)")
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES_PATH), help="질의 세트 (평가 JSON/JSONL, trace JSONL, 텍스트)")
+    parser.add_argument("--concurrency", default=None, help="closed-loop 동시 사용자 수 목록 (예: 1,2,4,8)")
+    parser.add_argument("--rate", default=None, help="open-loop 초당 도착률 목록 (예: 1,2,5)")
+    parser.add_argument("--requests", type=int, default=None, help="단계별 요청 수 (기본: 질의 수)")
+    parser.add_argument("--duration", type=float, default=None, help="단계별 실행 시간(초)")
+    parser.add_argument("--warmup", type=int, default=1, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--url", default=None, help="HTTP 엔드포인트 (미지정 시 in-process generate())")
+    parser.add_argument("--no-rerank", action="store_true", help="Rerank 미사용")
+    parser.add_argument("--answer-mode", default=None, choices=["auto", "llm", "extractive"], dest="answer_mode")
+    parser.add_argument("--backend", default=None, choices=["pg", "memory"], help="검색 백엔드 (RETRIEVER_BACKEND)")
+    parser.add_argument("--mock-llm", action="store_true", help="mock OpenAI 서버를 띄워 사용 (오프라인)")
+    parser.add_argument("--mock-ttft-ms", default="300", help="mock 첫 토큰 지연 분포 (service.mock_openai 형식)")
+    parser.add_argument("--mock-error-rate", type=float, default=0.0, help="mock 오류 응답 비율")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    concurrency_levels = _parse_levels(args.concurrency, int)
+    rate_levels = _parse_levels(args.rate, float)
+    if not concurrency_levels and not rate_levels:
+        concurrency_levels = [1, 2, 4, 8]
+    queries = load_queries(args.queries)
+    if not queries:
+        print("질의가 없습니다.")
+        return
+
+    if args.backend:
+        os.environ["RETRIEVER_BACKEND"] = args.backend
+    if args.mock_llm:
+        from service.mock_openai import MockBehavior, base_url, make_server
+
+        server = make_server("127.0.0.1:0", MockBehavior(ttft=args.mock_ttft_ms, error_rate=args.mock_error_rate))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["OPENAI_BASE_URL"] = base_url(server)
+        os.environ.setdefault("OPENAI_API_KEY", "mock")
+        print(f"mock OpenAI 서버: {os.environ['OPENAI_BASE_URL']}")
+
+    options: dict[str, Any] = {"use_rerank": not args.no_rerank}
+    if args.answer_mode:
+        options["answer_mode"] = args.answer_mode
+    target = http_target(args.url, **options) if args.url else generate_target(**options)
+    print(f"질의 {len(queries)}개 · 대상 {args.url or 'generate()'}")
+
+    report = run_sweep(
+        target,
+        queries,
+        concurrency_levels=concurrency_levels,
+        rate_levels=rate_levels,
+        requests=args.requests,
+        duration=args.duration,
+        warmup=args.warmup,
+    )
+    for mode, sat in report["saturation"].items():
+        label = "동시 사용자" if mode == "concurrency" else "초당 도착률"
+        if sat:
+            print(f"포화 지점({label}): {sat['level']} (최대 처리량 {sat['max_throughput_rps']:.2f} req/s, {sat['reason']})")
+        else:
+            print(f"포화 지점({label}): 측정 범위 안에서 포화 없음")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"결과 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
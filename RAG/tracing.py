@@ -0,0 +1,209 @@
+"""
+Tracing: 요청 1건의 단계별(임베딩·pgvector 조회·rerank·LLM) 소요 시간과 건수·토큰 수 기록.
+retrieve / rerank / generate가 span()으로 보고하고, generate()는 결과에 timings로 반환.
+RAG_TRACE_PATH 설정 시 trace를 JSONL로 추가 기록 → python -m RAG.tracing <경로> 로 p50/p95 요약.
+
+사용 예:
+    trace = Trace("generate", query=query)
+    with trace.activate():
+        items = retrieve(query)      # 내부의 span("retrieve.embed") 등이 trace에 기록됨
+    with trace.span("generate.llm") as sp:
+        ...
+        sp.set(prompt_tokens=123)
+    trace.finish()                   # RAG_TRACE_PATH가 있으면 JSONL 기록
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("rag_current_trace", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """단계 1개. end() 시 소요 시간(ms) 확정, set()으로 건수·토큰 등 속성 추가."""
+
+    __slots__ = ("name", "attrs", "_start", "ms")
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.name = name
+        self.attrs: dict[str, Any] = dict(attrs)
+        self._start = time.perf_counter()
+        self.ms: Optional[float] = None
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def end(self, **attrs: Any) -> None:
+        if attrs:
+            self.attrs.update(attrs)
+        if self.ms is None:
+            self.ms = (time.perf_counter() - self._start) * 1000.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"name": self.name, "ms": self.ms, **self.attrs}
+
+
+class Trace:
+    """요청 1건의 span 모음. 스레드 간 공유하지 않음 (요청마다 새로 생성)."""
+
+    def __init__(self, name: str, **attrs: Any) -> None:
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs: dict[str, Any] = dict(attrs)
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.spans: list[Span] = []
+        self.total_ms: Optional[float] = None
+
+    def start_span(self, name: str, **attrs: Any) -> Span:
+        """with 블록으로 감싸기 어려운 구간(스트리밍 등)용. 직접 end() 호출."""
+        sp = Span(name, **attrs)
+        self.spans.append(sp)
+        return sp
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Span]:
+        sp = self.start_span(name, **attrs)
+        try:
+            yield sp
+        finally:
+            sp.end()
+
+    @contextmanager
+    def activate(self) -> Iterator["Trace"]:
+        """이 블록 안에서 호출되는 retrieve/rerank 등의 span()이 이 trace에 기록되도록 함."""
+        token = _current_trace.set(self)
+        try:
+            yield self
+        finally:
+            _current_trace.reset(token)
+
+    def timings(self) -> dict[str, dict[str, Any]]:
+        """단계명 → {"ms", 속성...}. 같은 단계가 여러 번이면 ms 합산 + count. "total" 포함."""
+        out: dict[str, dict[str, Any]] = {}
+        for sp in self.spans:
+            if sp.ms is None:
+                continue
+            if sp.name in out:
+                entry = out[sp.name]
+                entry["ms"] += sp.ms
+                entry["count"] = entry.get("count", 1) + 1
+                entry.update(sp.attrs)
+            else:
+                out[sp.name] = {"ms": sp.ms, **sp.attrs}
+        total = self.total_ms if self.total_ms is not None else (time.perf_counter() - self._start) * 1000.0
+        out["total"] = {"ms": total}
+        return out
+
+    def finish(self, **attrs: Any) -> dict[str, dict[str, Any]]:
+        """전체 소요 시간 확정, RAG_TRACE_PATH가 있으면 JSONL 기록. timings() 반환."""
+        if attrs:
+            self.attrs.update(attrs)
+        if self.total_ms is None:
+            self.total_ms = (time.perf_counter() - self._start) * 1000.0
+        path = os.environ.get("RAG_TRACE_PATH")
+        if path:
+            export_jsonl(self, path)
+        return self.timings()
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "ts": self.started_at,
+            "total_ms": self.total_ms,
+            "attrs": self.attrs,
+            "spans": [sp.to_dict() for sp in self.spans if sp.ms is not None],
+        }
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """
+    현재 활성 trace에 span 기록. 활성 trace가 없으면 기록하지 않는 Span을 돌려줌
+    (retrieve/rerank를 단독 호출해도 그대로 동작).
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        sp = Span(name, **attrs)
+        try:
+            yield sp
+        finally:
+            sp.end()
+        return
+    with trace.span(name, **attrs) as sp:
+        yield sp
+
+
+def export_jsonl(trace: Trace, path: Union[str, Path]) -> None:
+    """trace 1건을 JSONL에 추가 (여러 스레드에서 호출 가능)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    line = json.dumps(trace.to_dict(), ensure_ascii=False, default=str)
+    with _export_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(line + "\n")
+
+
+def percentile(values: list[float], p: float) -> float:
+    """최근접 순위 백분위 (p: 0~100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(p / 100.0 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def summarize_traces(path: Union[str, Path]) -> dict[str, dict[str, float]]:
+    """trace JSONL → 단계별 {"count", "p50_ms", "p95_ms", "p99_ms", "mean_ms"} ("total" 포함)."""
+    by_stage: dict[str, list[float]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            rec = json.loads(line)
+            per_trace: dict[str, float] = {}
+            for sp in rec.get("spans") or []:
+                if sp.get("ms") is not None:
+                    per_trace[sp["name"]] = per_trace.get(sp["name"], 0.0) + sp["ms"]
+            if rec.get("total_ms") is not None:
+                per_trace["total"] = rec["total_ms"]
+            for name, ms in per_trace.items():
+                by_stage.setdefault(name, []).append(ms)
+    return {
+        name: {
+            "count": len(vals),
+            "p50_ms": percentile(vals, 50),
+            "p95_ms": percentile(vals, 95),
+            "p99_ms": percentile(vals, 99),
+            "mean_ms": sum(vals) / len(vals),
+        }
+        for name, vals in by_stage.items()
+    }
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="trace JSONL 단계별 지연 시간 요약 (p50/p95/p99)")
+    parser.add_argument("path", nargs="?", default=os.environ.get("RAG_TRACE_PATH"), help="trace JSONL 경로")
+    args = parser.parse_args()
+    if not args.path:
+        parser.error("trace JSONL 경로 또는 RAG_TRACE_PATH가 필요합니다.")
+    print(json.dumps(summarize_traces(args.path), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,8 @@
 """
 Streamlit 앱: RAG(채용 공고 검색 + LLM 답변) 데모.
 프로젝트 루트에서 실행: streamlit run Streamlit/app.py
+RAG_SERVER_URL 설정 시 RAG 서버(python -m RAG.Server)의 클라이언트로 동작 (모델·DB 풀은 서버가 보유).
+무거운 자원은 st.cache_resource로 rerun 간 공유하고, 참고 공고는 검색이 끝나는 즉시 표시 후 답변을 아래에 스트리밍.
 """
 import sys
 from pathlib import Path
@@ -16,6 +18,8 @@ load_dotenv(_ROOT / ".env")
 import re
 import streamlit as st
 
+from service.facets import get_facet_index
+
 
 def _extract_main_task_and_qualifications(text: str) -> str:
     """텍스트에서 '주요업무'와 '자격요건' 섹션만 추출해 합친 문자열 반환."""
@@ -38,6 +42,87 @@ def _extract_main_task_and_qualifications(text: str) -> str:
         return text[:3000] + ("..." if len(text) > 3000 else "")
     return text[:1500] + ("..." if len(text) > 1500 else "")
 
+
+@st.cache_resource(show_spinner="모델·DB 연결 준비 중...")
+def _get_backend():
+    """
+    답변 생성 함수(generate_stream 형태)와 실행 위치. 세션·rerun 간 공유되어 프로세스당 한 번만 준비.
+    RAG_SERVER_URL이 있으면 RAG 서버(python -m RAG.Server)에 요청, 없으면 이 프로세스에서
+    reranker 모델·PostgreSQL 연결 풀·OpenAI 클라이언트를 미리 만들어 두고 직접 실행.
+    """
+    from RAG.Server.client import get_server_client
+
+    server = get_server_client()
+    if server is not None:
+        return server.generate_stream, "server"
+
+    import os
+
+    from RAG.Generate import generate_stream
+    from RAG.Retriever.memory import use_memory_backend
+    from service.openai_client import get_openai_client
+
+    try:
+        if not use_memory_backend():
+            from RAG.Retriever import init_pg_pool
+            init_pg_pool()
+        get_openai_client()
+        if not os.environ.get("RERANK_WORKER_ADDR"):
+            from RAG.Rerank import preload_model
+            preload_model()
+    except Exception as e:
+        # 준비 실패 시에도 요청마다 연결·로드하는 기존 방식으로 동작
+        print(f"Streamlit 자원 준비 실패 → 요청 시 준비: {e}")
+    return generate_stream, "local"
+
+
+def _render_sources(sources: list, source_view: str) -> None:
+    if not sources:
+        st.caption("참고한 공고가 없습니다.")
+        return
+    with st.expander(f"참고한 채용 공고 ({len(sources)}건)", expanded=True):
+        for i, src in enumerate(sources, 1):
+            meta = src.get("metadata") or {}
+            company_name = meta.get("company") or "-"
+            role = meta.get("job_role") or "-"
+            raw_text = (src.get("text") or "").strip()
+            if source_view == "전체 본문":
+                text = raw_text
+            else:
+                text = _extract_main_task_and_qualifications(raw_text) or raw_text
+            st.markdown(f"**[{i}] {company_name} · {role}**")
+            if text:
+                st.code(text, language=None)
+            st.divider()
+
+
+def _render_summary(result: dict, show_timings: bool) -> None:
+    ttft = result.get("ttft_sec")
+    ttft_s = f"{ttft:.2f}초" if ttft is not None else "-"
+    st.caption(
+        f"참고한 context: {result.get('context_length', 0)}자 / {result.get('context_tokens', 0)}토큰 · "
+        f"첫 토큰 {ttft_s} · 전체 {result.get('latency_sec', 0):.2f}초"
+        + (" · 추출형 답변" if (result.get("llm") or {}).get("route") == "extractive" else "")
+    )
+    timings = result.get("timings") or {}
+    if show_timings and timings:
+        st.dataframe(
+            [{"단계": name, "ms": round(entry.get("ms") or 0.0, 1)} for name, entry in timings.items()],
+            hide_index=True,
+        )
+
+
+def _facet_select(label: str, facets, field: str, key: str):
+    """facet 값 selectbox ("값 (n건)", 공고 수 내림차순). 선택 안 함은 None."""
+    options = [None, *(value for value, _ in facets.values(field))]
+    return st.selectbox(
+        label,
+        options,
+        format_func=lambda v: "전체" if v is None else f"{v} ({facets.count(field, v)}건)",
+        key=key,
+    )
+
+
 st.set_page_config(page_title="채용 공고 RAG", page_icon="📋", layout="wide")
 
 st.title("📋 채용 공고 RAG")
@@ -48,51 +133,90 @@ query = st.text_area("질문", placeholder="예: 신입 개발자 채용하는 
 # 사이드바: 필터 및 옵션
 with st.sidebar:
     st.subheader("필터 (선택)")
-    company = st.text_input("회사명", key="company")
-    job_role = st.text_input("직무", key="job_role")
-    career_type = st.selectbox("경력", [None, "신입", "경력", "무관"], format_func=lambda x: x or "전체")
-    company_years_num = st.text_input("회사 규모/업력", key="company_years", placeholder="예: 5년차")
+    facets = get_facet_index()
+    company_years_num = location = None
+    years_bucket: dict = {}
+    if facets is not None:
+        # facet 인덱스(공고 수 포함)로 선택 목록 구성 — selectbox에 입력하면 후보가 바로 좁혀짐
+        company = _facet_select("회사명", facets, "company", key="company")
+        job_role = _facet_select("직무", facets, "job_role", key="job_role")
+        career_type = _facet_select("경력", facets, "career_type", key="career_type")
+        location = _facet_select("근무지역", facets, "location", key="location")
+        years_bucket = st.selectbox(
+            "회사 업력",
+            [{}, *facets.company_years_buckets],
+            format_func=lambda b: f"{b['label']} ({b['count']}건)" if b else "전체",
+            key="company_years_bucket",
+        )
+    else:
+        company = st.text_input("회사명", key="company").strip() or None
+        job_role = st.text_input("직무", key="job_role").strip() or None
+        career_type = st.selectbox("경력", [None, "신입", "경력", "무관"], format_func=lambda x: x or "전체")
+        company_years_num = st.text_input("회사 규모/업력", key="company_years", placeholder="예: 5년차").strip() or None
     st.divider()
     st.subheader("검색 옵션")
     retrieve_limit = st.slider("검색 후보 건수", 5, 50, 20)
     use_rerank = st.checkbox("Rerank 사용", value=True)
     rerank_top_k = st.number_input("Rerank 후 사용할 공고 수", min_value=1, max_value=10, value=5)
+    st.divider()
+    # 표시 옵션만 바뀐 rerun은 검색을 다시 하지 않고 직전 결과를 다시 그림
+    st.subheader("표시 옵션")
+    source_view = st.radio("참고 공고 본문", ["주요업무·자격요건", "전체 본문"], horizontal=True)
+    show_timings = st.checkbox("단계별 소요 시간 표시", value=False)
+
+request = {
+    "query": query.strip(),
+    "company": company,
+    "job_role": job_role,
+    "career_type": career_type,
+    "company_years_num": company_years_num,
+    "location": location,
+    "company_years_min": years_bucket.get("min"),
+    "company_years_max": years_bucket.get("max"),
+    "retrieve_limit": retrieve_limit,
+    "use_rerank": use_rerank,
+    "rerank_top_k": int(rerank_top_k),
+}
 
 if st.button("검색", type="primary"):
-    if not query.strip():
+    if not request["query"]:
         st.warning("질문을 입력해 주세요.")
     else:
         try:
-            from RAG.Generate import generate
-            with st.spinner("검색 및 답변 생성 중..."):
-                result = generate(
-                    query.strip(),
-                    company=company.strip() or None,
-                    job_role=job_role.strip() or None,
-                    career_type=career_type,
-                    company_years_num=company_years_num.strip() or None,
-                    retrieve_limit=retrieve_limit,
-                    use_rerank=use_rerank,
-                    rerank_top_k=rerank_top_k,
-                )
+            generate_stream, _ = _get_backend()
+            result: dict = {}
+            sources_area = st.container()
             st.subheader("답변")
-            st.markdown(result["answer"])
-            st.caption(f"참고한 context 길이: {result['context_length']}자")
-            sources = result.get("sources") or []
-            if sources:
-                with st.expander(f"참고한 채용 공고 ({len(sources)}건)"):
-                    for i, src in enumerate(sources, 1):
-                        meta = src.get("metadata") or {}
-                        company_name = meta.get("company") or "-"
-                        role = meta.get("job_role") or "-"
-                        raw_text = (src.get("text") or "").strip()
-                        text = _extract_main_task_and_qualifications(raw_text) or raw_text
-                        st.markdown(f"**[{i}] {company_name} · {role}**")
-                        if text:
-                            st.code(text, language=None)
-                        st.divider()
-            else:
-                st.caption("참고한 공고가 없습니다.")
+            answer_box = st.empty()
+            with sources_area:
+                with st.spinner("검색 중..."):
+                    events = generate_stream(request["query"], **{k: v for k, v in request.items() if k != "query"})
+                    # 첫 이벤트(sources)까지 = 검색·rerank 구간
+                    result.update(next(events))
+                # 답변을 기다리지 않고 참고 공고부터 표시
+                _render_sources(result.get("sources") or [], source_view)
+            # 이후 답변 토큰을 받는 대로 아래에 갱신
+            partial = ""
+            for event in events:
+                if event["type"] == "token":
+                    partial += event["text"]
+                    answer_box.markdown(partial + "▌")
+                elif event["type"] == "done":
+                    result.update(event)
+            result.setdefault("answer", partial)
+            answer_box.markdown(result.get("answer") or partial)
+            _render_summary(result, show_timings)
+            st.session_state["last_result"] = {"request": request, "result": result}
         except Exception as e:
             st.error(f"오류: {e}")
             raise
+elif st.session_state.get("last_result"):
+    # 표시 옵션 변경 등으로 인한 rerun: 직전 결과 재사용
+    last = st.session_state["last_result"]
+    result = last["result"]
+    if last["request"] != request:
+        st.caption("입력이 바뀌었습니다. 아래는 직전 검색 결과이며, 다시 검색하려면 검색 버튼을 누르세요.")
+    _render_sources(result.get("sources") or [], source_view)
+    st.subheader("답변")
+    st.markdown(result.get("answer") or "")
+    _render_summary(result, show_timings)
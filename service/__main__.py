@@ -0,0 +1,59 @@
+"""
+python -m service <크롤링.csv> [--output embedded.jsonl] [--debug-dir debug/] [--embed-workers 4] [--no-pg] [--parquet]
+Cleansing → Normalizing → Chunking → Embedding을 중간 CSV 없이 한 번에 실행하고 단계별 처리량 출력.
+"""
+import argparse
+import json
+import sys
+
+from .pipeline import run_pipeline
+from .streaming import DEFAULT_CHUNK_ROWS
+
+_UNITS = {"read": "행", "cleansing": "행", "normalizing": "행", "chunking": "행", "embedding": "chunk", "write": "chunk"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="크롤링 CSV → embedded JSONL + PostgreSQL 단일 패스 파이프라인")
+    parser.add_argument("input_path", help="크롤링 CSV 경로 (jumpit_crawler 출력)")
+    parser.add_argument("--output", default=None, help="embedded JSONL 경로 (기본 service/embedding/embedded/embedded_N.jsonl)")
+    parser.add_argument("--debug-dir", default=None, help="중간 산출물(cleaned.csv, normalized.csv, chunked.jsonl) 저장 디렉터리")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNK_ROWS, help="CSV 묶음 행 수")
+    parser.add_argument("--embed-workers", type=int, default=4, help="임베딩 동시 요청 수")
+    parser.add_argument("--no-pg", action="store_true", help="PostgreSQL 저장 생략")
+    parser.add_argument("--no-jsonl", action="store_true", help="embedded JSONL 저장 생략 (PostgreSQL만)")
+    parser.add_argument("--no-facets", action="store_true", help="facet 인덱스 재생성 생략")
+    parser.add_argument("--parquet", action="store_true", help="embedded·중간 산출물을 Parquet으로 (기본 이름 .parquet)")
+    parser.add_argument("--json", action="store_true", help="요약을 JSON으로 출력")
+    args = parser.parse_args()
+
+    try:
+        summary = run_pipeline(
+            args.input_path,
+            args.output,
+            embed_workers=args.embed_workers,
+            save_jsonl=not args.no_jsonl,
+            save_pg=not args.no_pg,
+            debug_dir=args.debug_dir,
+            update_facets=not args.no_facets,
+            chunksize=args.chunksize,
+            parquet=args.parquet,
+        )
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    if args.json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        return
+    print(f"\n공고 {summary['rows']:,}건 → chunk {summary['chunks']:,}개 · {summary['wall_sec']:.1f}초")
+    if summary["output_path"]:
+        print(f"embedded: {summary['output_path']}")
+    if summary["pg_rows"]:
+        print(f"PostgreSQL: {summary['pg_rows']:,}건")
+    print(f"{'단계':<12} {'초':>8} {'입력':>10} {'출력':>10} {'처리량':>16}")
+    for name, s in summary["stages"].items():
+        rate = f"{s['per_sec']:,.0f} {_UNITS[name]}/초" if s["per_sec"] else "-"
+        print(f"{name:<12} {s['sec']:8.2f} {s['in']:10,} {s['out']:10,} {rate:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,9 +3,20 @@
 """
 from .chunking import (
     build_chunks,
+    iter_chunks,
+    iter_chunks_from_csv,
     load_csv,
     run_chunking,
     save_chunked_jsonl,
+    stream_chunking,
 )
 
-__all__ = ["build_chunks", "load_csv", "run_chunking", "save_chunked_jsonl"]
+__all__ = [
+    "build_chunks",
+    "iter_chunks",
+    "iter_chunks_from_csv",
+    "load_csv",
+    "run_chunking",
+    "save_chunked_jsonl",
+    "stream_chunking",
+]
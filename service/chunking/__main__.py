@@ -1,18 +1,20 @@
 """
-python -m service.chunking <정규화된_CSV_경로>
-결과: service/chunking/chunked/chunked_1.jsonl, chunked_2.jsonl, ...
+python -m service.chunking <정규화된_CSV_경로> [--output 출력경로] [--parquet]
+결과: service/chunking/chunked/chunked_1.jsonl, chunked_2.jsonl, ... (--parquet이면 .parquet)
+입력은 정규화 CSV 또는 Parquet (확장자로 구분).
 """
-import sys
+import argparse
 
-from .chunking import run_chunking
+from .chunking import stream_chunking
 
 
 def main() -> None:
-    if len(sys.argv) < 2:
-        print("사용법: python -m service.chunking <정규화된_CSV_경로>", file=sys.stderr)
-        sys.exit(1)
-    input_path = sys.argv[1]
-    run_chunking(input_path)
+    parser = argparse.ArgumentParser(description="정규화 CSV/Parquet → 의미 단위 chunk")
+    parser.add_argument("input_path", help="정규화된 CSV 또는 Parquet 경로")
+    parser.add_argument("--output", default=None, help="출력 경로 (.jsonl 또는 .parquet, 기본 chunked/chunked_N)")
+    parser.add_argument("--parquet", action="store_true", help="기본 출력 이름을 .parquet으로 (Parquet으로 저장)")
+    args = parser.parse_args()
+    stream_chunking(args.input_path, output_path=args.output, parquet=args.parquet)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,190 @@
+"""
+build_chunks 마이크로 벤치마크: 합성 정규화 CSV(기본 10만 행)로 기존 iterrows 구현과 컬럼 단위 구현을 비교.
+
+- 합성 CSV: chunked_*.jsonl의 실제 공고(메타데이터 + 섹션 본문)를 document로 되살려 반복하고, 일부 행은 결측값으로 섞음
+- 두 구현의 출력이 JSON 직렬화 기준으로 같은지(18과 18.0 구분) 확인한 뒤 소요 시간·행/초를 출력
+
+실행: python -m service.chunking.bench [--rows 100000] [--repeat 3] [--csv 합성CSV저장경로]
+"""
+
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import pandas as pd
+
+from service.sort_keys import content_hash, parse_company_years, parse_deadline_date
+from service.streaming import artifact_paths, iter_records
+from .chunking import (
+    CHUNK_GROUPS,
+    CHUNKED_DIR,
+    LABEL_TO_GROUP,
+    METADATA_COLUMNS,
+    MIN_CHUNK_LENGTH,
+    SECTION_LABELS,
+    build_chunks,
+    load_csv,
+)
+
+# chunked 파일이 없을 때 쓰는 공고 1건
+_FALLBACK_POSTING = {
+    "company": "예시회사",
+    "job_role": "백엔드 개발자",
+    "location_sido": "서울",
+    "location_gu": "강남구",
+    "career_type": "경력",
+    "education_level": "대졸",
+    "deadline": "2026-03-31",
+    "company_years_num": 12.0,
+    "document": "\n\n".join([
+        "회사: 예시회사",
+        "직무: 백엔드 개발자",
+        "경력: 경력 3~7년",
+        "기술스택: Java, Spring, MySQL, AWS",
+        "주요업무: - 결제 API 설계 및 개발\n- 대용량 트래픽 처리를 위한 서버 성능 개선",
+        "자격요건: - Java/Spring 기반 서비스 개발 경험 3년 이상",
+        "근무지역: 서울 강남구 테헤란로 1",
+        "마감일: 2026-03-31",
+    ]),
+}
+
+
+def _split_document_startswith(document: str) -> list[tuple[str, str]]:
+    """기존 split_document_into_groups (블록마다 레이블을 하나씩 startswith로 확인) — 비교 기준."""
+    if not document or not document.strip():
+        return []
+    blocks = [b.strip() for b in document.split("\n\n") if b.strip()]
+    group_order = list(CHUNK_GROUPS.keys())
+    collected: dict[str, list[str]] = {g: [] for g in group_order}
+    for block in blocks:
+        for label in SECTION_LABELS:
+            prefix = label + ":"
+            if block.startswith(prefix) and len(block) >= MIN_CHUNK_LENGTH:
+                group_name = LABEL_TO_GROUP[label]
+                collected[group_name].append(block)
+                break
+    result: list[tuple[str, str]] = []
+    for group_name in group_order:
+        if collected[group_name]:
+            result.append((group_name, "\n\n".join(collected[group_name])))
+    return result
+
+
+def _build_chunks_iterrows(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """기존 구현 (행마다 iterrows Series + 레이블별 startswith 분할) — 비교 기준."""
+    if "document" not in df.columns:
+        raise ValueError("CSV에 'document' 컬럼이 없습니다.")
+    chunks = []
+    for idx, row in df.iterrows():
+        text = row.get("document")
+        if pd.isna(text) or not str(text).strip():
+            continue
+        document = str(text).strip()
+        group_list = _split_document_startswith(document)
+        if not group_list:
+            continue
+        base_meta: dict[str, Any] = {"source_row_id": int(idx)}
+        for col in METADATA_COLUMNS:
+            if col in row.index:
+                val = row[col]
+                if pd.isna(val):
+                    base_meta[col] = None
+                else:
+                    base_meta[col] = str(val).strip() if isinstance(val, str) else val
+        base_meta["deadline_date"] = parse_deadline_date(base_meta.get("deadline"))
+        base_meta["company_years"] = parse_company_years(base_meta.get("company_years_num"))
+        for group_name, group_text in group_list:
+            meta = {**base_meta, "chunk_group": group_name, "content_hash": content_hash(group_text)}
+            chunks.append({"text": group_text, "metadata": meta})
+    return chunks
+
+
+def load_postings(chunk_paths: Optional[list[Path]] = None) -> list[dict[str, Any]]:
+    """chunked JSONL·Parquet → 공고별 {메타데이터 컬럼..., "document"} (섹션·그룹 chunk 본문을 빈 줄로 이어 붙임)."""
+    paths = chunk_paths if chunk_paths is not None else artifact_paths(CHUNKED_DIR, "chunked")
+    postings: dict[tuple[str, Any], dict[str, Any]] = {}
+    for path in paths:
+        for item in iter_records(path):
+            meta = item.get("metadata") or {}
+            text = (item.get("text") or "").strip()
+            label = text.partition(":")[0]
+            if label not in LABEL_TO_GROUP:
+                continue
+            key = (path.name, meta.get("source_row_id"))
+            posting = postings.setdefault(key, {**{c: meta.get(c) for c in METADATA_COLUMNS}, "blocks": []})
+            if text not in posting["blocks"]:
+                posting["blocks"].append(text)
+    rows = []
+    for posting in postings.values():
+        blocks = posting.pop("blocks")
+        rows.append({**posting, "document": "\n\n".join(blocks)})
+    return rows or [dict(_FALLBACK_POSTING)]
+
+
+def synthetic_frame(n_rows: int, seed: int = 0, postings: Optional[list[dict[str, Any]]] = None) -> pd.DataFrame:
+    """실제 공고를 반복해 n_rows행 정규화 DataFrame 생성. 약 2%는 document, 5%는 메타데이터 하나가 결측."""
+    postings = postings or load_postings()
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n_rows):
+        row = dict(postings[i % len(postings)])
+        r = rng.random()
+        if r < 0.02:
+            row["document"] = None
+        elif r < 0.07:
+            row[rng.choice(METADATA_COLUMNS)] = None
+        rows.append(row)
+    return pd.DataFrame(rows, columns=[*METADATA_COLUMNS, "document"])
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> tuple[float, Any]:
+    """repeat회 중 최소 소요 초와 마지막 결과."""
+    best = float("inf")
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def _serialize(chunks: list[dict[str, Any]]) -> list[str]:
+    return [json.dumps(c, ensure_ascii=False) for c in chunks]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="build_chunks 벤치마크: iterrows 구현 vs 컬럼 단위 구현")
+    parser.add_argument("--rows", type=int, default=100_000, help="합성 CSV 행 수")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (최소 시간 사용)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--csv", default=None, help="합성 CSV 저장 경로 (기본 임시 파일, 끝나면 삭제)")
+    args = parser.parse_args()
+
+    postings = load_postings()
+    frame = synthetic_frame(args.rows, args.seed, postings)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = Path(args.csv) if args.csv else Path(tmp) / "normalized_bench.csv"
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        frame.to_csv(csv_path, index=False, encoding="utf-8-sig")
+        load_sec, df = _time(lambda: load_csv(csv_path), 1)
+        size_mb = csv_path.stat().st_size / 1e6
+    print(f"합성 CSV: {len(df):,}행 (공고 원본 {len(postings)}건 반복) · {size_mb:.1f}MB · 로드 {load_sec:.2f}초")
+
+    old_sec, old_chunks = _time(lambda: _build_chunks_iterrows(df), args.repeat)
+    new_sec, new_chunks = _time(lambda: build_chunks(df), args.repeat)
+    identical = _serialize(old_chunks) == _serialize(new_chunks)
+
+    print(f"{'구현':<10} {'초':>8} {'행/초':>12} {'chunk':>10}")
+    for name, sec, chunks in (("iterrows", old_sec, old_chunks), ("columnar", new_sec, new_chunks)):
+        print(f"{name:<10} {sec:8.3f} {len(df) / sec:12,.0f} {len(chunks):10,}")
+    print(f"속도 향상 {old_sec / new_sec:.1f}x · 출력 동일: {'예' if identical else '아니오'}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
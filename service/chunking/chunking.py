@@ -4,12 +4,14 @@
 결과물: service/chunking/chunked/ 에 JSONL 저장.
 """
 
-import json
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import Any, Iterator, Optional, Union
 
 import pandas as pd
 
+from service.facets import rebuild_facets
+from service.sort_keys import content_hash, parse_company_years, parse_deadline_date
+from service.streaming import DEFAULT_CHUNK_ROWS, artifact_paths, artifact_suffix, iter_frames, load_frame, next_numbered_path, write_records
 
 CHUNKED_DIR = Path(__file__).resolve().parent / "chunked"
 
@@ -29,6 +31,7 @@ for group_name, labels in CHUNK_GROUPS.items():
         LABEL_TO_GROUP[label] = group_name
 
 SECTION_LABELS = list(LABEL_TO_GROUP.keys())  # 파싱 시 사용
+GROUP_ORDER = list(CHUNK_GROUPS.keys())
 MIN_CHUNK_LENGTH = 10  # 이 길이 미만 섹션은 제외
 
 # chunk 메타데이터로 붙일 컬럼
@@ -45,8 +48,8 @@ METADATA_COLUMNS = [
 
 
 def load_csv(path: Union[str, Path], encoding: str = "utf-8-sig") -> pd.DataFrame:
-    """정규화된 CSV 로드."""
-    return pd.read_csv(path, encoding=encoding)
+    """정규화된 CSV 로드 (.parquet이면 Parquet)."""
+    return load_frame(path, encoding=encoding)
 
 
 def split_document_into_groups(document: str) -> list[tuple[str, str]]:
@@ -56,93 +59,146 @@ def split_document_into_groups(document: str) -> list[tuple[str, str]]:
     """
     if not document or not document.strip():
         return []
-    blocks = [b.strip() for b in document.split("\n\n") if b.strip()]
-    group_order = list(CHUNK_GROUPS.keys())
-    collected: dict[str, list[str]] = {g: [] for g in group_order}
-    for block in blocks:
-        for label in SECTION_LABELS:
-            prefix = label + ":"
-            if block.startswith(prefix) and len(block) >= MIN_CHUNK_LENGTH:
-                group_name = LABEL_TO_GROUP[label]
-                collected[group_name].append(block)
-                break
-    result: list[tuple[str, str]] = []
-    for group_name in group_order:
-        if collected[group_name]:
-            result.append((group_name, "\n\n".join(collected[group_name])))
-    return result
+    collected: dict[str, list[str]] = {}
+    for block in document.split("\n\n"):
+        block = block.strip()
+        if len(block) < MIN_CHUNK_LENGTH:
+            continue
+        # 레이블에는 ':'가 없으므로 첫 ':' 앞이 곧 레이블 (레이블마다 startswith 비교하지 않음)
+        label, sep, _ = block.partition(":")
+        group_name = LABEL_TO_GROUP.get(label) if sep else None
+        if group_name is not None:
+            collected.setdefault(group_name, []).append(block)
+    return [(g, "\n\n".join(collected[g])) for g in GROUP_ORDER if g in collected]
 
 
-def build_chunks(df: pd.DataFrame) -> list[dict[str, Any]]:
-    """DataFrame을 의미 단위(그룹) chunk 리스트로 변환. document 컬럼 필수. 메타데이터 포함."""
+def iter_chunks(df: pd.DataFrame) -> Iterator[dict[str, Any]]:
+    """
+    DataFrame을 의미 단위(그룹) chunk로 하나씩 변환 (build_chunks와 같은 결과를 순서대로 yield).
+    행마다 Series를 만들지 않도록 메타데이터 컬럼과 결측 여부를 컬럼 단위로 한 번에 꺼내 씀.
+    """
     if "document" not in df.columns:
         raise ValueError("CSV에 'document' 컬럼이 없습니다.")
-    chunks = []
-    for idx, row in df.iterrows():
-        text = row.get("document")
-        if pd.isna(text) or not str(text).strip():
+    meta_columns = [col for col in METADATA_COLUMNS if col in df.columns]
+    values = [df[col].tolist() for col in meta_columns]
+    # 빈 문자열도 결측으로 (CSV는 읽을 때 결측이 되지만 Parquet·메모리 DataFrame에는 ""가 남으므로, 입력 형식과 관계없이 같은 chunk)
+    missing = [(df[col].isna() | df[col].eq("")).tolist() for col in meta_columns]
+    # 마감일·업력은 공고 간 값이 많이 겹치므로 값별로 한 번만 파싱 (18과 18.0, 1과 True가 섞이지 않게 타입도 키에 포함)
+    deadline_dates: dict[tuple[type, Any], Optional[str]] = {}
+    company_years: dict[tuple[type, Any], Optional[int]] = {}
+    documents = df["document"].tolist()
+    documents_missing = df["document"].isna().tolist()
+    for i, idx in enumerate(df.index.tolist()):
+        if documents_missing[i]:
+            continue
+        document = str(documents[i]).strip()
+        if not document:
             continue
-        document = str(text).strip()
         group_list = split_document_into_groups(document)
         if not group_list:
             continue
         base_meta: dict[str, Any] = {"source_row_id": int(idx)}
-        for col in METADATA_COLUMNS:
-            if col in row.index:
-                val = row[col]
-                if pd.isna(val):
-                    base_meta[col] = None
-                else:
-                    base_meta[col] = str(val).strip() if isinstance(val, str) else val
+        for col, col_values, col_missing in zip(meta_columns, values, missing):
+            if col_missing[i]:
+                base_meta[col] = None
+            else:
+                val = col_values[i]
+                base_meta[col] = val.strip() if isinstance(val, str) else val
+        # 정렬용 타입 필드 (Generate가 요청마다 정규식으로 파싱하지 않도록 미리 계산)
+        deadline = base_meta.get("deadline")
+        key = (type(deadline), deadline)
+        if key not in deadline_dates:
+            deadline_dates[key] = parse_deadline_date(deadline)
+        base_meta["deadline_date"] = deadline_dates[key]
+        years = base_meta.get("company_years_num")
+        key = (type(years), years)
+        if key not in company_years:
+            company_years[key] = parse_company_years(years)
+        base_meta["company_years"] = company_years[key]
         for group_name, group_text in group_list:
-            meta = {**base_meta, "chunk_group": group_name}
-            chunks.append({"text": group_text, "metadata": meta})
-    return chunks
+            meta = {**base_meta, "chunk_group": group_name, "content_hash": content_hash(group_text)}
+            yield {"text": group_text, "metadata": meta}
+
+
+def build_chunks(df: pd.DataFrame) -> list[dict[str, Any]]:
+    """
+    DataFrame을 의미 단위(그룹) chunk 리스트로 변환. document 컬럼 필수. 메타데이터 포함.
+    메타데이터에 정렬·중복 제거용 deadline_date / company_years / content_hash도 추가 (service.sort_keys).
+    """
+    return list(iter_chunks(df))
 
 
 def save_chunked_jsonl(chunks: list[dict[str, Any]], path: Union[str, Path]) -> Path:
-    """chunk 리스트를 JSONL 파일로 저장."""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        for item in chunks:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
-    return path
+    """chunk 리스트를 JSONL 파일로 저장 (.parquet 경로면 Parquet)."""
+    write_records(chunks, path)
+    return Path(path)
 
 
 def run_chunking(
     input_path: Union[str, Path],
     output_path: Optional[Union[str, Path]] = None,
     encoding: str = "utf-8-sig",
+    parquet: bool = False,
 ) -> list[dict[str, Any]]:
     """
     정규화 CSV를 읽어 의미 단위(섹션) 청킹 후 저장.
-    결과물: service/chunking/chunked/chunked_1.jsonl, chunked_2.jsonl, ... (번호로 구분)
+    결과물: service/chunking/chunked/chunked_1.jsonl, chunked_2.jsonl, ... (번호로 구분, parquet=True면 .parquet)
     """
     input_path = Path(input_path)
     df = load_csv(input_path, encoding=encoding)
     chunks = build_chunks(df)
     if output_path is None:
-        CHUNKED_DIR.mkdir(parents=True, exist_ok=True)
-        # chunked_1.jsonl, chunked_2.jsonl, ... 로 구분하기 쉽게 저장
-        pattern = "chunked_*.jsonl"
-        existing = list(CHUNKED_DIR.glob(pattern))
-        nums = []
-        for p in existing:
-            # chunked_1 → 1, chunked_2 → 2
-            suffix = p.stem.replace("chunked_", "")
-            if suffix.isdigit():
-                nums.append(int(suffix))
-        n = max(nums) + 1 if nums else 1
-        output_path = CHUNKED_DIR / f"chunked_{n}.jsonl"
+        output_path = next_numbered_path(CHUNKED_DIR, "chunked", artifact_suffix(parquet, ".jsonl"))
     else:
         output_path = Path(output_path)
     save_chunked_jsonl(chunks, output_path)
     print(f"Chunking 완료: {len(chunks)}개 chunk → {output_path}")
+    # 필터 자동완성용 facet(회사·직무·지역·업력 구간별 공고 수)을 chunked 전체로 다시 집계
+    _rebuild_facets_with(output_path)
     _print_grouping_report()
     return chunks
 
 
+def iter_chunks_from_csv(
+    input_path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[dict[str, Any]]:
+    """정규화 CSV(또는 Parquet)를 chunksize행씩 읽어 chunk를 하나씩 반환 (source_row_id는 파일 전체 기준 행 번호)."""
+    for frame in iter_frames(input_path, encoding=encoding, chunksize=chunksize):
+        yield from iter_chunks(frame)
+
+
+def _rebuild_facets_with(output_path: Path) -> None:
+    """chunked 전체 + 새 출력 파일로 facet 인덱스 재생성."""
+    chunk_paths = artifact_paths(CHUNKED_DIR, "chunked")
+    if output_path.resolve() not in {p.resolve() for p in chunk_paths}:
+        chunk_paths.append(output_path)
+    rebuild_facets(chunk_paths)
+
+
+def stream_chunking(
+    input_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    parquet: bool = False,
+) -> Path:
+    """
+    run_chunking의 스트리밍 버전: 정규화 CSV를 chunksize행씩 청킹해 JSONL에 바로 이어 씀 (메모리는 묶음 크기만큼).
+    중단되면 그때까지 쓴 줄까지가 유효한 JSONL로 남음 (Parquet은 끝까지 써야 읽을 수 있음).
+    출력 경로 반환 (기본 이름 규칙은 run_chunking과 같음).
+    """
+    if output_path is None:
+        output_path = next_numbered_path(CHUNKED_DIR, "chunked", artifact_suffix(parquet, ".jsonl"))
+    output_path = Path(output_path)
+    n = write_records(iter_chunks_from_csv(input_path, encoding, chunksize), output_path)
+    print(f"Chunking 완료: {n}개 chunk → {output_path}")
+    _rebuild_facets_with(output_path)
+    _print_grouping_report()
+    return output_path
+
+
 def _print_grouping_report() -> None:
     """의미 단위 묶음 방식을 출력."""
     print("\n[의미 단위 청킹 묶음]")
@@ -2,6 +2,22 @@
 JD(채용공고) 정제 모듈.
 정보 삭제·추론적 재작성 없이 노이즈·불필요 문자만 제거합니다.
 """
-from .cleansing import clean_jd_data, clean_text, load_csv, save_cleaned_csv, run_cleansing
+from .cleansing import (
+    clean_jd_data,
+    clean_text,
+    iter_cleaned,
+    load_csv,
+    run_cleansing,
+    save_cleaned_csv,
+    stream_cleansing,
+)
 
-__all__ = ["clean_jd_data", "clean_text", "load_csv", "save_cleaned_csv", "run_cleansing"]
+__all__ = [
+    "clean_jd_data",
+    "clean_text",
+    "iter_cleaned",
+    "load_csv",
+    "run_cleansing",
+    "save_cleaned_csv",
+    "stream_cleansing",
+]
@@ -10,10 +10,12 @@ JD(채용공고) Cleansing.
 """
 import re
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, Optional, Union
 
 import pandas as pd
 
+from service.streaming import DEFAULT_CHUNK_ROWS, artifact_suffix, iter_frames, load_frame, next_numbered_path, save_frame, write_frames
+
 
 # 정제 시 빈 값으로 둘 문자열 (필요 시 "(없음)" 등으로 변경 가능)
 EMPTY_PLACEHOLDER = ""
@@ -437,16 +439,13 @@ def clean_jd_data(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def load_csv(path: Union[str, Path], encoding: str = "utf-8-sig") -> pd.DataFrame:
-    """점핏 공고 CSV 로드."""
-    return pd.read_csv(path, encoding=encoding)
+    """점핏 공고 CSV 로드 (.parquet이면 Parquet)."""
+    return load_frame(path, encoding=encoding)
 
 
 def save_cleaned_csv(df: pd.DataFrame, path: Union[str, Path], encoding: str = "utf-8-sig") -> Path:
-    """정제된 DataFrame을 CSV로 저장."""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, encoding=encoding)
-    return path
+    """정제된 DataFrame을 CSV로 저장 (.parquet 경로면 Parquet)."""
+    return save_frame(df, path, encoding=encoding)
 
 
 # 정제 결과 기본 저장 디렉터리 (cleansing.py 기준 service/cleansing/cleansed/)
@@ -457,24 +456,15 @@ def run_cleansing(
     input_path: Union[str, Path],
     output_path: Optional[Union[str, Path]] = None,
     encoding: str = "utf-8-sig",
+    parquet: bool = False,
 ) -> pd.DataFrame:
     """
     CSV 경로를 받아 정제 후 저장하고 DataFrame 반환.
-    output_path 미지정 시 service/cleansing/cleansed/ 안에 cleaned_{입력파일명}_1, _2, ... 순으로 저장.
+    output_path 미지정 시 service/cleansing/cleansed/ 안에 cleaned_{입력파일명}_1, _2, ... 순으로 저장 (parquet=True면 .parquet).
     """
     input_path = Path(input_path)
     if output_path is None:
-        CLEANSED_DIR.mkdir(parents=True, exist_ok=True)
-        base = f"cleaned_{input_path.stem}"
-        pattern = f"{base}_*.csv"
-        existing = list(CLEANSED_DIR.glob(pattern))
-        nums = []
-        for p in existing:
-            suffix = p.stem[len(base):].lstrip("_")
-            if suffix.isdigit():
-                nums.append(int(suffix))
-        n = max(nums) + 1 if nums else 1
-        output_path = CLEANSED_DIR / f"{base}_{n}.csv"
+        output_path = next_numbered_path(CLEANSED_DIR, f"cleaned_{input_path.stem}", artifact_suffix(parquet, ".csv"))
     else:
         output_path = Path(output_path)
     df = load_csv(input_path, encoding=encoding)
@@ -484,11 +474,43 @@ def run_cleansing(
     return cleaned
 
 
+def iter_cleaned(
+    input_path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """CSV(또는 Parquet)를 chunksize행씩 읽어 정제한 묶음을 차례로 반환. 정제는 행 단위라 전체 로드 결과와 같음."""
+    for frame in iter_frames(input_path, encoding=encoding, chunksize=chunksize):
+        yield clean_jd_data(frame)
+
+
+def stream_cleansing(
+    input_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    parquet: bool = False,
+) -> Path:
+    """
+    run_cleansing의 스트리밍 버전: chunksize행씩 읽고 정제해 바로 이어 씀 (메모리는 묶음 크기만큼).
+    중단되면 그때까지 쓴 행까지가 유효한 CSV로 남음 (Parquet은 끝까지 써야 읽을 수 있음).
+    출력 경로 반환 (기본 이름 규칙은 run_cleansing과 같음).
+    """
+    input_path = Path(input_path)
+    if output_path is None:
+        output_path = next_numbered_path(CLEANSED_DIR, f"cleaned_{input_path.stem}", artifact_suffix(parquet, ".csv"))
+    output_path = Path(output_path)
+    n = write_frames(iter_cleaned(input_path, encoding, chunksize), output_path, encoding=encoding)
+    print(f"Cleansing 완료: {n}건 → {output_path}")
+    return output_path
+
+
 if __name__ == "__main__":
     import sys
-    if len(sys.argv) < 2:
-        print("사용법: python -m service.cleansing.cleansing <입력.csv> [출력.csv]")
+    args = [a for a in sys.argv[1:] if a != "--parquet"]
+    if not args:
+        print("사용법: python -m service.cleansing.cleansing <입력.csv> [출력.csv | 출력.parquet] [--parquet]")
         sys.exit(1)
-    inp = sys.argv[1]
-    out = sys.argv[2] if len(sys.argv) > 2 else None
-    run_cleansing(inp, out)
+    inp = args[0]
+    out = args[1] if len(args) > 1 else None
+    stream_cleansing(inp, out, parquet="--parquet" in sys.argv[1:])
@@ -0,0 +1,280 @@
+"""
+Parquet 중간 산출물: 정제·정규화 DataFrame, chunk, 임베딩 결과를 컬럼 형식으로 읽고 쓰기 (pyarrow 필요, 선택 의존성).
+경로 확장자가 .parquet이면 service.streaming의 iter_frames / iter_records / write_* 가 이 모듈로 넘김.
+
+- DataFrame(cleansed/normalized): 컬럼 dtype 그대로 저장 (CSV처럼 18 → 18.0, 빈 문자열 → 결측으로 바뀌지 않음)
+- chunk(chunked/embedded): text 문자열 + metadata struct + embedding 고정 길이 float32 list 컬럼
+  struct는 모든 행에 같은 필드가 있으므로, 원래 dict에 없던 키는 metadata_absent 컬럼에 적어 두고 읽을 때 빼서 JSONL과 같은 dict로 되돌림
+- 행 묶음(row group) 단위로 쓰고 읽어 메모리는 묶음 크기만큼만 씀
+- Parquet은 파일을 닫을 때 footer를 쓰므로 중단된 파일은 읽을 수 없음 (이어 쓰기 resume은 JSONL만)
+"""
+
+from pathlib import Path
+from typing import Any, Iterator, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    pa = pq = None
+    HAS_PYARROW = False
+
+PARQUET_SUFFIX = ".parquet"
+# 한 row group(쓰기·읽기 묶음)의 행 수
+DEFAULT_BATCH_ROWS = 5000
+_COMPRESSION = "zstd"
+
+# chunk 메타데이터 struct 필드 (chunking.iter_chunks + sort_keys 정렬 필드). 여기 없는 키는 첫 묶음 값으로 타입 추론.
+# string 필드는 str()로 맞춰 씀 (read_csv가 숫자로 추론한 마감일 20260301 등)
+_METADATA_FIELDS = (
+    ("source_row_id", "int64"),
+    ("company", "string"),
+    ("job_role", "string"),
+    ("location_sido", "string"),
+    ("location_gu", "string"),
+    ("career_type", "string"),
+    ("education_level", "string"),
+    ("deadline", "string"),
+    ("company_years_num", "float64"),
+    ("deadline_date", "string"),
+    ("company_years", "int64"),
+    ("chunk_group", "string"),
+    ("content_hash", "string"),
+)
+
+
+def is_parquet(path: Union[str, Path, None]) -> bool:
+    return path is not None and Path(path).suffix.lower() == PARQUET_SUFFIX
+
+
+def is_record_parquet(path: Union[str, Path]) -> bool:
+    """chunk/임베딩 Parquet(text·metadata 컬럼)이면 True, DataFrame Parquet이면 False."""
+    require_pyarrow()
+    names = pq.read_schema(path).names
+    return "text" in names and "metadata" in names
+
+
+def require_pyarrow() -> None:
+    if not HAS_PYARROW:
+        raise RuntimeError("Parquet 산출물에는 pyarrow 패키지가 필요합니다. pip install pyarrow")
+
+
+def _frame_schema(table: "pa.Table") -> "pa.Schema":
+    """첫 묶음 스키마에서 전부 결측인 컬럼(null 타입)은 문자열로 (다음 묶음에 값이 있어도 cast 되도록)."""
+    return pa.schema([
+        field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+        for field in table.schema
+    ]).remove_metadata()
+
+
+class ParquetFrameWriter:
+    """DataFrame 묶음을 한 Parquet 파일에 이어 씀 (스키마는 첫 묶음 기준, 이후 묶음은 그 스키마로 cast)."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        require_pyarrow()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._writer: Optional["pq.ParquetWriter"] = None
+        self.rows = 0
+
+    def write(self, frame: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, _frame_schema(table), compression=_COMPRESSION)
+        self._writer.write_table(table.cast(self._writer.schema))
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        if self._writer is None:
+            # 묶음이 하나도 없으면 빈 파일 대신 컬럼 없는 Parquet
+            pq.write_table(pa.table({}), self.path)
+        else:
+            self._writer.close()
+
+    def __enter__(self) -> "ParquetFrameWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _to_frame(data: Union["pa.Table", "pa.RecordBatch"]) -> pd.DataFrame:
+    """Arrow → DataFrame. 문자열 컬럼은 read_csv 결과처럼 object (정제·정규화 코드가 object 문자열 컬럼 기준)."""
+    frame = data.to_pandas()
+    strings = [name for name, typ in zip(data.schema.names, data.schema.types) if pa.types.is_string(typ) or pa.types.is_large_string(typ)]
+    return frame.astype({name: object for name in strings}) if strings else frame
+
+
+def iter_parquet_frames(path: Union[str, Path], chunksize: int = DEFAULT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Parquet을 chunksize행씩 DataFrame으로. index는 파일 전체 기준 행 번호로 이어짐 (CSV chunksize 읽기와 같음)."""
+    require_pyarrow()
+    start = 0
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+        frame = _to_frame(batch)
+        frame.index = pd.RangeIndex(start, start + len(frame))
+        start += len(frame)
+        yield frame
+
+
+def read_parquet_frame(path: Union[str, Path]) -> pd.DataFrame:
+    require_pyarrow()
+    return _to_frame(pq.read_table(path))
+
+
+def _string_fields(meta_type: "pa.StructType") -> set[str]:
+    return {meta_type.field(i).name for i in range(meta_type.num_fields) if pa.types.is_string(meta_type.field(i).type)}
+
+
+def _coerce_strings(meta: dict[str, Any], string_fields: set[str]) -> dict[str, Any]:
+    """string 필드에 문자열이 아닌 값(None 제외)이 있으면 str()로 바꾼 새 dict."""
+    if all(meta.get(key) is None or isinstance(meta[key], str) for key in string_fields):
+        return meta
+    return {
+        key: str(value) if key in string_fields and value is not None and not isinstance(value, str) else value
+        for key, value in meta.items()
+    }
+
+
+def _metadata_type(sample: list[dict[str, Any]]) -> "pa.StructType":
+    """알려진 필드는 고정 타입, 그 밖의 키는 첫 묶음 값으로 추론한 타입 (전부 None이면 문자열)."""
+    fields = [pa.field(name, pa.type_for_alias(alias)) for name, alias in _METADATA_FIELDS]
+    known = {name for name, _ in _METADATA_FIELDS}
+    extra: dict[str, list[Any]] = {}
+    for meta in sample:
+        for key, value in meta.items():
+            if key not in known:
+                extra.setdefault(key, []).append(value)
+    for key, values in extra.items():
+        inferred = pa.array(values).type
+        fields.append(pa.field(key, pa.string() if pa.types.is_null(inferred) else inferred))
+    return pa.struct(fields)
+
+
+class ParquetRecordWriter:
+    """
+    chunk dict({"text", "metadata", ["embedding"]})를 batch_rows건씩 모아 Parquet row group으로 씀.
+    embedding이 있으면 첫 건의 길이로 고정 길이 float32 list 컬럼을 만듦.
+    """
+
+    def __init__(self, path: Union[str, Path], batch_rows: int = DEFAULT_BATCH_ROWS) -> None:
+        require_pyarrow()
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_rows = batch_rows
+        self._buffer: list[dict[str, Any]] = []
+        self._writer: Optional["pq.ParquetWriter"] = None
+        self._dim: Optional[int] = None
+        self.rows = 0
+
+    def write(self, item: dict[str, Any]) -> None:
+        self._buffer.append(item)
+        if len(self._buffer) >= self.batch_rows:
+            self._flush()
+
+    def _schema(self, batch: list[dict[str, Any]]) -> "pa.Schema":
+        fields = [
+            pa.field("text", pa.string()),
+            pa.field("metadata", _metadata_type([item.get("metadata") or {} for item in batch])),
+            pa.field("metadata_absent", pa.list_(pa.string())),
+        ]
+        if "embedding" in batch[0]:
+            self._dim = len(batch[0]["embedding"])
+            fields.append(pa.field("embedding", pa.list_(pa.float32(), self._dim)))
+        return pa.schema(fields)
+
+    def _flush(self) -> None:
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self._schema(batch), compression=_COMPRESSION)
+        schema = self._writer.schema
+        meta_type = schema.field("metadata").type
+        names = [meta_type.field(i).name for i in range(meta_type.num_fields)]
+        string_fields = _string_fields(meta_type)
+        metadata = [_coerce_strings(item.get("metadata") or {}, string_fields) for item in batch]
+        unknown = {key for meta in metadata for key in meta} - set(names)
+        if unknown:
+            raise ValueError(f"Parquet 스키마에 없는 메타데이터 키: {sorted(unknown)} (첫 묶음에 없던 키)")
+        # struct에서는 없는 키도 None이 되므로, 없던 키를 따로 적어 둠 (모두 있으면 null)
+        absent = [[name for name in names if name not in meta] or None for meta in metadata]
+        columns = [
+            pa.array([item.get("text", "") for item in batch], type=pa.string()),
+            pa.array(metadata, type=meta_type),
+            pa.array(absent, type=pa.list_(pa.string())),
+        ]
+        if self._dim is not None:
+            vectors = np.asarray([item["embedding"] for item in batch], dtype=np.float32)
+            if vectors.ndim != 2 or vectors.shape[1] != self._dim:
+                raise ValueError(f"임베딩 차원이 {self._dim}이 아닌 항목이 있습니다.")
+            columns.append(pa.FixedSizeListArray.from_arrays(pa.array(vectors.ravel()), self._dim))
+        self._writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+        self.rows += len(batch)
+
+    def close(self) -> None:
+        self._flush()
+        if self._writer is None:
+            pq.write_table(pa.table({"text": pa.array([], pa.string())}), self.path)
+        else:
+            self._writer.close()
+
+    def __enter__(self) -> "ParquetRecordWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def _embedding_matrix(column: "pa.Array") -> np.ndarray:
+    """고정 길이 list 컬럼 → (n, dim) float32 행렬 (값 버퍼를 reshape, 행별 list 변환 없음)."""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    dim = column.type.list_size
+    matrix = column.flatten().to_numpy(zero_copy_only=False).astype(np.float32, copy=False).reshape(-1, dim)
+    # Arrow 버퍼를 그대로 보는 배열은 읽기 전용 → 제자리 정규화 등을 위해 복사
+    return matrix if matrix.flags.writeable else matrix.copy()
+
+
+def _metadata_list(data: Union["pa.Table", "pa.RecordBatch"]) -> list[dict[str, Any]]:
+    """metadata struct 컬럼 → dict 목록 (metadata_absent에 적힌, 원래 없던 키는 뺌)."""
+    names = data.schema.names
+    if "metadata" not in names:
+        return [{} for _ in range(data.num_rows)]
+    metadata = [meta or {} for meta in data.column("metadata").to_pylist()]
+    if "metadata_absent" in names:
+        for meta, absent in zip(metadata, data.column("metadata_absent").to_pylist()):
+            for key in absent or ():
+                meta.pop(key, None)
+    return metadata
+
+
+def iter_parquet_records(path: Union[str, Path], batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[dict[str, Any]]:
+    """chunked/embedded Parquet을 JSONL과 같은 dict로 하나씩 (embedding은 float list)."""
+    require_pyarrow()
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows):
+        names = batch.schema.names
+        texts = batch.column("text").to_pylist()
+        metadata = _metadata_list(batch)
+        vectors = _embedding_matrix(batch.column("embedding")).tolist() if "embedding" in names else None
+        for i, text in enumerate(texts):
+            item: dict[str, Any] = {"text": text, "metadata": metadata[i]}
+            if vectors is not None:
+                item["embedding"] = vectors[i]
+            yield item
+
+
+def read_embedded_arrays(path: Union[str, Path]) -> tuple[list[str], list[dict[str, Any]], np.ndarray]:
+    """embedded Parquet → (texts, metadata, (n, dim) float32 행렬). memory 검색 백엔드가 행렬을 바로 씀."""
+    require_pyarrow()
+    table = pq.read_table(path)
+    if not table.num_rows:
+        return [], [], np.zeros((0, 0), dtype=np.float32)
+    if "embedding" not in table.column_names:
+        raise ValueError(f"{path}에 embedding 컬럼이 없습니다 (chunked 파일?).")
+    texts = table.column("text").to_pylist()
+    metadata = _metadata_list(table)
+    return texts, metadata, _embedding_matrix(table.column("embedding"))
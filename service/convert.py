@@ -0,0 +1,89 @@
+"""
+산출물 형식 변환·비교: CSV/JSONL ↔ Parquet (기존 단계별 산출물을 Parquet으로 옮기거나 되돌릴 때).
+
+- .csv ↔ .parquet: 정제·정규화 DataFrame (dtype 유지)
+- .jsonl ↔ .parquet: chunked/embedded (embedding은 고정 길이 float32 list 컬럼)
+- --bench: 원본과 변환본의 파일 크기·로드 시간 비교 (embedded는 memory 검색 인덱스 로드 시간)
+
+CLI: python -m service.convert <경로...> [--to parquet|text] [--bench]
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Callable, Union
+
+from service.columnar import PARQUET_SUFFIX, is_parquet, is_record_parquet
+from service.streaming import iter_frames, iter_records, load_frame, write_frames, write_records
+
+
+def _is_records(path: Path) -> bool:
+    return is_record_parquet(path) if is_parquet(path) else path.suffix == ".jsonl"
+
+
+def convert(path: Union[str, Path], to_parquet: bool = True) -> Path:
+    """산출물 하나를 같은 이름의 다른 형식(.parquet 또는 .csv/.jsonl)으로 변환. 출력 경로 반환."""
+    path = Path(path)
+    records = _is_records(path)
+    if to_parquet:
+        output_path = path.with_suffix(PARQUET_SUFFIX)
+    else:
+        output_path = path.with_suffix(".jsonl" if records else ".csv")
+    if output_path == path:
+        raise ValueError(f"{path}는 이미 {'Parquet' if to_parquet else '텍스트'} 형식입니다.")
+    if records:
+        n = write_records(iter_records(path), output_path)
+    else:
+        n = write_frames(iter_frames(path), output_path)
+    print(f"변환 완료: {n}건 {path} → {output_path}")
+    return output_path
+
+
+def _load_fn(path: Path) -> Callable[[], Any]:
+    """로드 시간을 잴 함수: embedded → memory 검색 인덱스, chunked → dict 목록, DataFrame → load_frame."""
+    if not _is_records(path):
+        return lambda: load_frame(path)
+    first = next(iter_records(path), {})
+    if "embedding" in first:
+        from RAG.Retriever.memory import MemoryIndex
+
+        return lambda: MemoryIndex.from_jsonl(path)
+    return lambda: list(iter_records(path))
+
+
+def bench(text_path: Path, parquet_path: Path, repeat: int = 3) -> None:
+    """두 형식의 파일 크기와 로드 시간(repeat회 중 최소)을 표로 출력."""
+    rows = []
+    for name, p in (("text", text_path), ("parquet", parquet_path)):
+        fn = _load_fn(p)
+        best = float("inf")
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - t0)
+        rows.append((name, p.stat().st_size / 1e6, best))
+    print(f"\n{text_path.name} ↔ {parquet_path.name}")
+    print(f"{'형식':<8} {'MB':>9} {'로드 초':>9}")
+    for name, mb, sec in rows:
+        print(f"{name:<8} {mb:9.1f} {sec:9.3f}")
+    (_, text_mb, text_sec), (_, pq_mb, pq_sec) = rows
+    print(f"크기 {text_mb / pq_mb:.1f}배 작음 · 로드 {text_sec / pq_sec:.1f}배 빠름")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="산출물 CSV/JSONL ↔ Parquet 변환")
+    parser.add_argument("paths", nargs="+", help="변환할 .csv / .jsonl / .parquet 경로")
+    parser.add_argument("--to", choices=("parquet", "text"), default="parquet", help="변환할 형식 (text: .csv 또는 .jsonl)")
+    parser.add_argument("--bench", action="store_true", help="변환 후 두 형식의 크기·로드 시간 비교")
+    parser.add_argument("--repeat", type=int, default=3, help="--bench 반복 횟수 (최소 시간 사용)")
+    args = parser.parse_args()
+
+    for path in map(Path, args.paths):
+        output_path = convert(path, to_parquet=args.to == "parquet")
+        if args.bench:
+            text_path, parquet_path = (path, output_path) if args.to == "parquet" else (output_path, path)
+            bench(text_path, parquet_path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,19 @@
 채용공고 청크 임베딩.
 """
 from .embedding import (
+    iter_chunked_jsonl,
+    iter_embedded,
     load_chunked_jsonl,
     run_embedding,
     save_embedded_jsonl,
+    stream_embedding,
 )
 
-__all__ = ["load_chunked_jsonl", "run_embedding", "save_embedded_jsonl"]
+__all__ = [
+    "iter_chunked_jsonl",
+    "iter_embedded",
+    "load_chunked_jsonl",
+    "run_embedding",
+    "save_embedded_jsonl",
+    "stream_embedding",
+]
@@ -1,18 +1,35 @@
 """
-python -m service.embedding <chunked_JSONL_경로>
-결과: service/embedding/embedded/embedded_1.jsonl, embedded_2.jsonl, ...
+python -m service.embedding <chunked_JSONL_경로> [--output embedded.jsonl] [--resume] [--no-pg] [--parquet]
+결과: service/embedding/embedded/embedded_1.jsonl, embedded_2.jsonl, ... (--parquet이면 .parquet, 입력도 chunked Parquet 가능)
+chunk를 한 줄씩 임베딩해 바로 저장 (중단되면 --output 같은 경로와 --resume으로 이어서 실행).
 """
+import argparse
 import sys
 
-from .embedding import run_embedding
+from .embedding import stream_embedding
 
 
 def main() -> None:
-    if len(sys.argv) < 2:
-        print("사용법: python -m service.embedding <chunked_JSONL_경로>", file=sys.stderr)
+    parser = argparse.ArgumentParser(description="chunked JSONL 임베딩 → embedded JSONL + PostgreSQL")
+    parser.add_argument("input_path", help="chunked JSONL 또는 Parquet 경로")
+    parser.add_argument("--output", default=None, help="embedded JSONL/Parquet 경로 (기본 embedded/embedded_N.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="--output의 완결된 줄 다음부터 이어서 임베딩")
+    parser.add_argument("--no-pg", action="store_true", help="PostgreSQL 저장 생략")
+    parser.add_argument("--parquet", action="store_true", help="기본 출력 이름을 .parquet으로 (embedding은 float32 고정 길이 list 컬럼)")
+    args = parser.parse_args()
+    if args.resume and not args.output:
+        parser.error("--resume에는 이어 쓸 --output 경로가 필요합니다.")
+    try:
+        stream_embedding(
+            args.input_path,
+            output_path=args.output,
+            save_pg=not args.no_pg,
+            resume=args.resume,
+            parquet=args.parquet,
+        )
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
         sys.exit(1)
-    input_path = sys.argv[1]
-    run_embedding(input_path)
 
 
 if __name__ == "__main__":
@@ -1,15 +1,22 @@
 """
 채용공고 청크 임베딩: chunked JSONL → OpenAI text-embedding-3-small → embedded/ + PostgreSQL(pgvector).
-결과물: service/embedding/embedded/embedded_1.jsonl, ... 및 DB 테이블 job_embeddings.
+결과물: service/embedding/embedded/embedded_1.jsonl, ... (또는 .parquet: embedding은 고정 길이 float32 list 컬럼) 및 DB 테이블 job_embeddings.
 """
 
+import contextlib
+import io
+import itertools
 import json
 import os
 from pathlib import Path
-from typing import Any, Callable, Optional, Union
+from typing import Any, Callable, Iterable, Iterator, Optional, Union
 
 from dotenv import load_dotenv
 
+from service.columnar import is_parquet
+from service.sort_keys import SORT_FIELDS, with_sort_fields
+from service.streaming import artifact_suffix, count_complete_jsonl, counted, iter_records, next_numbered_path, tee_jsonl, write_records
+
 # 프로젝트 루트의 .env 로드
 _PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 load_dotenv(_PROJECT_ROOT / ".env")
@@ -23,15 +30,18 @@ OPENAI_EMBED_DIM = 1536
 # PostgreSQL 테이블명
 PG_TABLE = "job_embeddings"
 
+# COPY 적재 컬럼 순서 (id·created_at은 기본값)
+_COPY_COLUMNS = ("text", "metadata", "embedding", *SORT_FIELDS)
+_COPY_BATCH_ROWS = 5000
+
 
 def get_openai_embed_fn() -> Optional[Callable[[str], list[float]]]:
-    """OpenAI text-embedding-3-small 임베딩 함수. OPENAI_API_KEY 필요."""
-    api_key = os.environ.get("OPENAI_API_KEY")
-    if not api_key:
-        return None
+    """OpenAI text-embedding-3-small 임베딩 함수. OPENAI_API_KEY 필요. 공용 클라이언트(연결 풀) 사용."""
+    from service.openai_client import get_openai_client
 
-    from openai import OpenAI
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client()
+    if client is None:
+        return None
 
     def embed(text: str) -> list[float]:
         if not text or not text.strip():
@@ -51,28 +61,21 @@ def _dummy_embed(text: str) -> list[float]:
 
 
 def load_chunked_jsonl(path: Union[str, Path]) -> list[dict[str, Any]]:
-    """청킹된 JSONL 로드."""
-    path = Path(path)
-    chunks = []
-    with open(path, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            chunks.append(json.loads(line))
-    return chunks
+    """청킹된 JSONL 로드 (.parquet이면 Parquet)."""
+    return list(iter_records(path))
+
+
+def iter_chunked_jsonl(path: Union[str, Path]) -> Iterator[dict[str, Any]]:
+    """청킹된 JSONL(또는 Parquet)을 한 건씩 (load_chunked_jsonl의 스트리밍 버전)."""
+    return iter_records(path)
 
 
 def save_embedded_jsonl(
     items: list[dict[str, Any]], path: Union[str, Path]
 ) -> Path:
-    """임베딩된 항목들을 JSONL로 저장."""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
-        for item in items:
-            f.write(json.dumps(item, ensure_ascii=False) + "\n")
-    return path
+    """임베딩된 항목들을 JSONL로 저장 (.parquet 경로면 embedding을 float32 고정 길이 list 컬럼으로)."""
+    write_records(items, path)
+    return Path(path)
 
 
 def _get_pg_connection():
@@ -102,45 +105,177 @@ def ensure_pgvector_table(conn) -> None:
                 text TEXT NOT NULL,
                 metadata JSONB,
                 embedding vector(%s),
+                deadline_date DATE,
+                company_years INTEGER,
+                content_hash TEXT,
                 created_at TIMESTAMPTZ DEFAULT NOW()
             );
         """ % OPENAI_EMBED_DIM)
+        # 이전 스키마로 만든 테이블에 정렬·중복 제거용 컬럼 추가 (service.sort_keys)
+        cur.execute("""
+            ALTER TABLE job_embeddings
+                ADD COLUMN IF NOT EXISTS deadline_date DATE,
+                ADD COLUMN IF NOT EXISTS company_years INTEGER,
+                ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        """)
+        cur.execute("""
+            CREATE INDEX IF NOT EXISTS job_embeddings_importance_idx
+                ON job_embeddings (deadline_date DESC NULLS LAST, company_years DESC NULLS LAST);
+        """)
+        cur.execute("CREATE INDEX IF NOT EXISTS job_embeddings_content_hash_idx ON job_embeddings (content_hash);")
+    conn.commit()
+
+
+def backfill_sort_columns(conn) -> int:
+    """정렬 컬럼이 비어 있는 기존 행(컬럼 추가 전 적재분)을 metadata로 채움. 갱신 건수 반환."""
+    with conn.cursor() as cur:
+        cur.execute("SELECT id, text, metadata FROM job_embeddings WHERE content_hash IS NULL;")
+        rows = cur.fetchall()
+        for row_id, text, meta in rows:
+            meta = meta if isinstance(meta, dict) else (json.loads(meta) if meta else {})
+            meta = with_sort_fields(meta, text)
+            cur.execute(
+                """
+                UPDATE job_embeddings
+                SET deadline_date = %s, company_years = %s, content_hash = %s, metadata = %s
+                WHERE id = %s;
+                """,
+                (*(meta[k] for k in SORT_FIELDS), json.dumps(meta, ensure_ascii=False), row_id),
+            )
+    conn.commit()
+    return len(rows)
+
+
+def _copy_field(value: Any) -> str:
+    """COPY text 형식 필드: NULL은 \\N, 역슬래시·탭·줄바꿈은 이스케이프."""
+    if value is None:
+        return "\\N"
+    return (
+        str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+def copy_embeddings(
+    conn,
+    items: Iterable[dict[str, Any]],
+    table: str = PG_TABLE,
+    batch_rows: int = _COPY_BATCH_ROWS,
+) -> int:
+    """
+    임베딩 결과를 COPY FROM STDIN으로 대량 적재 (행별 INSERT보다 훨씬 빠름). 적재 건수 반환, commit은 호출자.
+    batch_rows건씩 나눠 보내므로 items가 generator면 메모리 사용량이 batch 크기로 제한됨.
+    """
+    sql = f"COPY {table} ({', '.join(_COPY_COLUMNS)}) FROM STDIN"
+    vec_formats: dict[int, str] = {}
+    buf = io.StringIO()
+    pending = 0
+    total = 0
+    with conn.cursor() as cur:
+        for item in items:
+            text = item.get("text", "")
+            meta = with_sort_fields(item.get("metadata", {}), text)
+            vec = item.get("embedding")
+            vec_text = None
+            if vec is not None and len(vec):
+                fmt = vec_formats.get(len(vec))
+                if fmt is None:
+                    fmt = vec_formats[len(vec)] = "[" + ",".join(["%.7g"] * len(vec)) + "]"
+                vec_text = fmt % tuple(vec)
+            fields = (text, json.dumps(meta, ensure_ascii=False), vec_text, *(meta[k] for k in SORT_FIELDS))
+            buf.write("\t".join(_copy_field(f) for f in fields))
+            buf.write("\n")
+            pending += 1
+            if pending >= batch_rows:
+                buf.seek(0)
+                cur.copy_expert(sql, buf)
+                total += pending
+                buf, pending = io.StringIO(), 0
+        if pending:
+            buf.seek(0)
+            cur.copy_expert(sql, buf)
+            total += pending
+    return total
+
+
+def create_ann_index(
+    conn,
+    kind: str = "hnsw",
+    table: str = PG_TABLE,
+    m: int = 16,
+    ef_construction: int = 64,
+    lists: int = 100,
+) -> str:
+    """
+    embedding cosine ANN 인덱스 생성 (kind: "hnsw" | "ivfflat"). 인덱스 이름 반환.
+    검색 시 hnsw.ef_search / ivfflat.probes로 recall·속도 조절 (RAG.Retriever.retrieve 인자).
+    ivfflat은 데이터를 넣은 뒤 만들어야 목록(lists) 중심이 제대로 잡힘.
+    """
+    name = f"{table.split('.')[-1]}_embedding_{kind}_idx"
+    if kind == "hnsw":
+        options = f"(m = {int(m)}, ef_construction = {int(ef_construction)})"
+    elif kind == "ivfflat":
+        options = f"(lists = {int(lists)})"
+    else:
+        raise ValueError(f"kind는 hnsw 또는 ivfflat이어야 합니다: {kind}")
+    with conn.cursor() as cur:
+        cur.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING {kind} (embedding vector_cosine_ops) WITH {options};"
+        )
     conn.commit()
+    return name
+
+
+class _ItemSourceError(Exception):
+    """items 쪽(임베딩 generator 등)에서 난 예외를 DB 오류와 구분하기 위한 표시 (원래 예외는 __cause__)."""
+
+
+def _guard_items(items: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    it = iter(items)
+    while True:
+        try:
+            item = next(it)
+        except StopIteration:
+            return
+        except Exception as e:
+            raise _ItemSourceError() from e
+        yield item
 
 
 def save_to_postgres(
-    items: list[dict[str, Any]],
-) -> None:
-    """임베딩 결과를 PostgreSQL job_embeddings 테이블에 저장."""
+    items: Iterable[dict[str, Any]],
+) -> int:
+    """
+    임베딩 결과를 PostgreSQL job_embeddings 테이블에 저장. 저장 건수 반환 (DB 쪽 실패 시 0).
+    items가 generator면 COPY batch 단위로 소비하며 저장하고, commit은 모두 보낸 뒤 한 번 (중단 시 전부 rollback).
+    items를 만드는 중 난 예외(임베딩 API 오류 등)는 DB 실패로 삼키지 않고 rollback 후 그대로 다시 던짐.
+    """
     try:
         from pgvector.psycopg2 import register_vector
     except ImportError:
         print("pgvector 패키지 없음. pip install pgvector 후 재시도.")
-        return
+        return 0
     try:
         conn = _get_pg_connection()
     except Exception as e:
         print(f"PostgreSQL 연결 실패: {e}")
-        return
+        return 0
     try:
         register_vector(conn)
         ensure_pgvector_table(conn)
-        with conn.cursor() as cur:
-            for item in items:
-                text = item.get("text", "")
-                meta = json.dumps(item.get("metadata", {}), ensure_ascii=False)
-                vec = item.get("embedding", [])
-                cur.execute(
-                    """
-                    INSERT INTO job_embeddings (text, metadata, embedding)
-                    VALUES (%s, %s, %s);
-                    """,
-                    (text, meta, vec),
-                )
+        total = copy_embeddings(conn, _guard_items(items))
         conn.commit()
-        print(f"PostgreSQL 저장 완료: {len(items)}건 → 테이블 {PG_TABLE}")
+        print(f"PostgreSQL 저장 완료: {total}건 → 테이블 {PG_TABLE}")
+        backfilled = backfill_sort_columns(conn)
+        if backfilled:
+            print(f"정렬 컬럼 채움: 기존 {backfilled}건")
+        return total
+    except _ItemSourceError as e:
+        with contextlib.suppress(Exception):
+            conn.rollback()
+        raise e.__cause__
     except Exception as e:
         print(f"PostgreSQL 저장 실패: {e}")
+        return 0
     finally:
         conn.close()
 
@@ -151,11 +286,12 @@ def run_embedding(
     embed_fn: Optional[Callable[[str], list[float]]] = None,
     save_jsonl: bool = True,
     save_pg: bool = True,
+    parquet: bool = False,
 ) -> list[dict[str, Any]]:
     """
     청킹 JSONL을 읽어 text 필드 임베딩 후 저장.
     - embed_fn 미지정 시 OpenAI text-embedding-3-small 사용 (OPENAI_API_KEY 필요).
-    - save_jsonl=True 이면 embedded/embedded_1.jsonl, ... 저장.
+    - save_jsonl=True 이면 embedded/embedded_1.jsonl, ... 저장 (parquet=True면 .parquet).
     - save_pg=True 이고 DATABASE_URL 또는 PGHOST 등 설정 시 PostgreSQL job_embeddings 저장.
     """
     input_path = Path(input_path)
@@ -174,22 +310,14 @@ def run_embedding(
         vec = embed_fn(text)
         results.append({
             "text": text,
-            "metadata": item.get("metadata", {}),
+            # 정렬 필드가 없는 예전 chunk 파일도 여기서 채움
+            "metadata": with_sort_fields(item.get("metadata", {}), text),
             "embedding": vec,
         })
 
     if save_jsonl:
         if output_path is None:
-            EMBEDDED_DIR.mkdir(parents=True, exist_ok=True)
-            pattern = "embedded_*.jsonl"
-            existing = list(EMBEDDED_DIR.glob(pattern))
-            nums = []
-            for p in existing:
-                suffix = p.stem.replace("embedded_", "")
-                if suffix.isdigit():
-                    nums.append(int(suffix))
-            n = max(nums) + 1 if nums else 1
-            output_path = EMBEDDED_DIR / f"embedded_{n}.jsonl"
+            output_path = next_numbered_path(EMBEDDED_DIR, "embedded", artifact_suffix(parquet, ".jsonl"))
         else:
             output_path = Path(output_path)
         save_embedded_jsonl(results, output_path)
@@ -201,3 +329,78 @@ def run_embedding(
         print("DATABASE_URL 또는 PGHOST 미설정 → PostgreSQL 저장 생략.")
 
     return results
+
+
+def iter_embedded(
+    chunks: Iterable[dict[str, Any]],
+    embed_fn: Callable[[str], list[float]],
+) -> Iterator[dict[str, Any]]:
+    """chunk를 하나씩 임베딩해 {"text", "metadata"(정렬 필드 포함), "embedding"}으로 반환."""
+    for item in chunks:
+        text = item.get("text", "")
+        yield {
+            "text": text,
+            "metadata": with_sort_fields(item.get("metadata", {}), text),
+            "embedding": embed_fn(text),
+        }
+
+
+def stream_embedding(
+    input_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    embed_fn: Optional[Callable[[str], list[float]]] = None,
+    save_jsonl: bool = True,
+    save_pg: bool = True,
+    resume: bool = False,
+    parquet: bool = False,
+) -> int:
+    """
+    run_embedding의 스트리밍 버전: chunk를 한 줄씩 읽어 임베딩하고 JSONL에 바로 쓰면서 같은 순회로 PostgreSQL에 COPY.
+    메모리는 COPY batch 크기만큼만 쓰고, 중단되면 그때까지 쓴 줄까지가 유효한 JSONL로 남음.
+    resume=True면 output_path의 완결된 줄 수만큼 입력 chunk를 건너뛰고 이어서 임베딩
+    (PostgreSQL은 끝에 한 번 commit하므로 이미 임베딩된 줄도 파일에서 다시 읽어 함께 적재). 처리 건수 반환.
+    임베딩 중 예외는 그대로 전파되고, PostgreSQL 저장만 실패하면 JSONL을 끝까지 쓴 뒤 RuntimeError.
+    입력은 chunked JSONL 또는 Parquet, 출력은 parquet=True 또는 .parquet 경로면 Parquet (이어 쓰기 resume은 JSONL만).
+    """
+    input_path = Path(input_path)
+    pg_enabled = save_pg and bool(os.environ.get("DATABASE_URL") or os.environ.get("PGHOST"))
+    if save_pg and not pg_enabled:
+        print("DATABASE_URL 또는 PGHOST 미설정 → PostgreSQL 저장 생략.")
+    if not save_jsonl and not pg_enabled:
+        print("저장할 곳이 없습니다 (save_jsonl=False, PostgreSQL 미설정).")
+        return 0
+    if resume and (not save_jsonl or output_path is None or is_parquet(output_path)):
+        raise ValueError("resume은 이어 쓸 output_path(JSONL)가 있어야 합니다.")
+
+    embed_fn = embed_fn or get_openai_embed_fn() or _dummy_embed
+    if embed_fn is _dummy_embed and not os.environ.get("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY 미설정 → 더미 벡터로 저장합니다.")
+
+    if save_jsonl and output_path is None:
+        output_path = next_numbered_path(EMBEDDED_DIR, "embedded", artifact_suffix(parquet, ".jsonl"))
+    output_path = Path(output_path) if save_jsonl else None
+
+    done = count_complete_jsonl(output_path) if resume else 0
+    if done:
+        print(f"이어서 임베딩: 기존 {done}건 건너뜀 ({output_path})")
+    chunks = itertools.islice(iter_chunked_jsonl(input_path), done, None)
+    items = tee_jsonl(iter_embedded(chunks, embed_fn), output_path, append=resume)
+
+    counter = [0]
+    items = counted(items, counter)
+    pg_rows = 0
+    if pg_enabled:
+        # 이어 쓰는 경우 이전 실행분은 commit되지 않았으므로 파일에서 다시 읽어 함께 적재
+        previous = itertools.islice(iter_records(output_path), done) if done else iter(())
+        pg_rows = save_to_postgres(itertools.chain(previous, items))
+    for _ in items:  # PostgreSQL 저장을 안 하거나 실패한 경우에도 남은 chunk를 끝까지 임베딩·저장
+        pass
+
+    if counter[0] == 0 and not done:
+        print("Chunk가 없습니다.")
+    elif output_path is not None:
+        print(f"Embedding 완료: {done + counter[0]}건 → {output_path}")
+    if pg_enabled and pg_rows != done + counter[0]:
+        hint = f" (--output {output_path} --resume으로 다시 실행하면 파일의 임베딩을 적재)" if output_path is not None else ""
+        raise RuntimeError(f"PostgreSQL 저장 실패: {done + counter[0]}건 중 {pg_rows}건 적재{hint}")
+    return done + counter[0]
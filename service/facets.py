@@ -0,0 +1,248 @@
+"""
+필터 자동완성용 facet 인덱스: chunk 메타데이터에서 회사·직무·경력·근무지역(시도/시군구)·업력 구간별 공고 수를 미리 집계.
+chunking 단계에서 chunked JSONL 전체로 facets.json을 다시 만들고, UI·서버는 이 작은 파일을 메모리에 올려
+접두어/오타 허용 검색으로 즉시 후보를 보여줌 (벡터 검색 없이).
+
+공고 구분 키는 (회사, 직무): 크롤링 회차별 chunked 파일에 같은 공고가 다시 나와도 한 번만 셈.
+
+CLI:
+    python -m service.facets build                   # chunked/*.jsonl, *.parquet → chunked/facets.json
+    python -m service.facets suggest company 에스피   # 자동완성 후보 확인
+"""
+
+import difflib
+import itertools
+import json
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from service.sort_keys import parse_company_years
+from service.streaming import artifact_paths, iter_records
+
+_SERVICE_DIR = Path(__file__).resolve().parent
+CHUNKED_DIR = _SERVICE_DIR / "chunking" / "chunked"
+DEFAULT_FACETS_PATH = CHUNKED_DIR / "facets.json"
+
+# facet 이름 → chunk 메타데이터 키 (location은 "시도" 또는 "시도 시군구" 두 단계를 함께 집계)
+FACET_FIELDS = ("company", "job_role", "career_type", "location")
+
+# 업력 구간: (라벨, 최소, 최대) — 최대 None은 상한 없음. retrieve(company_years_min/max)에 그대로 전달
+COMPANY_YEARS_BUCKETS = (
+    ("1~3년차", 1, 3),
+    ("4~7년차", 4, 7),
+    ("8~14년차", 8, 14),
+    ("15~29년차", 15, 29),
+    ("30년차 이상", 30, None),
+)
+
+_RE_SPACE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    """검색 비교용: 소문자 + 공백 제거 ("(주) 에스피 에이치" ≈ "(주)에스피에이치")."""
+    return _RE_SPACE.sub("", str(text)).lower()
+
+
+def _location_values(meta: dict[str, Any]) -> list[str]:
+    sido = (meta.get("location_sido") or "").strip()
+    gu = (meta.get("location_gu") or "").strip()
+    if not sido:
+        return []
+    return [sido, f"{sido} {gu}"] if gu else [sido]
+
+
+def build_facets(chunks: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    """chunk 목록 → {"n_postings", "fields": {facet: {값: 공고 수}}, "company_years_buckets": [...]}"""
+    postings: dict[tuple[Any, Any], dict[str, Any]] = {}
+    for chunk in chunks:
+        meta = chunk.get("metadata") or {}
+        company = meta.get("company")
+        if not company:
+            continue
+        postings.setdefault((company, meta.get("job_role")), meta)
+
+    fields: dict[str, dict[str, int]] = {name: {} for name in FACET_FIELDS}
+    bucket_counts = [0] * len(COMPANY_YEARS_BUCKETS)
+    for meta in postings.values():
+        values = {
+            "company": [meta.get("company")],
+            "job_role": [meta.get("job_role")],
+            "career_type": [meta.get("career_type")],
+            "location": _location_values(meta),
+        }
+        for name, vals in values.items():
+            for v in vals:
+                if v is None or not str(v).strip():
+                    continue
+                v = str(v).strip()
+                fields[name][v] = fields[name].get(v, 0) + 1
+        years = meta.get("company_years")
+        if years is None:
+            years = parse_company_years(meta.get("company_years_num"))
+        if years is not None:
+            for i, (_, lo, hi) in enumerate(COMPANY_YEARS_BUCKETS):
+                if years >= lo and (hi is None or years <= hi):
+                    bucket_counts[i] += 1
+                    break
+
+    return {
+        "built_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "n_postings": len(postings),
+        "fields": {name: dict(sorted(vals.items(), key=lambda kv: (-kv[1], kv[0]))) for name, vals in fields.items()},
+        "company_years_buckets": [
+            {"label": label, "min": lo, "max": hi, "count": n}
+            for (label, lo, hi), n in zip(COMPANY_YEARS_BUCKETS, bucket_counts)
+        ],
+    }
+
+
+def _iter_chunks(paths: Iterable[Path]) -> Iterable[dict[str, Any]]:
+    for p in paths:
+        yield from iter_records(p)
+
+
+def rebuild_facets(
+    chunk_paths: Optional[list[Union[str, Path]]] = None,
+    output_path: Optional[Union[str, Path]] = None,
+    extra_chunks: Optional[Iterable[dict[str, Any]]] = None,
+) -> Path:
+    """
+    chunked JSONL·Parquet들(기본 chunked/chunked_*.jsonl, .parquet 전체)로 facet 파일을 다시 만듦.
+    extra_chunks: 파일로 남기지 않은 chunk(메타데이터만 있어도 됨)도 함께 집계 (python -m service 파이프라인).
+    """
+    paths = [Path(p) for p in chunk_paths] if chunk_paths else artifact_paths(CHUNKED_DIR, "chunked")
+    chunks = _iter_chunks(paths)
+    if extra_chunks is not None:
+        chunks = itertools.chain(chunks, extra_chunks)
+    facets = build_facets(chunks)
+    output_path = Path(output_path or os.environ.get("FACETS_PATH") or DEFAULT_FACETS_PATH)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(facets, ensure_ascii=False, indent=1), encoding="utf-8")
+    tmp.replace(output_path)  # 읽는 쪽이 쓰다 만 파일을 보지 않도록 교체
+    print(f"Facet 인덱스 저장: 공고 {facets['n_postings']}건 → {output_path}")
+    return output_path
+
+
+class FacetIndex:
+    """facet 값·공고 수를 메모리에 두고 접두어 → 부분 일치 → 오타 허용 순으로 후보 검색."""
+
+    def __init__(self, facets: dict[str, Any]) -> None:
+        self.n_postings = int(facets.get("n_postings") or 0)
+        self.built_at = facets.get("built_at")
+        self.company_years_buckets: list[dict[str, Any]] = list(facets.get("company_years_buckets") or [])
+        self._counts: dict[str, dict[str, int]] = {k: dict(v) for k, v in (facets.get("fields") or {}).items()}
+        # facet별 (정규화 값, 원래 값) 정렬 목록: 접두어 검색을 이분 탐색으로
+        self._sorted: dict[str, list[tuple[str, str]]] = {
+            name: sorted((_normalize(v), v) for v in vals) for name, vals in self._counts.items()
+        }
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "FacetIndex":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")))
+
+    def fields(self) -> list[str]:
+        return list(self._counts)
+
+    def values(self, field: str) -> list[tuple[str, int]]:
+        """facet 전체 값 (공고 수 내림차순)."""
+        return sorted(self._counts.get(field, {}).items(), key=lambda kv: (-kv[1], kv[0]))
+
+    def count(self, field: str, value: str) -> int:
+        return self._counts.get(field, {}).get(value, 0)
+
+    def suggest(self, field: str, text: str = "", limit: int = 10) -> list[tuple[str, int]]:
+        """
+        자동완성 후보 [(값, 공고 수)]. 빈 입력이면 공고 수 상위.
+        순서: 접두어 일치 → 부분 일치 → 오타 허용(difflib) — 각 그룹 안에서는 공고 수 내림차순.
+        """
+        counts = self._counts.get(field)
+        if not counts:
+            return []
+        q = _normalize(text or "")
+        if not q:
+            return self.values(field)[:limit]
+        entries = self._sorted[field]
+        by_count = lambda v: (-counts[v], v)  # noqa: E731
+
+        prefix: list[str] = []
+        i = bisect_left(entries, (q, ""))
+        while i < len(entries) and entries[i][0].startswith(q):
+            prefix.append(entries[i][1])
+            i += 1
+        out = sorted(prefix, key=by_count)
+        if len(out) < limit:
+            seen = set(out)
+            out += sorted((v for norm, v in entries if q in norm and v not in seen), key=by_count)
+        if len(out) < limit:
+            seen = set(out)
+            norm_to_values: dict[str, list[str]] = {}
+            for norm, v in entries:
+                if v not in seen:
+                    norm_to_values.setdefault(norm, []).append(v)
+            close = difflib.get_close_matches(q, list(norm_to_values), n=limit, cutoff=0.6)
+            out += [v for norm in close for v in sorted(norm_to_values[norm], key=by_count)]
+        return [(v, counts[v]) for v in out[:limit]]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "built_at": self.built_at,
+            "n_postings": self.n_postings,
+            "fields": self._counts,
+            "company_years_buckets": self.company_years_buckets,
+        }
+
+
+_lock = threading.Lock()
+_index: Optional[FacetIndex] = None
+_index_key: Optional[tuple[str, float]] = None
+
+
+def get_facet_index(path: Optional[Union[str, Path]] = None) -> Optional[FacetIndex]:
+    """프로세스 공용 facet 인덱스 (파일이 갱신되면 다시 로드). 파일이 없으면 None."""
+    global _index, _index_key
+    path = Path(path or os.environ.get("FACETS_PATH") or DEFAULT_FACETS_PATH)
+    try:
+        mtime = path.stat().st_mtime
+    except OSError:
+        return None
+    key = (str(path), mtime)
+    with _lock:
+        if _index is None or _index_key != key:
+            _index = FacetIndex.load(path)
+            _index_key = key
+        return _index
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="필터 자동완성용 facet 인덱스")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="chunked JSONL로 facet 파일 생성")
+    p_build.add_argument("paths", nargs="*", help="chunked JSONL/Parquet (기본: chunked/chunked_*.jsonl, .parquet 전체)")
+    p_build.add_argument("--output", default=None, help="저장 경로 (기본 FACETS_PATH 또는 chunked/facets.json)")
+    p_suggest = sub.add_parser("suggest", help="자동완성 후보 출력")
+    p_suggest.add_argument("field", choices=list(FACET_FIELDS))
+    p_suggest.add_argument("text", nargs="?", default="")
+    p_suggest.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        rebuild_facets(args.paths or None, args.output)
+        return
+    index = get_facet_index()
+    if index is None:
+        print("facet 파일이 없습니다. python -m service.facets build 로 먼저 생성하세요.")
+        return
+    for value, n in index.suggest(args.field, args.text, args.limit):
+        print(f"{n:5d}  {value}")
+
+
+if __name__ == "__main__":
+    main()
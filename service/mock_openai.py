@@ -0,0 +1,400 @@
+"""
+로컬 mock OpenAI 서버: embeddings / chat.completions(스트리밍 포함) HTTP API를 흉내 내는 오프라인 부하 테스트용 서버.
+OpenAI 할당량·네트워크 없이 generate()·run_embedding의 처리량과 꼬리 지연(p95/p99)을 측정하기 위함.
+
+- 임베딩: 모델명+입력 텍스트로 정해지는 결정적 단위 벡터 (같은 텍스트 → 같은 벡터)
+- 채팅: user 메시지의 '[번호] (회사: .., 직무: ..)' 공고마다 본문 앞줄을 나열한 결정적 답변,
+        stream=True면 SSE로 조각 전송, stream_options.include_usage면 마지막에 usage 전송
+        (prompt가 1024토큰 이상이면 전에 본 prompt와 겹치는 앞부분을 prompt caching처럼 cached_tokens로 보고)
+- 지연: 첫 토큰/토큰 간격/임베딩 응답 지연을 분포로 지정, 오류율만큼 429/500 응답
+
+실행: python -m service.mock_openai [--addr 127.0.0.1:8089] [--ttft-ms lognormal:300,0.5] [--error-rate 0.01]
+사용: OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=mock 설정 후 generate()/run_embedding 실행.
+지표: GET /stats (요청 수·오류 수)
+"""
+
+import base64
+import hashlib
+import json
+import math
+import random
+import re
+import struct
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Optional
+
+DEFAULT_ADDR = "127.0.0.1:8089"
+DEFAULT_EMBED_DIM = 1536
+# OpenAI prompt caching: 1024토큰 이상일 때 128토큰 단위로 캐시
+_CACHE_MIN_TOKENS = 1024
+_CACHE_BLOCK_TOKENS = 128
+# 공통 prefix를 찾을 최근 prompt 수
+_CACHE_RECENT_PROMPTS = 256
+
+_RE_HANGUL = re.compile(r"[가-힣]")
+_RE_POSTING_HEADER = re.compile(r"^\[(\d+)\] \(회사: (.*?), 직무: (.*?)\)$", re.MULTILINE)
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    지연 분포 문자열(ms) → rng를 받아 초를 돌려주는 함수.
+      "200"                 고정 200ms
+      "uniform:100,500"     100~500ms 균등
+      "normal:300,50"       평균 300ms, 표준편차 50ms (0 미만은 0)
+      "lognormal:300,0.5"   중앙값 300ms, sigma 0.5 (꼬리가 긴 실제 API 지연에 가까움)
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        value = float(kind) / 1000.0
+        return lambda rng: value
+    a, b = (float(x) for x in args.split(","))
+    if kind == "uniform":
+        return lambda rng: rng.uniform(a, b) / 1000.0
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(a, b)) / 1000.0
+    if kind == "lognormal":
+        mu = math.log(a)
+        return lambda rng: rng.lognormvariate(mu, b) / 1000.0
+    raise ValueError(f"지원하지 않는 지연 분포: {spec} (고정값, uniform, normal, lognormal)")
+
+
+def _estimate_tokens(text: str) -> int:
+    """토큰 수 근사 (한글 1자 ≈ 1토큰, 그 외 4자 ≈ 1토큰). RAG.Generate.context의 대체 추정과 같은 규칙."""
+    hangul = len(_RE_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def deterministic_embedding(text: str, model: str, dim: int = DEFAULT_EMBED_DIM) -> list[float]:
+    """(모델, 텍스트)로 정해지는 단위 벡터. 같은 입력은 항상 같은 벡터."""
+    seed = int.from_bytes(hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()[:8], "big")
+    rng = random.Random(seed)
+    vec = [rng.gauss(0.0, 1.0) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def mock_answer(messages: list[dict[str, Any]]) -> str:
+    """user 메시지의 공고마다 '[번호] 회사 · 직무' + 본문 앞 2줄. 공고가 없으면 고정 안내문."""
+    user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+    if not isinstance(user, str):
+        user = json.dumps(user, ensure_ascii=False)
+    headers = list(_RE_POSTING_HEADER.finditer(user))
+    if not headers:
+        return "질문과 관련된 채용 공고를 찾지 못했습니다."
+    blocks = []
+    for i, m in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(user)
+        body = user[m.end():end].split("--- 끝 ---")[0]
+        lines = [ln.strip().lstrip("-•· ") for ln in body.split("\n") if ln.strip()][:2]
+        lines = [ln.split(":", 1)[1].strip() if ln.startswith("주요업무:") else ln for ln in lines]
+        blocks.append(f"[{m.group(1)}] {m.group(2)} · {m.group(3)}\n" + "\n".join(f"- {ln}" for ln in lines if ln))
+    return "\n\n".join(blocks)
+
+
+def _serialize_prompt(messages: list[dict[str, Any]]) -> str:
+    """메시지 목록을 순서대로 이어 붙인 prompt 문자열 (공통 prefix 비교용)."""
+    parts = []
+    for m in messages:
+        content = m.get("content") or ""
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        parts.append(f"{m.get('role')}\n{content}\n")
+    return "".join(parts)
+
+
+def _common_prefix_len(a: str, b: str) -> int:
+    """두 문자열의 공통 prefix 길이 (슬라이스 비교로 이분 탐색)."""
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class MockBehavior:
+    """응답 지연·오류율 설정과 누적 지표. 여러 핸들러 스레드가 공유."""
+
+    def __init__(
+        self,
+        *,
+        ttft: str = "300",
+        token_interval: str = "15",
+        embed_latency: str = "50",
+        error_rate: float = 0.0,
+        error_statuses: tuple[int, ...] = (429, 500),
+        chunk_chars: int = 4,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.ttft = parse_latency(ttft)
+        self.token_interval = parse_latency(token_interval)
+        self.embed_latency = parse_latency(embed_latency)
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.chunk_chars = max(1, chunk_chars)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._seen_prompts: deque[str] = deque(maxlen=_CACHE_RECENT_PROMPTS)
+        self._stats = {"chat": 0, "chat_stream": 0, "embeddings": 0, "embedded_inputs": 0, "errors": 0, "disconnects": 0}
+
+    def draw(self, dist: Callable[[random.Random], float]) -> float:
+        with self._lock:
+            return dist(self._rng)
+
+    def draw_error(self) -> Optional[int]:
+        """오류율에 걸리면 응답할 HTTP 상태 코드, 아니면 None."""
+        if self.error_rate <= 0:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            self._stats["errors"] += 1
+            return self._rng.choice(self.error_statuses)
+
+    def cached_tokens(self, messages: list[dict[str, Any]]) -> int:
+        """
+        prompt 전체(system + user ...)가 1024토큰 이상이면, 최근에 본 prompt와 겹치는 가장 긴 앞부분을
+        128토큰 단위로 내림해 캐시 적중으로 보고 (실제 API처럼 정적 system prompt가 짧아도 context가 붙으면 캐시됨).
+        """
+        prompt = _serialize_prompt(messages)
+        with self._lock:
+            seen = list(self._seen_prompts)
+            self._seen_prompts.append(prompt)
+        if _estimate_tokens(prompt) < _CACHE_MIN_TOKENS:
+            return 0
+        shared = max((_common_prefix_len(prompt, other) for other in seen), default=0)
+        return (_estimate_tokens(prompt[:shared]) // _CACHE_BLOCK_TOKENS) * _CACHE_BLOCK_TOKENS
+
+    def incr(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += n
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive (실제 API처럼 연결 재사용)
+    behavior: MockBehavior  # make_server에서 서브클래스에 지정
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # 부하 테스트 중 요청마다 stderr 출력하지 않음
+
+    def _send_json(self, status: int, body: dict[str, Any]) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int) -> None:
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        self._send_json(status, {"error": {"message": f"mock {kind}", "type": kind, "code": kind}})
+
+    def _read_json(self) -> dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self) -> None:
+        path = self.path.split("?")[0].rstrip("/")
+        if path.endswith("/stats"):
+            self._send_json(200, self.behavior.stats())
+        elif path.endswith("/models"):
+            self._send_json(200, {"object": "list", "data": []})
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+
+    def do_POST(self) -> None:
+        path = self.path.split("?")[0].rstrip("/")
+        try:
+            body = self._read_json()
+        except ValueError:
+            self._send_json(400, {"error": {"message": "invalid JSON", "type": "invalid_request_error"}})
+            return
+        if path.endswith("/embeddings"):
+            self._embeddings(body)
+        elif path.endswith("/chat/completions"):
+            self._chat(body)
+        else:
+            self._send_json(404, {"error": {"message": f"unknown path {self.path}", "type": "not_found"}})
+
+    def _embeddings(self, body: dict[str, Any]) -> None:
+        b = self.behavior
+        b.incr("embeddings")
+        inputs = body.get("input")
+        inputs = [inputs] if isinstance(inputs, str) else list(inputs or [])
+        b.incr("embedded_inputs", len(inputs))
+        time.sleep(b.draw(b.embed_latency))
+        status = b.draw_error()
+        if status:
+            self._send_error(status)
+            return
+        model = body.get("model") or "text-embedding-3-small"
+        dim = int(body.get("dimensions") or DEFAULT_EMBED_DIM)
+        as_base64 = body.get("encoding_format") == "base64"  # openai SDK 기본 요청 형식
+        data = []
+        for i, text in enumerate(inputs):
+            vec = deterministic_embedding(str(text), model, dim)
+            emb: Any = base64.b64encode(struct.pack(f"<{dim}f", *vec)).decode("ascii") if as_base64 else vec
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        n_tokens = sum(_estimate_tokens(str(t)) for t in inputs)
+        self._send_json(200, {
+            "object": "list",
+            "data": data,
+            "model": model,
+            "usage": {"prompt_tokens": n_tokens, "total_tokens": n_tokens},
+        })
+
+    def _chat(self, body: dict[str, Any]) -> None:
+        b = self.behavior
+        stream = bool(body.get("stream"))
+        b.incr("chat_stream" if stream else "chat")
+        messages = body.get("messages") or []
+        model = body.get("model") or "gpt-4o-mini"
+        ttft = b.draw(b.ttft)
+        status = b.draw_error()
+        if status:
+            time.sleep(ttft)
+            self._send_error(status)
+            return
+        answer = mock_answer(messages)
+        prompt_tokens = sum(_estimate_tokens(str(m.get("content") or "")) for m in messages)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _estimate_tokens(answer),
+            "total_tokens": prompt_tokens + _estimate_tokens(answer),
+            "prompt_tokens_details": {"cached_tokens": b.cached_tokens(messages)},
+        }
+        completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        if not stream:
+            time.sleep(ttft + sum(b.draw(b.token_interval) for _ in range(0, len(answer), b.chunk_chars)))
+            self._send_json(200, {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer}, "finish_reason": "stop"}],
+                "usage": usage,
+            })
+            return
+
+        include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+
+        def chunk(delta: dict[str, Any], finish: Optional[str] = None) -> dict[str, Any]:
+            return {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        try:
+            time.sleep(ttft)
+            self._write_event(chunk({"role": "assistant", "content": ""}))
+            for i in range(0, len(answer), b.chunk_chars):
+                if i:
+                    time.sleep(b.draw(b.token_interval))
+                self._write_event(chunk({"content": answer[i:i + b.chunk_chars]}))
+            self._write_event(chunk({}, "stop"))
+            if include_usage:
+                self._write_event({**chunk({}), "choices": [], "usage": usage})
+            self._write_chunk(b"data: [DONE]\n\n")
+            self._write_chunk(b"")
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 스트림을 닫음 (hedge 취소 등)
+            b.incr("disconnects")
+            self.close_connection = True
+
+    def _write_chunk(self, data: bytes) -> None:
+        """Transfer-Encoding: chunked 조각 1개 (빈 data = 종료 조각)."""
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def _write_event(self, payload: dict[str, Any]) -> None:
+        self._write_chunk(f"data: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128  # 동시 접속 부하 테스트용 accept 대기열
+
+    def handle_error(self, request, client_address) -> None:
+        import sys
+
+        # 클라이언트가 keep-alive 연결을 끊는 것은 정상 (SDK는 [DONE] 뒤 스트림 연결을 닫음)
+        if isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def make_server(addr: str = DEFAULT_ADDR, behavior: Optional[MockBehavior] = None) -> ThreadingHTTPServer:
+    """
+    mock 서버 생성 (아직 serve_forever 전). 포트 0이면 빈 포트 자동 할당.
+    테스트/벤치마크에서 같은 프로세스 안에 띄울 때:
+        server = make_server("127.0.0.1:0", MockBehavior(ttft="lognormal:300,0.5"))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        os.environ["OPENAI_BASE_URL"] = base_url(server)
+    """
+    host, _, port = addr.rpartition(":")
+    handler = type("MockHandler", (_Handler,), {"behavior": behavior or MockBehavior()})
+    return _Server((host or "127.0.0.1", int(port)), handler)
+
+
+def base_url(server: ThreadingHTTPServer) -> str:
+    """OPENAI_BASE_URL로 쓸 주소 (http://host:port/v1)."""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/v1"
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="오프라인 부하 테스트용 mock OpenAI 서버 (embeddings, chat.completions)")
+    parser.add_argument("--addr", default=DEFAULT_ADDR, help="host:port")
+    parser.add_argument("--ttft-ms", default="300", dest="ttft", help="첫 토큰 지연 분포 (예: 300, uniform:100,500, lognormal:300,0.5)")
+    parser.add_argument("--token-interval-ms", default="15", dest="token_interval", help="스트리밍 조각 간 지연 분포")
+    parser.add_argument("--embed-latency-ms", default="50", dest="embed_latency", help="임베딩 응답 지연 분포")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="오류 응답 비율 (0~1)")
+    parser.add_argument("--error-statuses", default="429,500", help="오류 시 고를 HTTP 상태 코드 (쉼표 구분)")
+    parser.add_argument("--chunk-chars", type=int, default=4, help="스트리밍 조각당 글자 수")
+    parser.add_argument("--seed", type=int, default=None, help="지연·오류 난수 seed (재현용)")
+    args = parser.parse_args()
+
+    behavior = MockBehavior(
+        ttft=args.ttft,
+        token_interval=args.token_interval,
+        embed_latency=args.embed_latency,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",") if s.strip()),
+        chunk_chars=args.chunk_chars,
+        seed=args.seed,
+    )
+    server = make_server(args.addr, behavior)
+    print(f"mock OpenAI 서버 실행 중: OPENAI_BASE_URL={base_url(server)} (OPENAI_API_KEY는 아무 값)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
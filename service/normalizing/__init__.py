@@ -3,10 +3,19 @@ JD(채용공고) 정규화 모듈.
 형식 통일·의미 보존. 정보 삭제·추론적 재작성 금지.
 """
 from .normalizing import (
+    iter_normalized,
     load_csv,
     normalize_jd_data,
     run_normalizing,
     save_normalized_csv,
+    stream_normalizing,
 )
 
-__all__ = ["load_csv", "normalize_jd_data", "run_normalizing", "save_normalized_csv"]
+__all__ = [
+    "iter_normalized",
+    "load_csv",
+    "normalize_jd_data",
+    "run_normalizing",
+    "save_normalized_csv",
+    "stream_normalizing",
+]
@@ -1,18 +1,20 @@
 """
-python -m service.normalizing <입력.csv>
-결과: service/normalizing/normalized/normalized_{입력파일명}_1.csv, _2.csv, ...
+python -m service.normalizing <입력.csv> [--output 출력경로] [--parquet]
+결과: service/normalizing/normalized/normalized_{입력파일명}_1.csv, _2.csv, ... (--parquet이면 .parquet)
+입력은 cleansed CSV 또는 Parquet (확장자로 구분).
 """
-import sys
+import argparse
 
-from .normalizing import run_normalizing
+from .normalizing import stream_normalizing
 
 
 def main() -> None:
-    if len(sys.argv) < 2:
-        print("사용법: python -m service.normalizing <입력.csv>", file=sys.stderr)
-        sys.exit(1)
-    input_path = sys.argv[1]
-    run_normalizing(input_path, output_path=None)
+    parser = argparse.ArgumentParser(description="cleansed CSV/Parquet 정규화")
+    parser.add_argument("input_path", help="입력 CSV 또는 Parquet 경로")
+    parser.add_argument("--output", default=None, help="출력 경로 (.csv 또는 .parquet, 기본 normalized/normalized_{입력파일명}_N)")
+    parser.add_argument("--parquet", action="store_true", help="기본 출력 이름을 .parquet으로 (Parquet으로 저장)")
+    args = parser.parse_args()
+    stream_normalizing(args.input_path, output_path=args.output, parquet=args.parquet)
 
 
 if __name__ == "__main__":
@@ -6,9 +6,11 @@ JD(채용공고) Normalizing.
 
 import re
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterable, Iterator, Optional, Union
 import pandas as pd
 
+from service.streaming import DEFAULT_CHUNK_ROWS, artifact_suffix, iter_frames, load_frame, next_numbered_path, save_frame, write_frames
+
 
 NORMALIZED_DIR = Path(__file__).resolve().parent / "normalized"
 
@@ -324,16 +326,13 @@ def normalize_jd_data(df: pd.DataFrame, add_document_column: bool = True) -> pd.
 
 
 def load_csv(path: Union[str, Path], encoding: str = "utf-8-sig") -> pd.DataFrame:
-    """CSV 로드 (cleansed 또는 원본 점핏 CSV)."""
-    return pd.read_csv(path, encoding=encoding)
+    """CSV 로드 (cleansed 또는 원본 점핏 CSV, .parquet이면 Parquet)."""
+    return load_frame(path, encoding=encoding)
 
 
 def save_normalized_csv(df: pd.DataFrame, path: Union[str, Path], encoding: str = "utf-8-sig") -> Path:
-    """정규화된 DataFrame을 CSV로 저장."""
-    path = Path(path)
-    path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(path, index=False, encoding=encoding)
-    return path
+    """정규화된 DataFrame을 CSV로 저장 (.parquet 경로면 Parquet)."""
+    return save_frame(df, path, encoding=encoding)
 
 
 def run_normalizing(
@@ -341,24 +340,15 @@ def run_normalizing(
     output_path: Optional[Union[str, Path]] = None,
     encoding: str = "utf-8-sig",
     add_document_column: bool = True,
+    parquet: bool = False,
 ) -> pd.DataFrame:
     """
     CSV 경로를 받아 정규화 후 저장하고 DataFrame 반환.
-    output_path 미지정 시 service/normalizing/normalized/ 안에 normalized_{입력파일명}_1, _2, ... 순으로 저장.
+    output_path 미지정 시 service/normalizing/normalized/ 안에 normalized_{입력파일명}_1, _2, ... 순으로 저장 (parquet=True면 .parquet).
     """
     input_path = Path(input_path)
     if output_path is None:
-        NORMALIZED_DIR.mkdir(parents=True, exist_ok=True)
-        base = f"normalized_{input_path.stem}"
-        pattern = f"{base}_*.csv"
-        existing = list(NORMALIZED_DIR.glob(pattern))
-        nums = []
-        for p in existing:
-            suffix = p.stem[len(base):].lstrip("_")
-            if suffix.isdigit():
-                nums.append(int(suffix))
-        n = max(nums) + 1 if nums else 1
-        output_path = NORMALIZED_DIR / f"{base}_{n}.csv"
+        output_path = next_numbered_path(NORMALIZED_DIR, f"normalized_{input_path.stem}", artifact_suffix(parquet, ".csv"))
     else:
         output_path = Path(output_path)
     df = load_csv(input_path, encoding=encoding)
@@ -366,3 +356,41 @@ def run_normalizing(
     save_normalized_csv(normalized, output_path, encoding=encoding)
     print(f"Normalizing 완료: {len(normalized)}건 → {output_path}")
     return normalized
+
+
+def iter_normalized(
+    frames: Iterable[pd.DataFrame],
+    add_document_column: bool = True,
+) -> Iterator[pd.DataFrame]:
+    """
+    DataFrame 묶음을 차례로 정규화 (normalize_jd_data는 행 단위라 묶음별 결과를 이으면 전체 결과와 같음).
+    company_years_num은 묶음에 결측이 없으면 int로 추론돼 CSV 표기(18 / 18.0)가 묶음마다 달라지므로 float으로 고정.
+    """
+    for frame in frames:
+        out = normalize_jd_data(frame, add_document_column=add_document_column)
+        if "company_years_num" in out.columns:
+            out["company_years_num"] = out["company_years_num"].astype(float)
+        yield out
+
+
+def stream_normalizing(
+    input_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    encoding: str = "utf-8-sig",
+    add_document_column: bool = True,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    parquet: bool = False,
+) -> Path:
+    """
+    run_normalizing의 스트리밍 버전: chunksize행씩 읽고 정규화해 바로 이어 씀 (메모리는 묶음 크기만큼).
+    중단되면 그때까지 쓴 행까지가 유효한 CSV로 남음 (Parquet은 끝까지 써야 읽을 수 있음).
+    입력·출력은 CSV 또는 Parquet (확장자로 구분). 출력 경로 반환 (기본 이름 규칙은 run_normalizing과 같음).
+    """
+    input_path = Path(input_path)
+    if output_path is None:
+        output_path = next_numbered_path(NORMALIZED_DIR, f"normalized_{input_path.stem}", artifact_suffix(parquet, ".csv"))
+    output_path = Path(output_path)
+    frames = iter_frames(input_path, encoding=encoding, chunksize=chunksize)
+    n = write_frames(iter_normalized(frames, add_document_column), output_path, encoding=encoding)
+    print(f"Normalizing 완료: {n}건 → {output_path}")
+    return output_path
@@ -0,0 +1,78 @@
+"""
+프로세스 공용 OpenAI 클라이언트.
+임베딩(service.embedding), 검색(RAG.Retriever), 답변 생성(RAG.Generate)이 같은 클라이언트를 써서
+HTTP keep-alive 연결을 재사용 (요청마다 TLS handshake 비용 제거).
+
+환경 변수 (모두 선택):
+  OPENAI_BASE_URL          API 주소 (로컬 mock 서버 등)
+  OPENAI_TIMEOUT           요청 전체 timeout 초 (기본 60)
+  OPENAI_CONNECT_TIMEOUT   연결 timeout 초 (기본 5)
+  OPENAI_MAX_RETRIES       429/5xx/연결 오류 재시도 횟수 (기본 2, SDK 지수 backoff)
+  OPENAI_MAX_CONNECTIONS   연결 풀 최대 연결 수 (기본 20)
+"""
+
+import os
+import threading
+from typing import Optional
+
+_lock = threading.Lock()
+_client = None
+_client_key: Optional[tuple] = None
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _build_client(api_key: str, base_url: Optional[str]):
+    import httpx
+    from openai import OpenAI
+
+    max_connections = _env_int("OPENAI_MAX_CONNECTIONS", 20)
+    timeout = httpx.Timeout(
+        _env_float("OPENAI_TIMEOUT", 60.0),
+        connect=_env_float("OPENAI_CONNECT_TIMEOUT", 5.0),
+    )
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=60.0,
+        ),
+        timeout=timeout,
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        http_client=http_client,
+        timeout=timeout,
+        max_retries=_env_int("OPENAI_MAX_RETRIES", 2),
+    )
+
+
+def get_openai_client():
+    """
+    공용 OpenAI 클라이언트 반환. OPENAI_API_KEY 없으면 None.
+    API 키나 base URL이 바뀌면(테스트 등) 새로 만듦. OpenAI 클라이언트는 스레드 안전.
+    """
+    global _client, _client_key
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    key = (api_key, os.environ.get("OPENAI_BASE_URL") or None)
+    with _lock:
+        if _client is None or _client_key != key:
+            # 이전 클라이언트는 사용 중인 스레드가 있을 수 있으므로 닫지 않음
+            _client = _build_client(*key)
+            _client_key = key
+        return _client
@@ -0,0 +1,179 @@
+"""
+단일 패스 적재 파이프라인: 크롤링 CSV → Cleansing → Normalizing → Chunking → Embedding → embedded JSONL + PostgreSQL.
+단계 사이에 CSV/JSONL을 쓰고 다시 파싱하지 않고, CSV 묶음(chunksize행)마다 네 단계를 메모리에서 이어 실행.
+
+- 중간 산출물(cleaned.csv, normalized.csv, chunked.jsonl)은 debug_dir을 줄 때만 씀 (parquet=True면 .parquet)
+- 단계별 소요 시간·처리량(행/초, chunk/초)을 집계해 출력
+- 결과 chunk는 단계별 실행(run_cleansing → run_normalizing → run_chunking)과 같음
+  (CSV를 거치면 빈 문자열이 결측이 되는데, iter_chunks가 빈 문자열을 결측으로 다루므로 메모리에서도 같음)
+
+CLI: python -m service <크롤링.csv> [--output embedded.jsonl] [--debug-dir debug/] [--embed-workers 4] [--no-pg] [--parquet]
+"""
+
+import contextlib
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Union
+
+from service.chunking.chunking import iter_chunks
+from service.cleansing.cleansing import clean_jd_data
+from service.embedding.embedding import EMBEDDED_DIR, _dummy_embed, get_openai_embed_fn, iter_embedded, save_to_postgres
+from service.facets import rebuild_facets
+from service.normalizing.normalizing import iter_normalized
+from service.streaming import (
+    DEFAULT_CHUNK_ROWS,
+    artifact_suffix,
+    counted,
+    frame_writer,
+    iter_frames,
+    next_numbered_path,
+    record_writer,
+    tee_jsonl,
+)
+
+STAGES = ("read", "cleansing", "normalizing", "chunking", "embedding")
+# 임베딩 요청을 이만큼씩 묶어 스레드 풀에 넣음 (묶음의 벡터만 메모리에 둠)
+EMBED_BATCH = 256
+
+
+def run_pipeline(
+    input_path: Union[str, Path],
+    output_path: Optional[Union[str, Path]] = None,
+    *,
+    embed_fn: Optional[Callable[[str], list[float]]] = None,
+    embed_workers: int = 4,
+    save_jsonl: bool = True,
+    save_pg: bool = True,
+    debug_dir: Optional[Union[str, Path]] = None,
+    update_facets: bool = True,
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+    encoding: str = "utf-8-sig",
+    parquet: bool = False,
+) -> dict[str, Any]:
+    """
+    크롤링 CSV 하나를 한 번의 스트리밍 패스로 임베딩까지 처리.
+
+    Args:
+        output_path: embedded JSONL 경로 (기본 service/embedding/embedded/embedded_N.jsonl).
+        embed_fn: 텍스트 → 벡터 (기본 OpenAI text-embedding-3-small, 키가 없으면 더미 벡터).
+        embed_workers: 임베딩 동시 요청 수 (1이면 순차).
+        debug_dir: 지정 시 cleaned.csv / normalized.csv / chunked.jsonl을 이 디렉터리에 씀.
+        update_facets: chunked 전체 + 이번 결과로 facet 인덱스 재생성.
+        parquet: 기본 출력 이름과 debug 산출물을 .parquet으로 (output_path는 확장자로 형식 결정).
+
+    Returns:
+        {"rows", "chunks", "output_path", "pg_rows", "wall_sec",
+         "stages": {단계: {"sec", "in", "out", "per_sec"}}}  (write: JSONL·PostgreSQL 쓰기 + 기타)
+
+    읽기·정제·정규화·청킹·임베딩 중 예외는 그대로 전파 (facet 인덱스는 갱신하지 않음).
+    PostgreSQL 적재만 실패하면 embedded 파일을 끝까지 쓴 뒤 RuntimeError.
+    """
+    input_path = Path(input_path)
+    pg_enabled = save_pg and bool(os.environ.get("DATABASE_URL") or os.environ.get("PGHOST"))
+    if save_pg and not pg_enabled:
+        print("DATABASE_URL 또는 PGHOST 미설정 → PostgreSQL 저장 생략.")
+    embed_fn = embed_fn or get_openai_embed_fn() or _dummy_embed
+    if embed_fn is _dummy_embed and not os.environ.get("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY 미설정 → 더미 벡터로 저장합니다.")
+    if save_jsonl:
+        output_path = Path(output_path) if output_path else next_numbered_path(EMBEDDED_DIR, "embedded", artifact_suffix(parquet, ".jsonl"))
+    else:
+        output_path = None
+    debug_dir = Path(debug_dir) if debug_dir else None
+
+    stats = {name: {"sec": 0.0, "in": 0, "out": 0} for name in STAGES}
+    # facet 집계용: 공고(회사, 직무)당 메타데이터 1건만 보관
+    postings: dict[tuple[Any, Any], dict[str, Any]] = {}
+
+    def _timed(stage: str, n_in: int, fn: Callable[[], Any]) -> Any:
+        t0 = time.perf_counter()
+        result = fn()
+        s = stats[stage]
+        s["sec"] += time.perf_counter() - t0
+        s["in"] += n_in
+        s["out"] += len(result)
+        return result
+
+    def _embedded(stack: contextlib.ExitStack) -> Iterator[dict[str, Any]]:
+        debug = {}
+        if debug_dir is not None:
+            debug = {
+                "cleaned": stack.enter_context(frame_writer(debug_dir / f"cleaned{artifact_suffix(parquet, '.csv')}", encoding)),
+                "normalized": stack.enter_context(frame_writer(debug_dir / f"normalized{artifact_suffix(parquet, '.csv')}", encoding)),
+                "chunked": stack.enter_context(record_writer(debug_dir / f"chunked{artifact_suffix(parquet, '.jsonl')}")),
+            }
+        pool = stack.enter_context(ThreadPoolExecutor(max_workers=embed_workers)) if embed_workers > 1 else None
+
+        def _embed_batch(batch: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            if pool is None:
+                return list(iter_embedded(batch, embed_fn))
+            # 묶음 전체를 동시에 요청하고, 결과는 입력 순서대로 붙임
+            vectors = iter(pool.map(embed_fn, [c.get("text", "") for c in batch]))
+            return list(iter_embedded(batch, lambda _text: next(vectors)))
+
+        frames = iter_frames(input_path, encoding=encoding, chunksize=chunksize)
+        while True:
+            t0 = time.perf_counter()
+            frame = next(frames, None)
+            stats["read"]["sec"] += time.perf_counter() - t0
+            if frame is None:
+                return
+            stats["read"]["in"] += len(frame)
+            stats["read"]["out"] += len(frame)
+
+            cleaned = _timed("cleansing", len(frame), lambda: clean_jd_data(frame))
+            normalized = _timed("normalizing", len(cleaned), lambda: next(iter_normalized([cleaned])))
+            chunks = _timed("chunking", len(normalized), lambda: list(iter_chunks(normalized)))
+            if debug:
+                debug["cleaned"].write(cleaned)
+                debug["normalized"].write(normalized)
+                for c in chunks:
+                    debug["chunked"].write(c)
+            for c in chunks:
+                meta = c["metadata"]
+                if meta.get("company"):
+                    postings.setdefault((meta["company"], meta.get("job_role")), {"metadata": meta})
+            for start in range(0, len(chunks), EMBED_BATCH):
+                batch = chunks[start: start + EMBED_BATCH]
+                yield from _timed("embedding", len(batch), lambda: _embed_batch(batch))
+
+    started = time.perf_counter()
+    counter = [0]
+    pg_rows = 0
+    with contextlib.ExitStack() as stack:
+        items = counted(tee_jsonl(_embedded(stack), output_path), counter)
+        if pg_enabled:
+            pg_rows = save_to_postgres(items)
+        for _ in items:  # PostgreSQL 저장을 안 하거나 실패한 경우에도 끝까지 처리
+            pass
+    wall_sec = time.perf_counter() - started
+
+    stage_sec = sum(s["sec"] for s in stats.values())
+    summary_stages = {
+        name: {**s, "sec": round(s["sec"], 3), "per_sec": round(s["in"] / s["sec"], 1) if s["sec"] > 0 else None}
+        for name, s in stats.items()
+    }
+    write_sec = max(0.0, wall_sec - stage_sec)
+    summary_stages["write"] = {
+        "sec": round(write_sec, 3),
+        "in": counter[0],
+        "out": counter[0],
+        "per_sec": round(counter[0] / write_sec, 1) if write_sec > 0 else None,
+    }
+    if pg_enabled and pg_rows != counter[0]:
+        # JSONL은 끝까지 썼지만 DB 적재는 rollback됨 → facet도 갱신하지 않고 실패로 알림
+        hint = f" (embedded 파일은 끝까지 저장됨: {output_path})" if output_path else ""
+        raise RuntimeError(f"PostgreSQL 저장 실패: chunk {counter[0]}건 중 {pg_rows}건 적재{hint}")
+    if update_facets and postings:
+        # 이번 chunk는 파일로 남지 않으므로 chunked 전체(기본 경로)에 메타데이터로 더해 집계
+        rebuild_facets(extra_chunks=postings.values())
+    return {
+        "rows": stats["read"]["out"],
+        "chunks": counter[0],
+        "output_path": str(output_path) if output_path else None,
+        "pg_rows": pg_rows,
+        "wall_sec": round(wall_sec, 2),
+        "stages": summary_stages,
+    }
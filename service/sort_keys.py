@@ -0,0 +1,62 @@
+"""
+정렬·중복 제거용 타입 필드: chunking/embedding 단계에서 한 번 계산해 chunk 메타데이터와 DB 컬럼에 저장.
+Generate는 요청마다 문자열을 정규식으로 파싱하지 않고 이 값으로 바로 정렬·중복 제거 (없으면 같은 함수로 계산).
+
+  deadline_date   마감일 ISO 문자열 "YYYY-MM-DD" (DB: DATE). 날짜가 아니면("상시" 등) None
+  company_years   회사 업력 정수 (18.0, "18년차" → 18). 없으면 None
+  content_hash    chunk 본문(앞뒤 공백 제거) sha1 앞 16자리 (DB: TEXT)
+
+pandas 등 무거운 의존성 없이 RAG 쪽에서도 import 가능하도록 분리.
+"""
+
+import datetime
+import hashlib
+import math
+import re
+from typing import Any, Optional
+
+SORT_FIELDS = ("deadline_date", "company_years", "content_hash")
+
+_RE_DATE = re.compile(r"(\d{4})\D{0,2}(\d{1,2})\D{0,2}(\d{1,2})")
+_RE_INT = re.compile(r"\d+")
+
+
+def parse_deadline_date(value: Any) -> Optional[str]:
+    """'2026-02-19', '2026.2.19', '20260219' 등 → '2026-02-19'. 날짜가 없으면 None."""
+    if value is None:
+        return None
+    m = _RE_DATE.search(str(value))
+    if not m:
+        return None
+    # 없는 날짜(2026-02-30, 0000년)는 DB DATE로 COPY할 때 묶음 전체를 실패시키므로 date로 검증
+    try:
+        return datetime.date(*(int(g) for g in m.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def parse_company_years(value: Any) -> Optional[int]:
+    """18.0, '18', '18년차' → 18. 없거나 숫자가 아니면 None."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return None if isinstance(value, float) and math.isnan(value) else int(value)
+    m = _RE_INT.search(str(value))
+    return int(m.group()) if m else None
+
+
+def content_hash(text: Optional[str]) -> str:
+    """중복 본문 판별용 해시 (앞뒤 공백 무시)."""
+    return hashlib.sha1((text or "").strip().encode("utf-8")).hexdigest()[:16]
+
+
+def with_sort_fields(metadata: dict[str, Any], text: Optional[str]) -> dict[str, Any]:
+    """metadata에 deadline_date / company_years / content_hash를 채운 새 dict (값이 있으면 유지, None은 없는 것으로 보고 다시 계산)."""
+    meta = dict(metadata or {})
+    if meta.get("deadline_date") is None:
+        meta["deadline_date"] = parse_deadline_date(meta.get("deadline"))
+    if meta.get("company_years") is None:
+        meta["company_years"] = parse_company_years(meta.get("company_years_num"))
+    if not meta.get("content_hash"):
+        meta["content_hash"] = content_hash(text)
+    return meta
@@ -0,0 +1,268 @@
+"""
+파이프라인 스트리밍 입출력: CSV는 행 묶음(chunksize) 단위, JSONL은 줄 단위로 읽고 쓰기.
+각 단계(cleansing/normalizing/chunking/embedding)의 stream_* 함수가 사용하며, 입력 크기와 관계없이 메모리는 묶음 크기만큼만 씀.
+
+- 출력은 묶음마다 바로 파일에 이어 쓰고 flush → 중간에 중단돼도 그때까지의 완결된 행은 그대로 사용 가능
+- CSV 묶음의 index는 파일 전체 기준 행 번호로 이어짐 (chunking의 source_row_id가 전체 로드 때와 같음)
+- 경로 확장자가 .parquet이면 *_frames / *_records 함수와 writer는 Parquet으로 읽고 씀 (service.columnar, pyarrow 필요)
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+from service.columnar import (
+    PARQUET_SUFFIX,
+    ParquetFrameWriter,
+    ParquetRecordWriter,
+    is_parquet,
+    iter_parquet_frames,
+    iter_parquet_records,
+    read_parquet_frame,
+)
+
+# CSV 한 번에 읽는 행 수 (공고 1건 ≈ 3KB → 약 15MB)
+DEFAULT_CHUNK_ROWS = 5000
+
+
+class CsvFrameWriter:
+    """DataFrame 묶음을 한 CSV로 이어 씀 (헤더·BOM은 처음 한 번, 묶음마다 flush)."""
+
+    def __init__(self, path: Union[str, Path], encoding: str = "utf-8-sig") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "w", encoding=encoding, newline="")
+        self.rows = 0
+        self._first = True
+
+    def write(self, frame: pd.DataFrame) -> None:
+        # BOM은 파일을 연 인코딩이 처음 한 번만 씀 → 묶음은 BOM 없이 이어 씀
+        frame.to_csv(self._f, index=False, header=self._first)
+        self._f.flush()
+        self._first = False
+        self.rows += len(frame)
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "CsvFrameWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class JsonlRecordWriter:
+    """dict를 JSONL로 한 줄씩 씀 (flush_every건마다 flush)."""
+
+    def __init__(self, path: Union[str, Path], append: bool = False, flush_every: int = 1000) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a" if append else "w", encoding="utf-8")
+        self.flush_every = flush_every
+        self.rows = 0
+
+    def write(self, item: dict[str, Any]) -> None:
+        self._f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        self.rows += 1
+        if self.rows % self.flush_every == 0:
+            self._f.flush()
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "JsonlRecordWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def frame_writer(path: Union[str, Path], encoding: str = "utf-8-sig") -> Union[CsvFrameWriter, ParquetFrameWriter]:
+    """경로 확장자에 맞는 DataFrame writer (.parquet → Parquet, 그 밖 → CSV)."""
+    return ParquetFrameWriter(path) if is_parquet(path) else CsvFrameWriter(path, encoding=encoding)
+
+
+def record_writer(
+    path: Union[str, Path],
+    append: bool = False,
+    flush_every: int = 1000,
+) -> Union[JsonlRecordWriter, ParquetRecordWriter]:
+    """경로 확장자에 맞는 chunk writer (.parquet → Parquet, 그 밖 → JSONL). Parquet은 이어 쓸 수 없음."""
+    if not is_parquet(path):
+        return JsonlRecordWriter(path, append=append, flush_every=flush_every)
+    if append:
+        raise ValueError("Parquet 출력은 이어 쓸 수 없습니다 (resume은 JSONL 출력만).")
+    return ParquetRecordWriter(path)
+
+
+def iter_csv(
+    path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """
+    CSV를 chunksize행씩 DataFrame으로 읽음.
+    묶음 안에서 전부 비어 있는 컬럼은 pandas가 float으로 추론하므로 object로 되돌림
+    (전체 로드 때처럼 문자열 컬럼으로 정제·정규화되도록).
+    """
+    with pd.read_csv(path, encoding=encoding, chunksize=chunksize) as reader:
+        for frame in reader:
+            empty = [col for col in frame.columns if frame[col].isna().all()]
+            if empty:
+                frame = frame.astype({col: object for col in empty})
+            yield frame
+
+
+def write_csv(
+    frames: Iterable[pd.DataFrame],
+    path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+) -> int:
+    """DataFrame 묶음을 한 CSV로 이어 씀 (헤더·BOM은 처음 한 번). 쓴 행 수 반환."""
+    with CsvFrameWriter(path, encoding=encoding) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return writer.rows
+
+
+def iter_jsonl(path: Union[str, Path]) -> Iterator[dict[str, Any]]:
+    """JSONL을 한 줄씩 dict로. 빈 줄은 건너뜀."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def write_jsonl(
+    items: Iterable[dict[str, Any]],
+    path: Union[str, Path],
+    append: bool = False,
+    flush_every: int = 1000,
+) -> int:
+    """dict를 JSONL로 한 줄씩 씀 (flush_every건마다 flush). 쓴 건수 반환."""
+    with JsonlRecordWriter(path, append=append, flush_every=flush_every) as writer:
+        for item in items:
+            writer.write(item)
+    return writer.rows
+
+
+def load_frame(path: Union[str, Path], encoding: str = "utf-8-sig") -> pd.DataFrame:
+    """CSV 또는 Parquet 전체를 DataFrame으로."""
+    return read_parquet_frame(path) if is_parquet(path) else pd.read_csv(path, encoding=encoding)
+
+
+def save_frame(df: pd.DataFrame, path: Union[str, Path], encoding: str = "utf-8-sig") -> Path:
+    """DataFrame을 경로 확장자에 맞춰 CSV 또는 Parquet으로 저장."""
+    write_frames([df], path, encoding=encoding)
+    return Path(path)
+
+
+def iter_frames(
+    path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+    chunksize: int = DEFAULT_CHUNK_ROWS,
+) -> Iterator[pd.DataFrame]:
+    """CSV 또는 Parquet을 chunksize행씩 (index는 어느 쪽이든 파일 전체 기준 행 번호)."""
+    if is_parquet(path):
+        return iter_parquet_frames(path, chunksize)
+    return iter_csv(path, encoding=encoding, chunksize=chunksize)
+
+
+def write_frames(
+    frames: Iterable[pd.DataFrame],
+    path: Union[str, Path],
+    encoding: str = "utf-8-sig",
+) -> int:
+    """DataFrame 묶음을 CSV 또는 Parquet 한 파일로 이어 씀. 쓴 행 수 반환."""
+    with frame_writer(path, encoding=encoding) as writer:
+        for frame in frames:
+            writer.write(frame)
+    return writer.rows
+
+
+def iter_records(path: Union[str, Path]) -> Iterator[dict[str, Any]]:
+    """chunked/embedded 산출물(JSONL 또는 Parquet)을 dict로 하나씩."""
+    return iter_parquet_records(path) if is_parquet(path) else iter_jsonl(path)
+
+
+def write_records(items: Iterable[dict[str, Any]], path: Union[str, Path]) -> int:
+    """dict를 JSONL 또는 Parquet으로 씀. 쓴 건수 반환."""
+    with record_writer(path) as writer:
+        for item in items:
+            writer.write(item)
+    return writer.rows
+
+
+def count_complete_jsonl(path: Union[str, Path]) -> int:
+    """
+    중단된 JSONL 출력의 완결된 줄 수. 마지막 줄이 잘렸으면(쓰는 도중 중단) 그 줄을 잘라 내 이어 쓸 수 있게 함.
+    파일이 없으면 0.
+    """
+    path = Path(path)
+    if not path.exists():
+        return 0
+    n = 0
+    valid_end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                json.loads(line)
+            except ValueError:
+                break
+            n += 1
+            valid_end += len(line)
+    if valid_end != path.stat().st_size:
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+    return n
+
+
+def next_numbered_path(directory: Path, base: str, suffix: str) -> Path:
+    """
+    directory 안의 {base}_1{suffix}, _2, ... 중 다음 번호 경로 (각 단계 run_*의 기본 출력 이름 규칙).
+    번호는 확장자와 관계없이 이어짐 (chunked_1.jsonl 다음 Parquet 출력은 chunked_2.parquet).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    nums = []
+    for p in directory.glob(f"{base}_*"):
+        tail = p.stem[len(base) + 1:]
+        if tail.isdigit():
+            nums.append(int(tail))
+    return directory / f"{base}_{max(nums) + 1 if nums else 1}{suffix}"
+
+
+def artifact_suffix(parquet: bool, text_suffix: str) -> str:
+    """기본 출력 확장자: parquet=True면 .parquet, 아니면 단계의 텍스트 확장자(.csv / .jsonl)."""
+    return PARQUET_SUFFIX if parquet else text_suffix
+
+
+def artifact_paths(directory: Path, base: str) -> list[Path]:
+    """directory 안의 {base}_*.jsonl / .parquet 산출물 (이름순)."""
+    return sorted(p for p in directory.glob(f"{base}_*") if p.suffix in (".jsonl", PARQUET_SUFFIX))
+
+
+def counted(items: Iterable[Any], counter: list[int]) -> Iterator[Any]:
+    """items를 그대로 내보내며 counter[0]에 건수 누적 (generator를 소비하는 쪽과 건수를 공유)."""
+    for item in items:
+        counter[0] += 1
+        yield item
+
+
+def tee_jsonl(items: Iterable[dict[str, Any]], path: Optional[Union[str, Path]], append: bool = False) -> Iterator[dict[str, Any]]:
+    """
+    items를 JSONL에 쓰면서 그대로 다시 내보냄 (파일 저장과 DB 적재를 한 번의 순회로).
+    path가 .parquet이면 Parquet으로 씀 (이어 쓰기 불가 → append는 JSONL만).
+    """
+    if path is None:
+        yield from items
+        return
+    with record_writer(path, append=append, flush_every=100) as writer:
+        for item in items:
+            writer.write(item)
+            yield item